@@ -0,0 +1,168 @@
+"""
+Проверка маршрутизации чатов между репликами на нескольких локальных процессах.
+
+Поднимает N реплик uvicorn со статическим кольцом (LOOM_TG_BOT_CHAT_SHARDING_REPLICAS),
+шлет обновления разных чатов на случайные реплики и проверяет, что каждый чат обработан ровно одной.
+Затем останавливает одну реплику и показывает, какая доля чатов сменила владельца -
+при консистентном хешировании переезжают только чаты ушедшей реплики.
+
+Запуск из корня репозитория:
+    python -m benchmark.chat_sharding --replicas 3 --chats 300
+"""
+import argparse
+import asyncio
+import os
+import random
+import signal
+import socket
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Annotated
+
+import httpx
+from aiogram.types import Update
+from fastapi import FastAPI, Header
+
+from benchmark.telemetry import BenchmarkTelemetry
+from internal.service.chat_router.service import ChatRouter
+
+PREFIX = "/api/tg-bot"
+SECRET = "secret"
+
+
+def new_app() -> FastAPI:
+    replicas = [replica for replica in os.getenv("LOOM_TG_BOT_CHAT_SHARDING_REPLICAS", "").split(",") if replica]
+    router = ChatRouter(
+        BenchmarkTelemetry(),
+        None,
+        os.getenv("LOOM_TG_BOT_REPLICA_URL", ""),
+        replicas,
+        PREFIX,
+        virtual_nodes=64,
+        heartbeat_ttl=15,
+        forward_timeout=2,
+        down_cooldown=30,
+    )
+    handled: list[int] = []
+    app = FastAPI()
+
+    # Та же последовательность, что в TelegramWebhookController.bot_webhook, без диспетчера
+    async def bot_webhook(
+            update: dict,
+            x_telegram_bot_api_secret_token: Annotated[str | None, Header()] = None,
+            x_loom_forwarded_by: Annotated[str | None, Header()] = None,
+    ):
+        telegram_update = Update(**update)
+        if x_loom_forwarded_by is None and await router.forward(telegram_update, update, x_telegram_bot_api_secret_token):
+            return None
+
+        handled.append(telegram_update.message.chat.id)
+        return None
+
+    async def handled_chats():
+        return handled
+
+    app.add_api_route(PREFIX + "/update", bot_webhook, methods=["POST"])
+    app.add_api_route(PREFIX + "/handled", handled_chats, methods=["GET"])
+    return app
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _update(update_id: int, chat_id: int) -> dict:
+    return {
+        "update_id": update_id,
+        "message": {"message_id": update_id, "date": 0, "chat": {"id": chat_id, "type": "private"}, "text": "hi"},
+    }
+
+
+def _start_replicas(count: int) -> dict[str, subprocess.Popen]:
+    urls = [f"http://127.0.0.1:{_free_port()}" for _ in range(count)]
+    replicas = {}
+    for url in urls:
+        replicas[url] = subprocess.Popen(
+            [
+                sys.executable, "-m", "uvicorn", "benchmark.chat_sharding:new_app", "--factory",
+                "--port", url.rsplit(":", 1)[1], "--log-level", "warning", "--no-access-log",
+            ],
+            env={
+                **os.environ,
+                "LOOM_TG_BOT_REPLICA_URL": url,
+                "LOOM_TG_BOT_CHAT_SHARDING_REPLICAS": ",".join(urls),
+            },
+        )
+
+    for url in urls:
+        for _ in range(150):
+            try:
+                httpx.get(f"{url}{PREFIX}/handled", timeout=1)
+                break
+            except httpx.HTTPError:
+                time.sleep(0.2)
+    return replicas
+
+
+async def _send_round(urls: list[str], chats: int, first_update_id: int) -> dict[int, set[str]]:
+    async with httpx.AsyncClient(timeout=10) as client:
+        await asyncio.gather(*[
+            client.post(
+                f"{random.choice(urls)}{PREFIX}/update",
+                json=_update(first_update_id + chat_id, chat_id),
+                headers={"X-Telegram-Bot-Api-Secret-Token": SECRET},
+            )
+            for chat_id in range(1, chats + 1)
+        ])
+
+        owners: dict[int, set[str]] = defaultdict(set)
+        for url in urls:
+            for chat_id in (await client.get(f"{url}{PREFIX}/handled")).json():
+                owners[chat_id].add(url)
+        return owners
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--replicas", type=int, default=3)
+    parser.add_argument("--chats", type=int, default=300)
+    args = parser.parse_args()
+
+    replicas = _start_replicas(args.replicas)
+    urls = list(replicas)
+    try:
+        owners = asyncio.run(_send_round(urls, args.chats, 0))
+        split_chats = [chat_id for chat_id, chat_owners in owners.items() if len(chat_owners) > 1]
+        per_replica = {url: sum(url in chat_owners for chat_owners in owners.values()) for url in urls}
+        print(f"chats handled: {len(owners)}/{args.chats}, handled by several replicas: {len(split_chats)}")
+        print(f"chats per replica: {list(per_replica.values())}")
+
+        # Реплика ушла: ингресс исключает ее после первой ошибки пересылки
+        stopped = urls[-1]
+        replicas[stopped].send_signal(signal.SIGINT)
+        replicas[stopped].wait(timeout=30)
+        alive = urls[:-1]
+
+        before = {chat_id: next(iter(chat_owners)) for chat_id, chat_owners in owners.items()}
+        owners_after = asyncio.run(_send_round(alive, args.chats, args.chats))
+        moved = [
+            chat_id for chat_id, chat_owners in owners_after.items()
+            if len(chat_owners) > 1 and before[chat_id] != stopped
+        ]
+        print(
+            f"after stopping one replica: {per_replica[stopped]} chats of the stopped replica moved, "
+            f"chats of live replicas that changed owner: {len(moved)}"
+        )
+    finally:
+        for process in replicas.values():
+            if process.poll() is None:
+                process.send_signal(signal.SIGINT)
+                process.wait(timeout=30)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Размер и стоимость сериализации dialog_data списков модерации и черновиков.
+
+aiogram-dialog сохраняет контекст диалога в RedisStorage (json.dumps) на каждом обновлении.
+Сравнивает прежнее содержимое (полные to_dict() публикаций) и текущее (только id).
+
+Запуск из корня репозитория:
+    python -m benchmark.dialog_data --publications 20 --text-length 1500
+"""
+import argparse
+import json
+import timeit
+
+from internal import model
+
+
+def _publication(publication_id: int, text_length: int) -> model.Publication:
+    return model.Publication(
+        id=publication_id,
+        organization_id=1,
+        category_id=3,
+        creator_id=7,
+        moderator_id=None,
+        vk_source=True,
+        tg_source=True,
+        vk_link=f"https://vk.com/wall-1_{publication_id}",
+        tg_link=f"https://t.me/loom/{publication_id}",
+        text_reference="Голосовое сотрудника о кейсе клиента. " * (text_length // 120),
+        text="<b>Кейс</b> проекта за неделю, подробности и выводы. " * (text_length // 50),
+        image_fid=f"fid-{publication_id}",
+        image_name=f"image-{publication_id}.png",
+        openai_rub_cost=12,
+        moderation_status="moderation",
+        moderation_comment=None,
+        publication_at=None,
+        created_at="2025-01-01T12:00:00+00:00",
+    )
+
+
+def _context(moderation_list: list, current: model.Publication) -> dict:
+    # Форма контекста aiogram-dialog в хранилище
+    original_publication = {
+        "id": current.id,
+        "creator_id": current.creator_id,
+        "text": current.text,
+        "category_id": current.category_id,
+        "image_url": f"https://loom/api/content/publication/{current.id}/image/download",
+        "has_image": True,
+        "moderation_status": current.moderation_status,
+        "created_at": current.created_at,
+    }
+    return {
+        "intent_id": "aB3dE5fG",
+        "stack_id": "",
+        "state": "ModerationPublicationStates:moderation_list",
+        "start_data": None,
+        "dialog_data": {
+            "moderation_list": moderation_list,
+            "current_index": 0,
+            "original_publication": original_publication,
+            "working_publication": dict(original_publication),
+            "selected_social_networks": {"telegram_checkbox": True, "vkontakte_checkbox": False},
+        },
+        "widget_data": {},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--publications", type=int, default=20)
+    parser.add_argument("--text-length", type=int, default=1500)
+    parser.add_argument("--number", type=int, default=2000)
+    args = parser.parse_args()
+
+    publications = [_publication(publication_id, args.text_length) for publication_id in range(1, args.publications + 1)]
+    variants = {
+        "before": _context([pub.to_dict() for pub in publications], publications[0]),
+        "after": _context([pub.id for pub in publications], publications[0]),
+    }
+
+    print(f"{'variant':<8} {'bytes':>10} {'dumps, us':>10} {'loads, us':>10}")
+    for name, context in variants.items():
+        payload = json.dumps(context)
+        dumps_us = timeit.timeit(lambda: json.dumps(context), number=args.number) / args.number * 1_000_000
+        loads_us = timeit.timeit(lambda: json.loads(payload), number=args.number) / args.number * 1_000_000
+        print(f"{name:<8} {len(payload.encode()):>10} {dumps_us:>10.1f} {loads_us:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,371 @@
+"""
+Фейковые внешние сервисы для нагрузочного теста: Bot API Telegram, loom-* и Anthropic.
+
+Все три - aiohttp-приложения в цикле событий теста. У каждого своя задержка ответа и доля
+ошибок 500. Фейк Bot API запоминает последнее сообщение бота в каждом чате вместе с inline-клавиатурой:
+по ней сценарий находит callback_data кнопки окна aiogram-dialog.
+"""
+import asyncio
+import json
+import random
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+
+from aiohttp import web
+
+BOT_USER = {"id": 1, "is_bot": True, "first_name": "Loom", "username": "loom_load_test_bot"}
+
+# Разделитель id контекста и id виджета в callback_data aiogram-dialog
+CALLBACK_SEPARATOR = "\x1d"
+
+_EDIT_METHODS = {"editmessagetext", "editmessagecaption", "editmessagemedia", "editmessagereplymarkup"}
+_SEND_METHODS = {"sendmessage", "sendphoto", "senddocument", "sendvideo", "sendanimation", "sendaudio", "sendvoice"}
+_PHOTO_METHODS = {"sendphoto", "editmessagemedia"}
+
+TEXT = "<b>Кейс</b> проекта за неделю, подробности и выводы для клиентов. " * 20
+
+
+@dataclass
+class Fault:
+    """Задержка ответа (среднее, разброс +-50%) и доля ответов 500."""
+    latency: float = 0.0
+    error_rate: float = 0.0
+
+    async def apply(self) -> bool:
+        if self.latency:
+            await asyncio.sleep(self.latency * random.uniform(0.5, 1.5))
+        return random.random() < self.error_rate
+
+
+@dataclass
+class ChatScreen:
+    message_id: int = 0
+    text: str = ""
+    buttons: list[str] = field(default_factory=list)
+
+
+class FakeBotApi:
+    def __init__(self, fault: Fault):
+        self.fault = fault
+        self.calls: Counter = Counter()
+        self.errors = 0
+        self.screens: dict[int, ChatScreen] = {}
+        self._message_ids: Counter = Counter()
+
+    def app(self) -> web.Application:
+        app = web.Application(client_max_size=64 * 1024 * 1024)
+        app.router.add_post("/bot{token}/{method}", self.handle)
+        return app
+
+    def screen(self, chat_id: int) -> ChatScreen:
+        return self.screens.setdefault(chat_id, ChatScreen())
+
+    async def handle(self, request: web.Request) -> web.Response:
+        method = request.match_info["method"].lower()
+        params = dict(await request.post())
+        self.calls[method] += 1
+
+        if method == "getme":
+            return self._ok(BOT_USER)
+
+        if await self.fault.apply():
+            self.errors += 1
+            return web.json_response(
+                {"ok": False, "error_code": 500, "description": "Internal Server Error: injected"},
+                status=500,
+            )
+
+        if method in _SEND_METHODS or method in _EDIT_METHODS:
+            return self._ok(self._message(method, params))
+        return self._ok(True)
+
+    def _message(self, method: str, params: dict) -> dict:
+        chat_id = int(params.get("chat_id", 0))
+        if method in _EDIT_METHODS and params.get("message_id"):
+            message_id = int(params["message_id"])
+        else:
+            self._message_ids[chat_id] += 1
+            message_id = self._message_ids[chat_id]
+
+        text = params.get("text") or params.get("caption") or ""
+        screen = self.screen(chat_id)
+        if message_id >= screen.message_id:
+            # Правка без reply_markup убирает клавиатуру, как в Telegram
+            screen.message_id = message_id
+            screen.text = text
+            screen.buttons = _callback_buttons(params.get("reply_markup"))
+
+        message = {
+            "message_id": message_id,
+            "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "private"},
+            "from": BOT_USER,
+        }
+        if method in _PHOTO_METHODS:
+            message["photo"] = [{"file_id": f"photo-{message_id}", "file_unique_id": f"u{message_id}", "width": 1280, "height": 720}]
+            message["caption"] = text
+        else:
+            message["text"] = text
+        return message
+
+    @staticmethod
+    def _ok(result) -> web.Response:
+        return web.json_response({"ok": True, "result": result})
+
+
+def _callback_buttons(reply_markup: str | None) -> list[str]:
+    if not reply_markup:
+        return []
+    markup = json.loads(reply_markup)
+    return [
+        button["callback_data"]
+        for row in markup.get("inline_keyboard", [])
+        for button in row
+        if button.get("callback_data")
+    ]
+
+
+def find_button(buttons: list[str], widget: str) -> str | None:
+    """callback_data кнопки виджета: точное совпадение id, для Select - префикс "<id>:"."""
+    for callback_data in buttons:
+        widget_data = callback_data.rsplit(CALLBACK_SEPARATOR, 1)[-1]
+        if widget_data == widget or (widget.endswith(":") and widget_data.startswith(widget)):
+            return callback_data
+    return None
+
+
+class FakeLoomServices:
+    """
+    loom-account, loom-authorization, loom-employee, loom-organization и loom-content на одном порту:
+    у клиентов разные префиксы /api/<сервис>. Генерация текста и картинок отвечает с отдельной задержкой,
+    так как за ней в loom-content стоит вызов LLM.
+    """
+
+    def __init__(self, fault: Fault, generation_fault: Fault, moderation_publications: int):
+        self.fault = fault
+        self.generation_fault = generation_fault
+        self.moderation_publications = moderation_publications
+        self.calls: Counter = Counter()
+        self.unhandled: Counter = Counter()
+        self.errors = 0
+
+    def app(self) -> web.Application:
+        app = web.Application(client_max_size=64 * 1024 * 1024)
+        routes = [
+            ("GET", "/api/employee/account/{account_id}", self.employee_by_account),
+            ("GET", "/api/employee/organization/{organization_id}/employees", self.employees),
+            ("GET", "/api/employee/{account_id}/permissions/check", self.permission_check),
+            ("GET", "/api/organization/cost-multiplier/{organization_id}", self.cost_multiplier),
+            ("GET", "/api/organization/{organization_id}", self.organization),
+            ("GET", "/api/content/social-network/organization/{organization_id}", self.social_networks),
+            ("GET", "/api/content/publication/organization/{organization_id}/publications", self.publications),
+            ("GET", "/api/content/publication/organization/{organization_id}/categories", self.categories),
+            ("GET", "/api/content/publication/category/{category_id}", self.category),
+            ("GET", "/api/content/publication/{publication_id}", self.publication),
+            ("GET", "/api/content/organization/{organization_id}/video-cuts", self.empty_list),
+            ("POST", "/api/content/publication/text/generate", self.generate_text),
+            ("POST", "/api/content/publication/text/regenerate", self.generate_text),
+            ("POST", "/api/content/publication/image/generate", self.generate_image),
+        ]
+        for method, path, handler in routes:
+            app.router.add_route(method, path, self._wrap(path, handler))
+        app.router.add_route("*", "/{tail:.*}", self.fallback)
+        return app
+
+    def _wrap(self, route: str, handler):
+        fault = self.generation_fault if "/generate" in route or "/regenerate" in route else self.fault
+
+        async def wrapper(request: web.Request) -> web.Response:
+            self.calls[f"{request.method} {route}"] += 1
+            if await fault.apply():
+                self.errors += 1
+                return web.json_response({"error": "injected"}, status=500)
+            return await handler(request)
+
+        return wrapper
+
+    async def fallback(self, request: web.Request) -> web.Response:
+        # Маршрут, которого нет в фейке: сценарий ушел в непокрытую ветку, это видно в отчете
+        self.unhandled[f"{request.method} {request.path}"] += 1
+        if await self.fault.apply():
+            self.errors += 1
+            return web.json_response({"error": "injected"}, status=500)
+        return web.json_response({})
+
+    async def employee_by_account(self, request: web.Request) -> web.Response:
+        return web.json_response([_employee(int(request.match_info["account_id"]))])
+
+    async def employees(self, request: web.Request) -> web.Response:
+        return web.json_response({"employees": [_employee(account_id) for account_id in range(1, 4)]})
+
+    async def permission_check(self, request: web.Request) -> web.Response:
+        return web.json_response({"has_permission": True})
+
+    async def organization(self, request: web.Request) -> web.Response:
+        return web.json_response({
+            "id": int(request.match_info["organization_id"]),
+            "name": "Нагрузочный тест",
+            "description": "Организация для нагрузочного теста",
+            "rub_balance": "100000",
+            "tone_of_voice": ["дружелюбный"],
+            "compliance_rules": [],
+            "additional_info": [],
+            "products": [],
+            "locale": {},
+            "created_at": "2025-01-01T12:00:00+00:00",
+        })
+
+    async def cost_multiplier(self, request: web.Request) -> web.Response:
+        return web.json_response({
+            "id": 1,
+            "organization_id": int(request.match_info["organization_id"]),
+            "generate_text_cost_multiplier": 1.0,
+            "transcribe_audio_cost_multiplier": 1.0,
+            "generate_image_cost_multiplier": 1.0,
+            "generate_vizard_video_cut_cost_multiplier": 1.0,
+            "created_at": "2025-01-01T12:00:00+00:00",
+        })
+
+    async def social_networks(self, request: web.Request) -> web.Response:
+        return web.json_response({"data": {
+            "telegram": [{"id": 1, "tg_channel_username": "loom_load_test", "autoselect": True}],
+            "vkontakte": [],
+        }})
+
+    async def publications(self, request: web.Request) -> web.Response:
+        organization_id = int(request.match_info["organization_id"])
+        return web.json_response([
+            _publication(publication_id, organization_id)
+            for publication_id in range(1, self.moderation_publications + 1)
+        ])
+
+    async def publication(self, request: web.Request) -> web.Response:
+        return web.json_response(_publication(int(request.match_info["publication_id"]), 1))
+
+    async def categories(self, request: web.Request) -> web.Response:
+        organization_id = int(request.match_info["organization_id"])
+        return web.json_response([_category(category_id, organization_id) for category_id in range(1, 4)])
+
+    async def category(self, request: web.Request) -> web.Response:
+        return web.json_response(_category(int(request.match_info["category_id"]), 1))
+
+    async def empty_list(self, request: web.Request) -> web.Response:
+        return web.json_response([])
+
+    async def generate_text(self, request: web.Request) -> web.Response:
+        return web.json_response({"text": TEXT, "rub_cost": 3})
+
+    async def generate_image(self, request: web.Request) -> web.Response:
+        return web.json_response([f"https://loom-load-test/image/{index}.png" for index in range(2)])
+
+
+class FakeAnthropic:
+    """Messages API: приложение ходит сюда через ANTHROPIC_BASE_URL."""
+
+    def __init__(self, fault: Fault):
+        self.fault = fault
+        self.calls = 0
+        self.errors = 0
+
+    def app(self) -> web.Application:
+        app = web.Application(client_max_size=64 * 1024 * 1024)
+        app.router.add_post("/v1/messages", self.messages)
+        return app
+
+    async def messages(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        self.calls += 1
+        if await self.fault.apply():
+            self.errors += 1
+            return web.json_response(
+                {"type": "error", "error": {"type": "api_error", "message": "injected"}},
+                status=500,
+            )
+
+        return web.json_response({
+            "id": f"msg_{self.calls}",
+            "type": "message",
+            "role": "assistant",
+            "model": body.get("model", "claude-haiku-4-5"),
+            "content": [{"type": "text", "text": json.dumps({"message_to_user": TEXT}, ensure_ascii=False)}],
+            "stop_reason": "end_turn",
+            "stop_sequence": None,
+            "usage": {"input_tokens": 1200, "output_tokens": 400},
+        })
+
+
+async def start(app: web.Application, port: int) -> web.AppRunner:
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", port).start()
+    return runner
+
+
+def _employee(account_id: int) -> dict:
+    return {
+        "id": account_id,
+        "organization_id": 1,
+        "account_id": account_id,
+        "invited_from_account_id": 0,
+        "required_moderation": False,
+        "autoposting_permission": True,
+        "add_employee_permission": True,
+        "edit_employee_perm_permission": True,
+        "top_up_balance_permission": True,
+        "sign_up_social_net_permission": True,
+        "setting_category_permission": True,
+        "setting_organization_permission": True,
+        "name": f"Сотрудник {account_id}",
+        "role": "admin",
+        "created_at": "2025-01-01T12:00:00+00:00",
+    }
+
+
+def _publication(publication_id: int, organization_id: int) -> dict:
+    return {
+        "id": publication_id,
+        "organization_id": organization_id,
+        "category_id": publication_id % 3 + 1,
+        "creator_id": 1,
+        "moderator_id": None,
+        "vk_source": False,
+        "tg_source": True,
+        "vk_link": None,
+        "tg_link": None,
+        "text_reference": "Голосовое сотрудника о кейсе клиента",
+        "text": TEXT,
+        # Без картинки: иначе окно отдает Telegram ссылку на loom-content, фейк ее не скачивает
+        "image_fid": None,
+        "image_name": None,
+        "openai_rub_cost": 3,
+        "moderation_status": "moderation",
+        "moderation_comment": None,
+        "publication_at": None,
+        "created_at": "2025-01-01T12:00:00+00:00",
+    }
+
+
+def _category(category_id: int, organization_id: int) -> dict:
+    return {
+        "id": category_id,
+        "organization_id": organization_id,
+        "name": f"Рубрика {category_id}",
+        "hint": "Расскажите о кейсе клиента",
+        "goal": "Показать экспертизу",
+        "tone_of_voice": ["дружелюбный"],
+        "brand_rules": [],
+        "creativity_level": 5,
+        "audience_segment": "B2B",
+        "len_min": 200,
+        "len_max": 1200,
+        "n_hashtags_min": 1,
+        "n_hashtags_max": 3,
+        "cta_type": "none",
+        "cta_strategy": {},
+        "good_samples": [],
+        "bad_samples": [],
+        "additional_info": [],
+        "prompt_for_image_style": "",
+        "created_at": "2025-01-01T12:00:00+00:00",
+    }
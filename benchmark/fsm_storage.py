@@ -0,0 +1,224 @@
+"""
+Хранилище FSM на одно обновление: стандартный RedisStorage против BatchedRedisStorage.
+
+Повторяет обращения aiogram-dialog за обновление (чтение стека и контекста, запись контекста и стека)
+для самых тяжелых диалогов. Redis заменен in-memory двойником с фиксированной задержкой на round-trip,
+поэтому видно и стоимость сериализации, и число обращений к сети.
+
+Запуск из корня репозитория:
+    python -m benchmark.fsm_storage --updates 2000 --rtt-ms 0.5
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from aiogram.fsm.storage.base import DefaultKeyBuilder, StorageKey
+from aiogram.fsm.storage.redis import RedisStorage
+
+from benchmark.telemetry import BenchmarkTelemetry
+from infrastructure.fsm_storage.fsm_storage import BatchedRedisStorage
+
+
+class _Pipeline:
+    def __init__(self, redis: "_LatencyRedis"):
+        self.redis = redis
+        self.command_stack = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return None
+
+    def set(self, key, value, ex=None):
+        self.command_stack.append(("set", key, value))
+
+    def delete(self, key):
+        self.command_stack.append(("delete", key, None))
+
+    def expire(self, key, ttl):
+        self.command_stack.append(("expire", key, None))
+
+    async def execute(self):
+        await self.redis.round_trip()
+        for command, key, value in self.command_stack:
+            if command == "set":
+                self.redis.data[key] = self.redis.encode(value)
+                self.redis.bytes_written += len(self.redis.data[key])
+            elif command == "delete":
+                self.redis.data.pop(key, None)
+
+
+class _LatencyRedis:
+    def __init__(self, rtt: float):
+        self.rtt = rtt
+        self.data: dict[str, bytes] = {}
+        self.round_trips = 0
+        self.bytes_written = 0
+
+    async def round_trip(self):
+        self.round_trips += 1
+        await asyncio.sleep(self.rtt)
+
+    @staticmethod
+    def encode(value) -> bytes:
+        return value if isinstance(value, bytes) else str(value).encode()
+
+    async def get(self, key):
+        await self.round_trip()
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None):
+        await self.round_trip()
+        self.data[key] = self.encode(value)
+        self.bytes_written += len(self.data[key])
+
+    async def delete(self, key):
+        await self.round_trip()
+        self.data.pop(key, None)
+
+    def pipeline(self, transaction: bool = True):
+        return _Pipeline(self)
+
+
+def _stack(intents: list[str]) -> dict:
+    return {
+        "id": "",
+        "intents": intents,
+        "last_message_id": 1024,
+        "last_reply_keyboard": False,
+        "last_media_id": "AgACAgIAAxkBAAIB",
+        "last_media_unique_id": "AQADb8kxG",
+        "last_income_media_group_id": None,
+        "access_settings": None,
+    }
+
+
+def _context(intent_id: str, state: str, dialog_data: dict) -> dict:
+    return {
+        "intent_id": intent_id,
+        "stack_id": "",
+        "state": state,
+        "start_data": None,
+        "dialog_data": dialog_data,
+        "widget_data": {"social_network_select": ["telegram"]},
+    }
+
+
+def _flows() -> dict[str, tuple[dict, dict]]:
+    text = "<b>Кейс</b> проекта за неделю, подробности и выводы для клиентов. " * 40
+    publication = {
+        "id": 42,
+        "creator_id": 7,
+        "text": text,
+        "category_id": 3,
+        "image_url": "https://loom/api/content/publication/42/image/download",
+        "has_image": True,
+        "moderation_status": "moderation",
+        "created_at": "2025-01-01T12:00:00+00:00",
+    }
+    return {
+        "generate": (
+            _stack(["gp000001"]),
+            _context("gp000001", "GeneratePublicationStates:preview", {
+                "category_id": 3,
+                "category_name": "Кейсы",
+                "input_text": "Голосовое сотрудника о кейсе клиента. " * 30,
+                "publication_text": text,
+                "generated_images_url": [f"https://loom/image/{index}.png" for index in range(4)],
+                "current_image_index": 0,
+                "has_image": True,
+                "selected_social_networks": {"telegram_checkbox": True, "vkontakte_checkbox": True},
+            }),
+        ),
+        "draft": (
+            _stack(["mm000001", "dp000001"]),
+            _context("dp000001", "DraftPublicationStates:draft_list", {
+                "draft_list": list(range(1, 21)),
+                "current_index": 0,
+                "original_publication": publication,
+                "working_publication": dict(publication),
+            }),
+        ),
+        "moderation": (
+            _stack(["mm000001", "mp000001"]),
+            _context("mp000001", "ModerationPublicationStates:moderation_list", {
+                "moderation_list": list(range(1, 21)),
+                "current_index": 0,
+                "original_publication": publication,
+                "working_publication": dict(publication),
+                "selected_social_networks": {"telegram_checkbox": True, "vkontakte_checkbox": False},
+            }),
+        ),
+    }
+
+
+async def _update(storage: RedisStorage, stack_key: StorageKey, context_key: StorageKey, change: bool) -> None:
+    # Последовательность StorageProxy aiogram-dialog: загрузить стек и контекст, сохранить оба
+    stack = await storage.get_data(stack_key)
+    context = await storage.get_data(context_key)
+    if change:
+        context["widget_data"]["scroll"] = context["widget_data"].get("scroll", 0) + 1
+    await storage.set_data(context_key, context)
+    await storage.set_data(stack_key, stack)
+
+
+async def run(variant: str, flow: str, updates: int, rtt: float, change: bool) -> dict:
+    redis = _LatencyRedis(rtt)
+    key_builder = DefaultKeyBuilder(with_destiny=True)
+    if variant == "stock":
+        storage = RedisStorage(redis=redis, key_builder=key_builder)
+    else:
+        storage = BatchedRedisStorage(BenchmarkTelemetry(), redis=redis, key_builder=key_builder)
+
+    stack, context = _flows()[flow]
+    stack_key = StorageKey(bot_id=1, chat_id=1, user_id=1, destiny="aiogd_stack")
+    context_key = StorageKey(bot_id=1, chat_id=1, user_id=1, destiny="aiogd_context")
+    redis.data[key_builder.build(stack_key, "data")] = json.dumps(stack).encode()
+    redis.data[key_builder.build(context_key, "data")] = json.dumps(context).encode()
+
+    async def _handler(event, data):
+        await _update(storage, stack_key, context_key, change)
+
+    async def _process():
+        if variant == "stock":
+            await _handler(None, {})
+        else:
+            await storage.batch_middleware(_handler, None, {})
+
+    # Первое обновление переписывает старый json.dumps в формат хранилища
+    await _process()
+    redis.round_trips = redis.bytes_written = 0
+
+    started_at = time.perf_counter()
+    for _ in range(updates):
+        await _process()
+    elapsed = time.perf_counter() - started_at
+
+    return {
+        "us_per_update": elapsed / updates * 1_000_000,
+        "round_trips": redis.round_trips / updates,
+        "bytes_written": redis.bytes_written / updates,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--updates", type=int, default=2000)
+    parser.add_argument("--rtt-ms", type=float, default=0.5)
+    args = parser.parse_args()
+
+    print(f"{'flow':<11} {'change':<7} {'variant':<8} {'us/update':>10} {'round trips':>12} {'bytes written':>14}")
+    for flow in _flows():
+        for change in (True, False):
+            for variant in ("stock", "batched"):
+                result = await run(variant, flow, args.updates, args.rtt_ms / 1000, change)
+                print(
+                    f"{flow:<11} {str(change):<7} {variant:<8} {result['us_per_update']:>10.1f} "
+                    f"{result['round_trips']:>12.1f} {result['bytes_written']:>14.0f}"
+                )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,150 @@
+"""
+Накладные расходы HTTP middleware на маршруте вебхука.
+
+Сравнивает три сборки приложения на одном и том же быстром обработчике /update:
+  - none   - без middleware (нижняя граница);
+  - legacy - прежние @app.middleware("http") на BaseHTTPMiddleware;
+  - asgi   - текущий HttpMiddleware на чистом ASGI.
+
+Запуск из корня репозитория:
+    python -m benchmark.http_middleware --requests 5000 --concurrency 50
+"""
+import argparse
+import asyncio
+import time
+from contextvars import ContextVar
+from typing import Callable
+
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from opentelemetry import propagate
+from opentelemetry.semconv.trace import SpanAttributes
+from opentelemetry.trace import SpanKind, Status, StatusCode
+
+from benchmark.telemetry import BenchmarkTelemetry
+from internal import common
+from internal.controller.http.middlerware.middleware import HttpMiddleware
+
+PREFIX = "/api/tg-bot"
+UPDATE = {"update_id": 1, "message": {"message_id": 1, "date": 0, "chat": {"id": 1, "type": "private"}, "text": "hi"}}
+
+
+def include_legacy_middleware(app: FastAPI, tel: BenchmarkTelemetry, log_context: ContextVar[dict]):
+    tracer = tel.tracer()
+    logger = tel.logger()
+
+    @app.middleware("http")
+    async def _logger_middleware02(request: Request, call_next: Callable):
+        context_token = log_context.set({
+            common.TELEGRAM_USER_USERNAME_KEY: request.headers.get(common.TELEGRAM_USER_USERNAME_KEY, ""),
+            common.TELEGRAM_CHAT_ID_KEY: request.headers.get(common.TELEGRAM_CHAT_ID_KEY, "0"),
+            common.TELEGRAM_EVENT_TYPE_KEY: request.headers.get(common.TELEGRAM_EVENT_TYPE_KEY, ""),
+            common.ORGANIZATION_ID_KEY: request.headers.get(common.ORGANIZATION_ID_KEY, "0"),
+            common.ACCOUNT_ID_KEY: request.headers.get(common.ACCOUNT_ID_KEY, "0"),
+        })
+        try:
+            response = await call_next(request)
+            if 400 <= response.status_code < 500:
+                logger.warning("Обработка HTTP запроса завершена с ошибкой клиента")
+            return response
+        finally:
+            log_context.reset(context_token)
+
+    @app.middleware("http")
+    async def _trace_middleware01(request: Request, call_next: Callable):
+        if PREFIX not in request.url.path:
+            return JSONResponse(status_code=404, content={"error": "not found"})
+        with tracer.start_as_current_span(
+                f"{request.method} {request.url.path}",
+                context=propagate.extract(dict(request.headers)),
+                kind=SpanKind.SERVER,
+                attributes={
+                    SpanAttributes.HTTP_ROUTE: str(request.url.path),
+                    SpanAttributes.HTTP_METHOD: request.method,
+                }
+        ) as root_span:
+            try:
+                response = await call_next(request)
+                root_span.set_attributes({SpanAttributes.HTTP_STATUS_CODE: response.status_code})
+                response_size = response.headers.get("content-length")
+                if response_size:
+                    root_span.set_attribute(SpanAttributes.HTTP_RESPONSE_BODY_SIZE, int(response_size))
+                root_span.set_status(Status(StatusCode.OK))
+                return response
+            except Exception as err:
+                root_span.set_status(StatusCode.ERROR, str(err))
+                return JSONResponse(status_code=500, content={"message": "Internal Server Error"})
+
+
+def new_app(variant: str) -> FastAPI:
+    app = FastAPI()
+    tel = BenchmarkTelemetry()
+    log_context: ContextVar[dict] = ContextVar("log_context", default={})
+
+    if variant == "legacy":
+        include_legacy_middleware(app, tel, log_context)
+    elif variant == "asgi":
+        http_middleware = HttpMiddleware(tel, PREFIX, log_context)
+        http_middleware.logger_middleware02(app)
+        http_middleware.trace_middleware01(app)
+
+    async def bot_webhook(update: dict):
+        return None
+
+    app.add_api_route(PREFIX + "/update", bot_webhook, methods=["POST"])
+    return app
+
+
+async def run(variant: str, requests: int, concurrency: int) -> dict:
+    app = new_app(variant)
+    transport = httpx.ASGITransport(app=app)
+    latencies = []
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # Прогрев: импорт маршрутов, валидация моделей, первые спаны
+        for _ in range(100):
+            await client.post(PREFIX + "/update", json=UPDATE)
+
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def _request():
+            async with semaphore:
+                started_at = time.perf_counter()
+                response = await client.post(PREFIX + "/update", json=UPDATE)
+                latencies.append(time.perf_counter() - started_at)
+                assert response.status_code == 200, response.text
+
+        started_at = time.perf_counter()
+        await asyncio.gather(*[_request() for _ in range(requests)])
+        elapsed = time.perf_counter() - started_at
+
+    latencies.sort()
+    return {
+        "variant": variant,
+        "rps": requests / elapsed,
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99)] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    results = [asyncio.run(run(variant, args.requests, args.concurrency)) for variant in ("none", "legacy", "asgi")]
+    baseline = results[0]
+
+    print(f"{'variant':<8} {'rps':>10} {'p50, ms':>10} {'p99, ms':>10} {'overhead/req, us':>18}")
+    for result in results:
+        overhead = (1 / result["rps"] - 1 / baseline["rps"]) * 1_000_000
+        print(
+            f"{result['variant']:<8} {result['rps']:>10.0f} {result['p50_ms']:>10.2f} "
+            f"{result['p99_ms']:>10.2f} {overhead:>18.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,451 @@
+"""
+Сквозной нагрузочный тест: настоящее приложение (main:app из NewServer) под сценариями пользователей.
+
+Поднимает фейки Bot API, loom-* и Anthropic (benchmark/fake_services.py) с заданными задержками и долей
+ошибок, запускает uvicorn main:app с переменными окружения, указывающими на них, и создает пользователей
+с организацией прямо в PostgreSQL. Виртуальные пользователи шлют на /update обновления по сценариям
+"старт -> главное меню -> генерация публикации" и "старт -> модерация с листанием"; следующую кнопку
+сценарий находит в клавиатуре последнего сообщения бота. Вебхук принудительно в режиме inline, поэтому
+время ответа /update - это полное время обработки обновления.
+
+Отчет: обновления в секунду, p50/p95/p99 по окнам диалогов, CPU и RSS процесса приложения, обращения к фейкам.
+
+Нужны PostgreSQL и Redis из обычных переменных окружения приложения (по умолчанию localhost).
+Запуск из корня репозитория:
+    python -m benchmark.load_test --users 50 --seconds 60 --loom-latency-ms 20 --generation-latency-ms 2000
+"""
+import argparse
+import asyncio
+import itertools
+import os
+import random
+import signal
+import socket
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+
+import httpx
+
+from benchmark import fake_services
+from benchmark.telemetry import BenchmarkTelemetry
+from infrastructure.pg.pg import PG
+from infrastructure.redis_client.redis_client import RedisClient
+from internal.config.config import Config
+
+SECRET = "secret"
+TOKEN = "123456:load-test"
+# Чаты пользователей теста не пересекаются с настоящими tg_chat_id
+FIRST_CHAT_ID = 9_000_000_000
+ORGANIZATION_ID = 1
+
+PROMPT = "Голосовое сотрудника о кейсе клиента: запустили рассылку, конверсия выросла вдвое за месяц."
+
+
+@dataclass
+class Step:
+    window: str
+    # command | click | text
+    action: str
+    value: str
+
+
+START = Step("start", "command", "/start")
+
+JOURNEYS = {
+    "generate_publication": [
+        START,
+        Step("MainMenuStates.main_menu", "click", "content_generation"),
+        Step("ContentMenuStates.content_menu", "click", "create_content"),
+        Step("ContentMenuStates.select_content_type", "click", "create_publication"),
+        Step("GeneratePublicationStates.select_category", "click", "category_select:"),
+        Step("GeneratePublicationStates.generate_text_prompt_input", "text", PROMPT),
+        Step("GeneratePublicationStates.generation", "click", "text_only"),
+    ],
+    "moderation": [
+        START,
+        Step("MainMenuStates.main_menu", "click", "content_generation"),
+        Step("ContentMenuStates.content_menu", "click", "moderation"),
+        Step("ContentMenuStates.select_moderation_type", "click", "publication_moderation"),
+    ],
+}
+MODERATION_PAGE = Step("ModerationPublicationStates.moderation_list", "click", "next_publication")
+
+
+class Stats:
+    def __init__(self):
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.errors: dict[str, int] = defaultdict(int)
+        self.missing_buttons: dict[str, int] = defaultdict(int)
+        self.journeys: dict[str, int] = defaultdict(int)
+        self.recording = False
+
+    def record(self, window: str, latency: float, ok: bool) -> None:
+        if not self.recording:
+            return
+        self.latencies[window].append(latency)
+        if not ok:
+            self.errors[window] += 1
+
+    def updates(self) -> int:
+        return sum(len(latencies) for latencies in self.latencies.values())
+
+
+class VirtualUser:
+    def __init__(
+            self,
+            client: httpx.AsyncClient,
+            bot_api: fake_services.FakeBotApi,
+            stats: Stats,
+            update_ids: itertools.count,
+            chat_id: int,
+            journeys: list[str],
+            moderation_pages: int,
+            think_time: float,
+    ):
+        self.client = client
+        self.bot_api = bot_api
+        self.stats = stats
+        self.update_ids = update_ids
+        self.chat_id = chat_id
+        self.journeys = journeys
+        self.moderation_pages = moderation_pages
+        self.think_time = think_time
+        self.user = {"id": chat_id, "is_bot": False, "first_name": "Load", "username": f"load_{chat_id}"}
+
+    async def run(self, deadline: float) -> None:
+        while time.monotonic() < deadline:
+            journey = random.choice(self.journeys)
+            steps = JOURNEYS[journey]
+            if journey == "moderation":
+                steps = steps + [MODERATION_PAGE] * self.moderation_pages
+
+            for step in steps:
+                if time.monotonic() >= deadline:
+                    return
+                if not await self._send(step):
+                    break
+                if self.think_time:
+                    await asyncio.sleep(self.think_time * random.uniform(0.5, 1.5))
+            else:
+                if self.stats.recording:
+                    self.stats.journeys[journey] += 1
+
+    async def _send(self, step: Step) -> bool:
+        update = self._update(step)
+        if update is None:
+            if self.stats.recording:
+                self.stats.missing_buttons[step.window] += 1
+            return False
+
+        started_at = time.perf_counter()
+        try:
+            response = await self.client.post(
+                "/update",
+                json=update,
+                headers={"X-Telegram-Bot-Api-Secret-Token": SECRET},
+            )
+            ok = response.status_code == 200
+        except httpx.HTTPError:
+            ok = False
+        self.stats.record(step.window, time.perf_counter() - started_at, ok)
+        return ok
+
+    def _update(self, step: Step) -> dict | None:
+        update_id = next(self.update_ids)
+        screen = self.bot_api.screen(self.chat_id)
+
+        if step.action == "click":
+            callback_data = fake_services.find_button(screen.buttons, step.value)
+            if callback_data is None:
+                return None
+            return {
+                "update_id": update_id,
+                "callback_query": {
+                    "id": str(update_id),
+                    "from": self.user,
+                    "chat_instance": str(self.chat_id),
+                    "data": callback_data,
+                    "message": {
+                        "message_id": screen.message_id,
+                        "date": int(time.time()),
+                        "chat": {"id": self.chat_id, "type": "private"},
+                        "from": fake_services.BOT_USER,
+                        "text": screen.text,
+                    },
+                },
+            }
+
+        message = {
+            "message_id": update_id,
+            "date": int(time.time()),
+            "chat": {"id": self.chat_id, "type": "private"},
+            "from": self.user,
+            "text": step.value,
+        }
+        if step.action == "command":
+            message["entities"] = [{"type": "bot_command", "offset": 0, "length": len(step.value)}]
+        return {"update_id": update_id, "message": message}
+
+
+class ProcessUsage:
+    """CPU и RSS процесса приложения по /proc (Linux)."""
+
+    def __init__(self, pid: int):
+        self.pid = pid
+        self.ticks = os.sysconf("SC_CLK_TCK")
+        self.peak_rss_mb = 0.0
+
+    def cpu_seconds(self) -> float:
+        with open(f"/proc/{self.pid}/stat") as file:
+            # utime и stime - 14-е и 15-е поля после имени процесса в скобках
+            fields = file.read().rsplit(")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / self.ticks
+
+    def rss_mb(self) -> float:
+        with open(f"/proc/{self.pid}/status") as file:
+            for line in file:
+                if line.startswith("VmRSS:"):
+                    rss_mb = int(line.split()[1]) / 1024
+                    self.peak_rss_mb = max(self.peak_rss_mb, rss_mb)
+                    return rss_mb
+        return 0.0
+
+    async def watch_rss(self, interval: float = 0.5) -> None:
+        while True:
+            self.rss_mb()
+            await asyncio.sleep(interval)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _app_env(send_rate_unlimited: bool, bot_api_port: int, loom_port: int, anthropic_port: int) -> dict:
+    env = {
+        # Без настоящих значений Config не собирается; Telethon в сценариях не участвует
+        "LOOM_TG_API_ID": "1",
+        "LOOM_TG_API_HASH": "load-test",
+        "LOOM_TG_SESSION_STRING": "",
+        "LOOM_DOMAIN": "loom-load-test",
+        "LOOM_INTERSERVER_SECRET_KEY": "load-test",
+        "LOOM_ALERT_TG_BOT_TOKEN": TOKEN,
+        **os.environ,
+        "LOOM_TG_BOT_TOKEN": TOKEN,
+        "LOOM_TG_BOT_API_URL": f"http://127.0.0.1:{bot_api_port}",
+        "ANTHROPIC_BASE_URL": f"http://127.0.0.1:{anthropic_port}",
+        "ANTHROPIC_API_KEY": "load-test",
+        "LOOM_TG_BOT_WEBHOOK_MODE": "inline",
+        "LOOM_TG_BOT_HTTP_WORKERS": "1",
+    }
+    for service in ("ACCOUNT", "AUTHORIZATION", "EMPLOYEE", "ORGANIZATION", "CONTENT"):
+        env[f"LOOM_{service}_CONTAINER_NAME"] = "127.0.0.1"
+        env[f"LOOM_{service}_PORT"] = str(loom_port)
+    if send_rate_unlimited:
+        # Фейк Bot API не ограничивает частоту - лимиты планировщика только растягивают замер
+        env["LOOM_TG_BOT_SEND_GLOBAL_RATE"] = "100000"
+        env["LOOM_TG_BOT_SEND_CHAT_RATE"] = "1000"
+        env["LOOM_TG_BOT_SEND_CHAT_BURST"] = "1000"
+    return env
+
+
+async def _wait_ready(client: httpx.AsyncClient, server: subprocess.Popen, timeout: float = 60) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"приложение завершилось с кодом {server.returncode}")
+        try:
+            if (await client.get("/health", timeout=1)).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        await asyncio.sleep(0.3)
+    raise RuntimeError("приложение не поднялось")
+
+
+async def _check_backends() -> None:
+    # Без PostgreSQL и Redis приложение отвечает 500 на первом же шаге - проверяем заранее и понятно
+    cfg = Config()
+    failures = []
+
+    db = PG(BenchmarkTelemetry(), cfg.db_user, cfg.db_pass, cfg.db_host, cfg.db_port, cfg.db_name)
+    try:
+        await asyncio.wait_for(db.warmup(1), timeout=5)
+    except Exception as err:
+        failures.append(f"PostgreSQL {cfg.db_host}:{cfg.db_port}/{cfg.db_name}: {err!r}")
+
+    redis_client = RedisClient(
+        cfg.monitoring_redis_host,
+        cfg.monitoring_redis_port,
+        cfg.monitoring_redis_db,
+        cfg.monitoring_redis_password,
+    )
+    try:
+        await asyncio.wait_for(redis_client.ping(), timeout=5)
+    except Exception as err:
+        failures.append(f"Redis {cfg.monitoring_redis_host}:{cfg.monitoring_redis_port}: {err!r}")
+
+    if failures:
+        raise SystemExit("Нагрузочному тесту нужны PostgreSQL и Redis:\n  " + "\n  ".join(failures))
+
+
+async def _seed_users(chat_ids: list[int]) -> None:
+    # Конфиг и PG те же, что у приложения: пользователи сразу авторизованы и состоят в организации
+    cfg = Config()
+    db = PG(BenchmarkTelemetry(), cfg.db_user, cfg.db_pass, cfg.db_host, cfg.db_port, cfg.db_name)
+    for chat_id in chat_ids:
+        await db.delete("DELETE FROM user_states WHERE tg_chat_id = :tg_chat_id", {"tg_chat_id": chat_id})
+        await db.insert(
+            """
+            INSERT INTO user_states (tg_chat_id, account_id, organization_id, tg_username)
+            VALUES (:tg_chat_id, :account_id, :organization_id, :tg_username)
+            RETURNING id
+            """,
+            {
+                "tg_chat_id": chat_id,
+                "account_id": chat_id - FIRST_CHAT_ID + 1,
+                "organization_id": ORGANIZATION_ID,
+                "tg_username": f"load_{chat_id}",
+            },
+        )
+
+
+def _percentile(latencies: list[float], q: float) -> float:
+    return latencies[min(int(len(latencies) * q), len(latencies) - 1)] * 1000
+
+
+def _report(stats: Stats, elapsed: float, cpu: float, usage: ProcessUsage, bot_api, loom, anthropic) -> None:
+    updates = stats.updates()
+    print(f"updates: {updates}, updates/s: {updates / elapsed:.1f}, completed journeys: {dict(stats.journeys)}")
+    print(f"{'window':<52} {'updates':>8} {'errors':>7} {'p50, ms':>9} {'p95, ms':>9} {'p99, ms':>9}")
+    for window, latencies in stats.latencies.items():
+        latencies.sort()
+        print(
+            f"{window:<52} {len(latencies):>8} {stats.errors[window]:>7} {_percentile(latencies, 0.5):>9.1f} "
+            f"{_percentile(latencies, 0.95):>9.1f} {_percentile(latencies, 0.99):>9.1f}"
+        )
+    if stats.missing_buttons:
+        print(f"journeys aborted, button not found in window: {dict(stats.missing_buttons)}")
+
+    print(
+        f"app process: cpu {cpu:.1f} s ({cpu / elapsed * 100:.0f}% of one core), "
+        f"cpu per update {cpu / max(updates, 1) * 1000:.2f} ms, "
+        f"rss {usage.rss_mb():.0f} MB, peak rss {usage.peak_rss_mb:.0f} MB"
+    )
+    print(f"bot api calls: {dict(bot_api.calls.most_common())}, injected errors: {bot_api.errors}")
+    print(f"loom calls: {sum(loom.calls.values())}, injected errors: {loom.errors}")
+    if loom.unhandled:
+        print(f"loom routes missing in fake: {dict(loom.unhandled.most_common())}")
+    print(f"anthropic calls: {anthropic.calls}, injected errors: {anthropic.errors}")
+
+
+async def run(args) -> None:
+    bot_api = fake_services.FakeBotApi(fake_services.Fault(args.tg_latency_ms / 1000, args.tg_error_rate))
+    loom = fake_services.FakeLoomServices(
+        fake_services.Fault(args.loom_latency_ms / 1000, args.loom_error_rate),
+        fake_services.Fault(args.generation_latency_ms / 1000, args.loom_error_rate),
+        args.moderation_publications,
+    )
+    anthropic = fake_services.FakeAnthropic(fake_services.Fault(args.llm_latency_ms / 1000, args.llm_error_rate))
+
+    ports = {name: _free_port() for name in ("bot_api", "loom", "anthropic", "app")}
+    env = _app_env(args.send_rate_unlimited, ports["bot_api"], ports["loom"], ports["anthropic"])
+    os.environ.update(env)
+    await _check_backends()
+
+    runners = [
+        await fake_services.start(bot_api.app(), ports["bot_api"]),
+        await fake_services.start(loom.app(), ports["loom"]),
+        await fake_services.start(anthropic.app(), ports["anthropic"]),
+    ]
+    server = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "main:app",
+            "--port", str(ports["app"]), "--log-level", "warning", "--no-access-log",
+        ],
+        env=env,
+    )
+
+    prefix = env.get("LOOM_TG_BOT_PREFIX", "/api/tg-bot")
+    try:
+        async with httpx.AsyncClient(
+                base_url=f"http://127.0.0.1:{ports['app']}{prefix}",
+                timeout=args.timeout,
+                limits=httpx.Limits(max_connections=args.users, max_keepalive_connections=args.users),
+        ) as client:
+            await _wait_ready(client, server)
+            (await client.get("/table/create")).raise_for_status()
+
+            chat_ids = [FIRST_CHAT_ID + index for index in range(args.users)]
+            await _seed_users(chat_ids)
+
+            stats = Stats()
+            update_ids = itertools.count(int(time.time()) * 1000)
+            journeys = [journey for journey in args.journeys.split(",") if journey]
+            users = [
+                VirtualUser(client, bot_api, stats, update_ids, chat_id, journeys, args.moderation_pages, args.think_ms / 1000)
+                for chat_id in chat_ids
+            ]
+
+            usage = ProcessUsage(server.pid)
+            rss_watcher = asyncio.create_task(usage.watch_rss())
+
+            started_at = time.monotonic()
+            deadline = started_at + args.warmup_seconds + args.seconds
+            tasks = [asyncio.create_task(user.run(deadline)) for user in users]
+
+            # Прогрев: первые обращения к фейкам, импорты и кэши приложения в замер не входят
+            await asyncio.sleep(args.warmup_seconds)
+            stats.recording = True
+            cpu_started_at = usage.cpu_seconds()
+            measured_from = time.monotonic()
+
+            await asyncio.gather(*tasks)
+            elapsed = time.monotonic() - measured_from
+            cpu = usage.cpu_seconds() - cpu_started_at
+            rss_watcher.cancel()
+
+            _report(stats, elapsed, cpu, usage, bot_api, loom, anthropic)
+    finally:
+        server.send_signal(signal.SIGINT)
+        try:
+            server.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            server.kill()
+        for runner in runners:
+            await runner.cleanup()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--seconds", type=float, default=30)
+    parser.add_argument("--warmup-seconds", type=float, default=5)
+    parser.add_argument("--journeys", default="generate_publication,moderation")
+    parser.add_argument("--moderation-publications", type=int, default=20)
+    parser.add_argument("--moderation-pages", type=int, default=5)
+    parser.add_argument("--think-ms", type=float, default=0)
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--tg-latency-ms", type=float, default=30)
+    parser.add_argument("--tg-error-rate", type=float, default=0)
+    parser.add_argument("--loom-latency-ms", type=float, default=10)
+    parser.add_argument("--loom-error-rate", type=float, default=0)
+    parser.add_argument("--generation-latency-ms", type=float, default=1000)
+    parser.add_argument("--llm-latency-ms", type=float, default=1000)
+    parser.add_argument("--llm-error-rate", type=float, default=0)
+    parser.add_argument(
+        "--send-rate-unlimited",
+        action="store_true",
+        help="снять лимиты SendScheduler, чтобы мерить обработку, а не ограничение частоты Telegram",
+    )
+    args = parser.parse_args()
+
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,358 @@
+"""
+Микробенчмарки CPU-горячих мест бота с JSON-базой для поиска регрессий.
+
+Каждый случай - вызов чистой функции на типичных данных: подготовка сообщений и разбор ответа
+Claude, расчет стоимости, проверка HTML, обертки traced_method/auto_log, UserState.serialize,
+аксессоры DialogDataHelper, форматирование постов канала и рендер системных промптов брифа.
+Прогон как в pyperf: несколько свежих процессов, в каждом калибровка числа вызовов на выборку,
+прогревочные выборки и GC, выключенный на время выборки. Время вызова случая - медиана по процессам
+минимумов их выборок: соседи по машине только добавляют время, а отдельный процесс может целиком
+попасть в медленный режим, поэтому один процесс для сравнения не годится.
+
+--save пишет результат в JSON, --compare сравнивает с сохраненной базой и завершается с кодом 1,
+если время какого-либо случая выросло больше порога. База снимается на той же машине, что и
+сравнение: абсолютные времена между машинами не сопоставимы.
+
+Запуск из корня репозитория:
+    python -m benchmark.micro --save benchmark/baselines/micro.json
+    python -m benchmark.micro --compare benchmark/baselines/micro.json --threshold 0.2
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from collections import namedtuple
+from datetime import datetime
+from types import SimpleNamespace
+from typing import Callable
+
+from opentelemetry import metrics
+from opentelemetry.sdk.metrics import MeterProvider
+from opentelemetry.sdk.metrics.export import InMemoryMetricReader
+
+from benchmark.telemetry import BenchmarkTelemetry
+from internal import model
+from internal.dialog.brief.create_category.create_prompt import CreateCategoryPromptGenerator
+from internal.dialog.brief.create_category.train_prompt import TrainCategoryPromptGenerator
+from internal.dialog.brief.create_organization.prompt import CreateOrganizationPromptGenerator
+from internal.dialog.brief.helpers.telegram_post_formatter import TelegramPostFormatter
+from internal.dialog.brief.update_category.prompt import UpdateCategoryPromptGenerator
+from internal.dialog.brief.update_organization.prompt import UpdateOrganizationPromptGenerator
+from internal.dialog.content.generate_publication.helpers.dialog_data_helper import DialogDataHelper
+from pkg.client.external.claude.client import AnthropicClient
+from pkg.html_validator import validate_html
+from pkg.log_wrapper import auto_log, configure_auto_log
+from pkg.trace_wrapper import traced_method
+
+TEXT = "<b>Кейс</b> проекта за неделю: <i>подробности</i> и выводы для клиентов. " * 25
+
+
+def _complete(coroutine):
+    # Корутина без настоящих ожиданий выполняется за один шаг, без накладных расходов цикла событий
+    try:
+        coroutine.send(None)
+    except StopIteration as stop:
+        return stop.value
+    raise RuntimeError("корутина ожидает ввода-вывода")
+
+
+def _organization() -> model.Organization:
+    return model.Organization(
+        id=1,
+        name="Loom",
+        description="Сервис генерации контента для соцсетей компаний. " * 10,
+        rub_balance="1000",
+        tone_of_voice=["дружелюбный", "экспертный", "без канцелярита"],
+        compliance_rules=[{"rule": f"Правило бренда {index}", "reason": "юристы"} for index in range(10)],
+        additional_info=[{"title": f"Факт {index}", "text": "Подробности о компании. " * 5} for index in range(10)],
+        products=[{"name": f"Продукт {index}", "description": "Описание продукта. " * 8} for index in range(8)],
+        locale={"language": "ru", "country": "RU"},
+        created_at="2025-01-01T12:00:00+00:00",
+    )
+
+
+def _category() -> model.Category:
+    return model.Category(
+        id=3,
+        organization_id=1,
+        name="Кейсы",
+        hint="Расскажите о задаче клиента и результате",
+        goal="Показать экспертизу на реальных проектах",
+        tone_of_voice=["уверенный", "конкретный"],
+        brand_rules=[f"Правило {index}" for index in range(8)],
+        creativity_level=6,
+        audience_segment="B2B, маркетологи",
+        len_min=400,
+        len_max=1500,
+        n_hashtags_min=1,
+        n_hashtags_max=3,
+        cta_type="soft",
+        cta_strategy={"type": "question", "text": "Как у вас?"},
+        good_samples=[{"text": TEXT, "comment": "хороший тон"} for _ in range(3)],
+        bad_samples=[{"text": TEXT, "comment": "слишком сухо"} for _ in range(2)],
+        additional_info=[{"title": "Цифры", "text": "Конверсия выросла вдвое"}],
+        prompt_for_image_style="Минимализм, фирменные цвета",
+        created_at="2025-01-01T12:00:00+00:00",
+    )
+
+
+class _Service:
+    def __init__(self):
+        tel = BenchmarkTelemetry()
+        self.tracer = tel.tracer()
+        self.logger = tel.logger()
+
+    async def plain(self, publication_id: int, text: str, options: dict = None):
+        return publication_id
+
+    @traced_method()
+    async def traced(self, publication_id: int, text: str, options: dict = None):
+        return publication_id
+
+    @auto_log()
+    async def logged(self, publication_id: int, text: str, options: dict = None):
+        return publication_id
+
+    @auto_log()
+    @traced_method()
+    async def logged_traced(self, publication_id: int, text: str, options: dict = None):
+        return publication_id
+
+
+def cases() -> dict[str, Callable[[], object]]:
+    tel = BenchmarkTelemetry()
+    claude = AnthropicClient(tel, "benchmark")
+
+    history = [
+        {"role": "user" if index % 2 == 0 else "assistant", "content": TEXT}
+        for index in range(20)
+    ]
+    images = [b"\x89PNG\r\n\x1a\n" + os.urandom(200 * 1024) for _ in range(2)]
+    llm_answer = (
+            "Вот обновленная рубрика с учетом ваших правок.\n```json\n"
+            + json.dumps({
+                "message_to_user": TEXT,
+                "category": _category().to_dict(),
+                "next_step": "train",
+            }, ensure_ascii=False)
+            + "\n```\nЕсли нужно, поправлю тон."
+    )
+    completion = SimpleNamespace(usage=SimpleNamespace(
+        input_tokens=12000,
+        output_tokens=900,
+        cache_read_input_tokens=8000,
+        cache_creation_input_tokens=1500,
+        server_tool_use=SimpleNamespace(web_search_requests=2),
+    ))
+
+    Row = namedtuple("Row", [
+        "id", "tg_chat_id", "account_id", "organization_id", "access_token", "refresh_token",
+        "tg_username", "can_show_alerts", "show_error_recovery", "created_at",
+    ])
+    rows = [
+        Row(index, 100_000 + index, index, 1, "a" * 200, "r" * 200, f"user_{index}", True, False, datetime(2025, 1, 1))
+        for index in range(1000)
+    ]
+
+    dialog_data_helper = DialogDataHelper(tel.logger())
+    dialog_manager = SimpleNamespace(dialog_data={
+        "category_name": "Кейсы",
+        "category_hint": "Расскажите о задаче клиента",
+        "generate_text_prompt": TEXT,
+        "has_generate_text_prompt": True,
+        "publication_text": TEXT,
+        "is_custom_image": False,
+    })
+
+    posts = [
+        {"link": "https://t.me/loom", "text": TEXT if index % 5 else ""}
+        for index in range(50)
+    ]
+
+    service = _Service()
+    organization = _organization()
+    category = _category()
+    create_category = CreateCategoryPromptGenerator()
+    train_category = TrainCategoryPromptGenerator()
+    create_organization = CreateOrganizationPromptGenerator()
+    update_category = UpdateCategoryPromptGenerator()
+    update_organization = UpdateOrganizationPromptGenerator()
+
+    def dialog_data_accessors():
+        dialog_data_helper.get_generate_text_prompt_input_data(dialog_manager)
+        dialog_data_helper.get_edit_publication_text_data(dialog_manager)
+        dialog_data_helper.get_image_menu_flags(dialog_manager)
+
+    return {
+        "claude.prepare_messages": lambda: claude._prepare_messages(history),
+        "claude.prepare_messages_images": lambda: claude._prepare_messages(history[:9], images=images),
+        "claude.extract_and_parse_json": lambda: claude._extract_and_parse_json(llm_answer),
+        "claude.calculate_llm_cost": lambda: claude._calculate_llm_cost(completion, "claude-sonnet-4-5"),
+        "html_validator.validate_html": lambda: validate_html(TEXT),
+        "wrapper.plain": lambda: _complete(service.plain(1, TEXT, options={"mode": "text_only"})),
+        "wrapper.traced_method": lambda: _complete(service.traced(1, TEXT, options={"mode": "text_only"})),
+        "wrapper.auto_log": lambda: _complete(service.logged(1, TEXT, options={"mode": "text_only"})),
+        "wrapper.auto_log_traced_method": lambda: _complete(
+            service.logged_traced(1, TEXT, options={"mode": "text_only"})
+        ),
+        "model.user_state_serialize_1000": lambda: model.UserState.serialize(rows),
+        "dialog_data_helper.accessors": dialog_data_accessors,
+        "telegram_post_formatter.format_50_posts": lambda: TelegramPostFormatter.format_telegram_posts(posts),
+        "prompt.create_category": lambda: _complete(create_category.get_create_category_system_prompt(organization)),
+        "prompt.train_category": lambda: _complete(
+            train_category.get_train_category_system_prompt(organization, category)
+        ),
+        "prompt.create_organization": lambda: _complete(create_organization.get_create_organization_system_prompt()),
+        "prompt.update_category": lambda: _complete(
+            update_category.get_update_category_system_prompt(organization, category)
+        ),
+        "prompt.update_organization": lambda: _complete(
+            update_organization.get_update_organization_system_prompt(organization)
+        ),
+    }
+
+
+def _sample(func: Callable[[], object], loops: int) -> float:
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        started_at = time.perf_counter()
+        for _ in range(loops):
+            func()
+        return (time.perf_counter() - started_at) / loops
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+
+def measure(func: Callable[[], object], samples: int, warmups: int, min_time: float) -> dict:
+    # Число вызовов на выборку подбирается так, чтобы выборка шла не меньше min_time
+    loops = 1
+    while _sample(func, loops) * loops < min_time:
+        loops *= 2
+
+    for _ in range(warmups):
+        _sample(func, loops)
+    values = [_sample(func, loops) * 1_000_000 for _ in range(samples)]
+
+    return {
+        "median_us": statistics.median(values),
+        "mean_us": statistics.fmean(values),
+        "stdev_us": statistics.stdev(values) if len(values) > 1 else 0.0,
+        "min_us": min(values),
+        "loops": loops,
+        "samples": samples,
+    }
+
+
+def _meta() -> dict:
+    return {
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+    }
+
+
+def _worker(args) -> None:
+    # Обертки пишут RED-метрики и логи как в проде: SDK MeterProvider, auto_log только медленные и ошибки
+    metrics.set_meter_provider(MeterProvider(metric_readers=[InMemoryMetricReader()]))
+    configure_auto_log("slow_or_error", slow_threshold=1.0)
+
+    results = {
+        name: measure(func, args.samples, args.warmups, args.min_time)
+        for name, func in cases().items()
+        if args.filter in name
+    }
+    print(json.dumps(results))
+
+
+def _run_processes(args) -> dict[str, dict]:
+    """Каждый процесс прогоняет все случаи; по случаю берется медиана минимумов процессов."""
+    runs: dict[str, list[dict]] = {}
+    for _ in range(args.processes):
+        completed = subprocess.run(
+            [
+                sys.executable, "-m", "benchmark.micro", "--worker",
+                "--filter", args.filter,
+                "--samples", str(args.samples),
+                "--warmups", str(args.warmups),
+                "--min-time", str(args.min_time),
+            ],
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+        for name, result in json.loads(completed.stdout).items():
+            runs.setdefault(name, []).append(result)
+
+    results = {}
+    for name, process_results in runs.items():
+        process_min = [result["min_us"] for result in process_results]
+        us = statistics.median(process_min)
+        results[name] = {
+            "us": us,
+            "median_us": statistics.median(result["median_us"] for result in process_results),
+            "spread": (max(process_min) - min(process_min)) / us,
+            "process_min_us": process_min,
+            "loops": process_results[0]["loops"],
+            "samples": args.samples,
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--filter", default="", help="только случаи, в имени которых есть подстрока")
+    parser.add_argument("--processes", type=int, default=5)
+    parser.add_argument("--samples", type=int, default=15)
+    parser.add_argument("--warmups", type=int, default=2)
+    parser.add_argument("--min-time", type=float, default=0.05, help="длительность одной выборки, секунды")
+    parser.add_argument("--save", help="куда записать результат в JSON")
+    parser.add_argument("--compare", help="JSON-база для сравнения")
+    parser.add_argument("--threshold", type=float, default=0.2, help="допустимый рост времени вызова, доля")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        _worker(args)
+        return
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)["benchmarks"]
+
+    results = _run_processes(args)
+
+    regressions = []
+    print(f"{'benchmark':<42} {'us':>9} {'median, us':>11} {'spread':>7} {'baseline, us':>13} {'change':>8}")
+    for name, result in results.items():
+        line = f"{name:<42} {result['us']:>9.2f} {result['median_us']:>11.2f} {result['spread']:>7.1%}"
+        if name in baseline:
+            change = result["us"] / baseline[name]["us"] - 1
+            line += f" {baseline[name]['us']:>13.2f} {change:>+7.1%}"
+            if change > args.threshold:
+                regressions.append(name)
+                line += "  REGRESSION"
+        print(line)
+
+    if args.save:
+        os.makedirs(os.path.dirname(args.save) or ".", exist_ok=True)
+        with open(args.save, "w") as file:
+            json.dump({"meta": _meta(), "benchmarks": results}, file, indent=2, ensure_ascii=False)
+            file.write("\n")
+
+    if regressions:
+        print(f"regressions over {args.threshold:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
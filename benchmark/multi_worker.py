@@ -0,0 +1,132 @@
+"""
+Масштабирование вебхука по числу воркеров uvicorn.
+
+Поднимает uvicorn с --workers N для каждого N из списка и нагружает /update из нескольких процессов.
+Обработчик разбирает Update через aiogram и тратит заданное время CPU - как рендер диалога,
+поэтому пропускную способность ограничивает ядро процессора, а не сеть.
+Линейный рост rps виден только при числе свободных ядер не меньше максимального N.
+
+Запуск из корня репозитория:
+    python -m benchmark.multi_worker --workers 1,2,4 --seconds 10 --cpu-ms 2
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+
+import httpx
+from aiogram.types import Update
+from fastapi import FastAPI, Request
+
+PREFIX = "/api/tg-bot"
+UPDATE = {"update_id": 1, "message": {"message_id": 1, "date": 0, "chat": {"id": 1, "type": "private"}, "text": "hi"}}
+CPU_MS = float(os.getenv("BENCHMARK_CPU_MS", "2"))
+
+app = FastAPI()
+
+
+async def bot_webhook(request: Request):
+    Update.model_validate(await request.json(), context={"bot": None})
+
+    deadline = time.process_time() + CPU_MS / 1000
+    while time.process_time() < deadline:
+        pass
+
+
+app.add_api_route(PREFIX + "/update", bot_webhook, methods=["POST"])
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_ready(url: str, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            httpx.post(url, json=UPDATE, timeout=1)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    raise RuntimeError("uvicorn не поднялся")
+
+
+def _client(url: str, seconds: float, concurrency: int, results: multiprocessing.Queue) -> None:
+    async def _run() -> int:
+        done = 0
+        deadline = time.monotonic() + seconds
+
+        async with httpx.AsyncClient(limits=httpx.Limits(max_connections=concurrency)) as client:
+            async def _loop():
+                nonlocal done
+                while time.monotonic() < deadline:
+                    response = await client.post(url, json=UPDATE)
+                    response.raise_for_status()
+                    done += 1
+
+            await asyncio.gather(*[_loop() for _ in range(concurrency)])
+        return done
+
+    results.put(asyncio.run(_run()))
+
+
+def run(workers: int, seconds: float, clients: int, concurrency: int, cpu_ms: float) -> float:
+    port = _free_port()
+    server = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "benchmark.multi_worker:app",
+            "--port", str(port), "--workers", str(workers), "--log-level", "warning", "--no-access-log",
+        ],
+        env={**os.environ, "BENCHMARK_CPU_MS": str(cpu_ms)},
+    )
+
+    try:
+        url = f"http://127.0.0.1:{port}{PREFIX}/update"
+        _wait_ready(url)
+
+        results = multiprocessing.Queue()
+        processes = [
+            multiprocessing.Process(target=_client, args=(url, seconds, concurrency, results))
+            for _ in range(clients)
+        ]
+        for process in processes:
+            process.start()
+
+        total = sum(results.get() for _ in processes)
+        for process in processes:
+            process.join()
+
+        return total / seconds
+    finally:
+        server.send_signal(signal.SIGINT)
+        server.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", default="1,2,4")
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--clients", type=int, default=2)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--cpu-ms", type=float, default=2)
+    args = parser.parse_args()
+
+    print(f"cpu cores: {os.cpu_count()}")
+    print(f"{'workers':<8} {'rps':>10} {'scaling':>10}")
+
+    baseline = None
+    for workers in [int(workers) for workers in args.workers.split(",")]:
+        rps = run(workers, args.seconds, args.clients, args.concurrency, args.cpu_ms)
+        baseline = baseline or rps
+        print(f"{workers:<8} {rps:>10.0f} {rps / baseline:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+"""
+Стоимость логирования на одно обновление: прежние OtelLogger + auto_log против текущих.
+
+Обновление моделируется цепочкой из трех методов под @auto_log (контроллер -> сервис -> клиент),
+каждый пишет debug с полями и info. Записи проходят настоящий LoggingHandler и LoggerProvider
+до экспортера, который только считает их, поэтому видно CPU на формирование записей.
+
+Запуск из корня репозитория:
+    python -m benchmark.otel_logger --updates 5000
+"""
+import argparse
+import asyncio
+import functools
+import inspect
+import logging
+import time
+import traceback
+from contextvars import ContextVar
+from typing import Union
+
+from opentelemetry import trace
+from opentelemetry.sdk._logs import LoggerProvider, LoggingHandler
+from opentelemetry.sdk._logs.export import SimpleLogRecordProcessor, LogExporter, LogExportResult
+
+from infrastructure.telemetry.logger import OtelLogger
+from internal import common
+from pkg.log_wrapper import log_wrapper
+
+
+class _CountingExporter(LogExporter):
+    def __init__(self):
+        self.records = 0
+
+    def export(self, batch):
+        self.records += len(batch)
+        return LogExportResult.SUCCESS
+
+    def shutdown(self):
+        pass
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        return True
+
+
+class LegacyOtelLogger:
+    def __init__(self, logger_provider: LoggerProvider, service_name: str, log_context: ContextVar[dict]):
+        self.handler = LoggingHandler(level=logging.DEBUG, logger_provider=logger_provider)
+        self.service_name = service_name
+        self.log_context = log_context
+
+        self.logger = logging.getLogger("main")
+        self.logger.setLevel(logging.DEBUG)
+        self.logger.addHandler(self.handler)
+        self.logger.propagate = False
+
+    def log(self, level: str, message: str, fields: dict = None) -> None:
+        file_info = self._get_caller_info(3)
+        attributes: dict = {common.FILE_KEY: file_info}
+
+        context_fields = self.log_context.get()
+        if context_fields:
+            attributes.update(context_fields)
+
+        if fields:
+            attributes.update({key: self._convert_value("" if value is None else value) for key, value in fields.items()})
+
+        current_span = trace.get_current_span()
+        if current_span and current_span.get_span_context().is_valid:
+            span_context = current_span.get_span_context()
+            attributes[common.TRACE_ID_KEY] = format(span_context.trace_id, '032x')
+            attributes[common.SPAN_ID_KEY] = format(span_context.span_id, '016x')
+
+        log_level = getattr(logging, level.upper(), logging.INFO)
+        self.logger.log(log_level, self.service_name + " | " + message, extra=attributes)
+
+    def _convert_value(self, value) -> Union[str, int, float, bool]:
+        if isinstance(value, (str, int, float, bool)):
+            return value
+        return str(value)
+
+    def _get_caller_info(self, skip: int) -> str:
+        frame = inspect.currentframe()
+        for _ in range(skip):
+            if frame is None:
+                break
+            frame = frame.f_back
+        if frame is None:
+            return "unknown:0"
+        return f"{frame.f_code.co_filename}:{frame.f_lineno}"
+
+    def debug(self, message: str, fields: dict = None) -> None:
+        self.log("DEBUG", message, fields)
+
+    def info(self, message: str, fields: dict = None) -> None:
+        self.log("INFO", message, fields)
+
+    def error(self, message: str, fields: dict = None) -> None:
+        self.log("ERROR", message, fields)
+
+
+def legacy_auto_log():
+    def decorator(func):
+        @functools.wraps(func)
+        async def async_wrapper(self, *args, **kwargs):
+            class_name = self.__class__.__name__
+            method_name = func.__name__
+            logger = getattr(self, 'logger', None)
+            if logger:
+                logger.info(f"Начало {class_name}.{method_name}")
+            try:
+                result = await func(self, *args, **kwargs)
+                if logger:
+                    logger.info(f"Завершение {class_name}.{method_name}")
+                return result
+            except Exception as e:
+                if logger:
+                    logger.error(f"Ошибка в {class_name}.{method_name}: {str(e)}", {
+                        "traceback": traceback.format_exc(),
+                    })
+                raise
+
+        return async_wrapper
+
+    return decorator
+
+
+def _chain(decorator):
+    class Client:
+        def __init__(self, logger):
+            self.logger = logger
+
+        @decorator()
+        async def get_publication(self, publication_id: int) -> dict:
+            self.logger.debug("Запрос публикации", {"publication_id": publication_id, "params": {"full": True}})
+            self.logger.info("Публикация получена", {"publication_id": publication_id})
+            return {"id": publication_id}
+
+    class Service:
+        def __init__(self, logger):
+            self.logger = logger
+            self.client = Client(logger)
+
+        @decorator()
+        async def load(self, publication_id: int) -> dict:
+            self.logger.debug("Загрузка публикации", {"publication_id": publication_id, "cache": None})
+            publication = await self.client.get_publication(publication_id)
+            self.logger.info("Публикация загружена", {"publication_id": publication_id})
+            return publication
+
+    class Controller:
+        def __init__(self, logger):
+            self.logger = logger
+            self.service = Service(logger)
+
+        @decorator()
+        async def handle(self, publication_id: int) -> dict:
+            self.logger.debug("Обработка обновления", {"update_id": publication_id, "state": "moderation_list"})
+            publication = await self.service.load(publication_id)
+            self.logger.info("Обновление обработано", {"update_id": publication_id})
+            return publication
+
+    return Controller
+
+
+async def run(variant: str, log_level: str, mode: str, updates: int) -> dict:
+    exporter = _CountingExporter()
+    provider = LoggerProvider()
+    provider.add_log_record_processor(SimpleLogRecordProcessor(exporter))
+    log_context: ContextVar[dict] = ContextVar("log_context", default={"chat_id": 1, "user_id": 1})
+
+    logging.getLogger("main").handlers.clear()
+    if variant == "legacy":
+        logger = LegacyOtelLogger(provider, "loom-tg-bot", log_context)
+        controller = _chain(legacy_auto_log)(logger)
+    else:
+        logger = OtelLogger(None, provider, "loom-tg-bot", log_context, log_level)
+        log_wrapper.configure_auto_log(mode, sample_ratio=0.1, slow_threshold=1.0)
+        controller = _chain(log_wrapper.auto_log)(logger)
+
+    for update_id in range(200):
+        await controller.handle(update_id)
+    exporter.records = 0
+
+    started_at = time.perf_counter()
+    cpu_started_at = time.process_time()
+    for update_id in range(updates):
+        await controller.handle(update_id)
+    cpu = time.process_time() - cpu_started_at
+    elapsed = time.perf_counter() - started_at
+
+    return {
+        "cpu_us_per_update": cpu / updates * 1_000_000,
+        "records_per_update": exporter.records / updates,
+        "records_per_sec": exporter.records / elapsed,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--updates", type=int, default=5000)
+    args = parser.parse_args()
+
+    variants = [
+        ("legacy", "DEBUG", "-"),
+        ("current", "DEBUG", log_wrapper.AUTO_LOG_ALL),
+        ("current", "INFO", log_wrapper.AUTO_LOG_ALL),
+        ("current", "INFO", log_wrapper.AUTO_LOG_SAMPLED),
+        ("current", "INFO", log_wrapper.AUTO_LOG_SLOW_OR_ERROR),
+    ]
+
+    print(f"{'variant':<8} {'level':<6} {'auto_log':<14} {'cpu us/update':>14} {'records/update':>15} {'records/s':>10}")
+    for variant, log_level, mode in variants:
+        result = await run(variant, log_level, mode, args.updates)
+        print(
+            f"{variant:<8} {log_level:<6} {mode:<14} {result['cpu_us_per_update']:>14.1f} "
+            f"{result['records_per_update']:>15.1f} {result['records_per_sec']:>10.0f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,188 @@
+"""
+Время старта приложения: импорт main, подъем uvicorn до готовности /health и первое обновление.
+
+В каждом прогоне свежие процессы:
+  import_ms        - python -X importtime -c "import main": весь импорт вместе с зависимостями;
+  construct_ms     - собственное время модуля main (клиенты, сервисы, геттеры, диалоги) из того же отчета;
+  listen_ms        - от запуска uvicorn main:app до первого ответа /health с любым кодом;
+  ready_ms         - до первого 200 от /health, то есть до конца прогрева;
+  first_update_ms  - первое обновление /start после готовности (вебхук в режиме inline).
+Прогоны с прогревом и без него (LOOM_TG_BOT_WARMUP=false) чередуются. Bot API, loom-* и Anthropic -
+фейки из benchmark/fake_services.py с задержкой --latency-ms. PostgreSQL и Redis берутся из обычных
+переменных окружения приложения; без них шаги прогрева завершаются ошибкой, а первое обновление -
+кодом 500, но время старта все равно меряется.
+
+Запуск из корня репозитория:
+    python -m benchmark.startup --runs 5
+"""
+import argparse
+import asyncio
+import signal
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+import httpx
+
+from benchmark import fake_services
+from benchmark.load_test import FIRST_CHAT_ID, SECRET, _app_env, _free_port
+
+MODES = {
+    "warmup": "true",
+    "no_warmup": "false",
+}
+
+
+def measure_import(env: dict) -> tuple[float, float]:
+    """Полное время import main и собственное время модуля main, мс."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=300,
+    )
+    # Строка отчета: "import time: <self us> | <cumulative us> | <module>"
+    for line in result.stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) == 3 and parts[2].strip() == "main":
+            self_us = int(parts[0].split(":")[1])
+            cumulative_us = int(parts[1])
+            return cumulative_us / 1000, self_us / 1000
+    raise RuntimeError(f"import main не удался:\n{result.stderr[-2000:]}")
+
+
+async def measure_server(env: dict, port: int, timeout: float) -> dict:
+    prefix = env.get("LOOM_TG_BOT_PREFIX", "/api/tg-bot")
+    started_at = time.perf_counter()
+    server = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "main:app",
+            "--port", str(port), "--log-level", "warning", "--no-access-log",
+        ],
+        env=env,
+    )
+
+    result = {}
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}{prefix}", timeout=timeout) as client:
+            deadline = time.monotonic() + timeout
+            while "ready_ms" not in result:
+                if server.poll() is not None:
+                    raise RuntimeError(f"приложение завершилось с кодом {server.returncode}")
+                if time.monotonic() > deadline:
+                    raise RuntimeError("приложение не стало готовым")
+                try:
+                    response = await client.get("/health", timeout=1)
+                except httpx.HTTPError:
+                    await asyncio.sleep(0.01)
+                    continue
+
+                elapsed_ms = (time.perf_counter() - started_at) * 1000
+                result.setdefault("listen_ms", elapsed_ms)
+                if response.status_code == 200:
+                    result["ready_ms"] = elapsed_ms
+                else:
+                    await asyncio.sleep(0.01)
+
+            update_started_at = time.perf_counter()
+            response = await client.post(
+                "/update",
+                json=_start_update(),
+                headers={"X-Telegram-Bot-Api-Secret-Token": SECRET},
+            )
+            result["first_update_ms"] = (time.perf_counter() - update_started_at) * 1000
+            result["first_update_status"] = response.status_code
+    finally:
+        server.send_signal(signal.SIGINT)
+        try:
+            server.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            server.kill()
+
+    return result
+
+
+def _start_update() -> dict:
+    update_id = int(time.time() * 1000)
+    user = {"id": FIRST_CHAT_ID, "is_bot": False, "first_name": "Startup", "username": "startup_bench"}
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": int(time.time()),
+            "chat": {"id": FIRST_CHAT_ID, "type": "private"},
+            "from": user,
+            "text": "/start",
+            "entities": [{"type": "bot_command", "offset": 0, "length": len("/start")}],
+        },
+    }
+
+
+def _report(imports: list[tuple[float, float]], results: dict[str, list[dict]]) -> None:
+    print(
+        f"import main: {statistics.median(total for total, _ in imports):.0f} ms, "
+        f"of which main body {statistics.median(body for _, body in imports):.0f} ms "
+        f"(median of {len(imports)} runs)"
+    )
+    print()
+
+    columns = ("listen_ms", "ready_ms", "first_update_ms")
+    print(f"{'mode':<12}{'runs':>6}" + "".join(f"{column:>18}" for column in columns) + "   first_update_status")
+    for mode, runs in results.items():
+        row = f"{mode:<12}{len(runs):>6}"
+        for column in columns:
+            values = [run[column] for run in runs]
+            row += f"{statistics.median(values):>11.0f} ({min(values):>4.0f})"
+        statuses = defaultdict(int)
+        for run in runs:
+            statuses[run["first_update_status"]] += 1
+        row += "   " + ", ".join(f"{status}x{count}" for status, count in sorted(statuses.items()))
+        print(row)
+    print("\nmedian (min) over runs")
+
+
+async def run(args) -> None:
+    fault = fake_services.Fault(args.latency_ms / 1000, 0)
+    bot_api = fake_services.FakeBotApi(fault)
+    loom = fake_services.FakeLoomServices(fault, fault, 1)
+    anthropic = fake_services.FakeAnthropic(fault)
+
+    ports = {name: _free_port() for name in ("bot_api", "loom", "anthropic")}
+    runners = [
+        await fake_services.start(bot_api.app(), ports["bot_api"]),
+        await fake_services.start(loom.app(), ports["loom"]),
+        await fake_services.start(anthropic.app(), ports["anthropic"]),
+    ]
+
+    env = _app_env(False, ports["bot_api"], ports["loom"], ports["anthropic"])
+    imports = []
+    results = {mode: [] for mode in args.modes.split(",") if mode}
+    try:
+        for _ in range(args.runs):
+            imports.append(measure_import(env))
+            for mode in results:
+                mode_env = {**env, "LOOM_TG_BOT_WARMUP": MODES[mode]}
+                results[mode].append(await measure_server(mode_env, _free_port(), args.timeout))
+    finally:
+        for runner in runners:
+            await runner.cleanup()
+
+    _report(imports, results)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--modes", default="warmup,no_warmup", help="через запятую: " + ", ".join(MODES))
+    parser.add_argument("--latency-ms", type=float, default=5, help="задержка ответов фейковых сервисов")
+    parser.add_argument("--timeout", type=float, default=120)
+    args = parser.parse_args()
+
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+from opentelemetry import trace, metrics
+from opentelemetry.sdk.trace import TracerProvider
+
+
+class NoopLogger:
+    def debug(self, message: str, fields: dict = None) -> None: pass
+
+    def info(self, message: str, fields: dict = None) -> None: pass
+
+    def warning(self, message: str, fields: dict = None) -> None: pass
+
+    def error(self, message: str, fields: dict = None) -> None: pass
+
+
+class BenchmarkTelemetry:
+    # Настоящий SDK-трейсер без экспортера: создание спанов стоит столько же, сколько в проде
+    def __init__(self):
+        self._tracer = TracerProvider().get_tracer("benchmark")
+
+    def tracer(self) -> trace.Tracer:
+        return self._tracer
+
+    def meter(self) -> metrics.Meter:
+        return metrics.get_meter("benchmark")
+
+    def logger(self) -> NoopLogger:
+        return NoopLogger()
@@ -0,0 +1,111 @@
+"""
+Накладные расходы traced_method на один вызов.
+
+Сравнивает прежнюю обертку (inspect.signature + bind на каждом вызове, полные строки в атрибутах)
+с текущей на методе с типичными аргументами (id, текст публикации, словарь) при записи всех спанов,
+при записи 10% трейсов и без захвата аргументов. Текущая обертка пишет и RED-метрики в настоящий
+MeterProvider SDK, поэтому их стоимость входит в замер.
+
+Запуск из корня репозитория:
+    python -m benchmark.trace_wrapper --calls 20000
+"""
+import argparse
+import asyncio
+import inspect
+import time
+from functools import wraps
+
+from opentelemetry import metrics
+from opentelemetry.sdk.metrics import MeterProvider
+from opentelemetry.sdk.metrics.export import InMemoryMetricReader
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased, ALWAYS_ON
+from opentelemetry.trace import SpanKind, StatusCode
+
+from pkg.trace_wrapper import traced_method
+from pkg.trace_wrapper.trace_wrapper import _serialize_value
+
+TEXT = "<b>Кейс</b> проекта за неделю, подробности и выводы для клиентов. " * 60
+
+
+def legacy_traced_method(span_kind: SpanKind = SpanKind.INTERNAL):
+    exclude_params = {'self', 'cls'}
+
+    def decorator(func):
+        @wraps(func)
+        async def async_wrapper(self, *args, **kwargs):
+            span_name = f"{self.__class__.__name__}.{func.__name__}"
+
+            sig = inspect.signature(func)
+            bound_args = sig.bind(self, *args, **kwargs)
+            bound_args.apply_defaults()
+
+            attributes = {}
+            for param_name, param_value in bound_args.arguments.items():
+                if param_name in exclude_params:
+                    continue
+                attributes[param_name] = str(param_value) if isinstance(param_value, str) else _serialize_value(param_value)
+
+            with self.tracer.start_as_current_span(span_name, kind=span_kind, attributes=attributes) as span:
+                result = await func(self, *args, **kwargs)
+                span.set_status(StatusCode.OK)
+                return result
+
+        return async_wrapper
+
+    return decorator
+
+
+class _Service:
+    def __init__(self, sampler):
+        self.tracer = TracerProvider(sampler=sampler).get_tracer("benchmark")
+
+    async def plain(self, publication_id: int, text: str, options: dict = None):
+        return publication_id
+
+    @legacy_traced_method()
+    async def legacy(self, publication_id: int, text: str, options: dict = None):
+        return publication_id
+
+    @traced_method()
+    async def current(self, publication_id: int, text: str, options: dict = None):
+        return publication_id
+
+    @traced_method(capture_args=False)
+    async def current_no_args(self, publication_id: int, text: str, options: dict = None):
+        return publication_id
+
+
+async def _measure(method, calls: int) -> float:
+    for _ in range(1000):
+        await method(1, TEXT, options={"mode": "text_only"})
+
+    started_at = time.perf_counter()
+    for _ in range(calls):
+        await method(1, TEXT, options={"mode": "text_only"})
+    return (time.perf_counter() - started_at) / calls * 1_000_000
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=20000)
+    args = parser.parse_args()
+
+    metrics.set_meter_provider(MeterProvider(metric_readers=[InMemoryMetricReader()]))
+
+    samplers = {
+        "always_on": ALWAYS_ON,
+        "ratio_0.1": ParentBased(TraceIdRatioBased(0.1)),
+    }
+
+    print(f"{'sampler':<10} {'wrapper':<16} {'us/call':>8} {'overhead, us':>13}")
+    for sampler_name, sampler in samplers.items():
+        service = _Service(sampler)
+        baseline = await _measure(service.plain, args.calls)
+        for name in ("plain", "legacy", "current", "current_no_args"):
+            us_per_call = await _measure(getattr(service, name), args.calls)
+            print(f"{sampler_name:<10} {name:<16} {us_per_call:>8.2f} {us_per_call - baseline:>13.2f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,214 @@
+import json
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncGenerator, Mapping, Callable, Awaitable, cast
+
+from aiogram.exceptions import DataNotDictLikeError
+from aiogram.fsm.storage.base import StorageKey, KeyBuilder, BaseEventIsolation
+from aiogram.fsm.storage.memory import SimpleEventIsolation
+from aiogram.fsm.storage.redis import RedisStorage
+from aiogram.types import TelegramObject
+from redis.asyncio import Redis
+from redis.typing import ExpiryT
+
+from internal import interface, common
+from pkg.trace_wrapper import record_step
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _dumps(data: dict) -> bytes:
+    if orjson:
+        # Нестроковые ключи приводятся к строкам, как в json.dumps
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data).encode()
+
+
+def _loads(value: bytes | str) -> dict:
+    if orjson:
+        return orjson.loads(value)
+    return json.loads(value)
+
+
+class _Batch:
+    def __init__(self):
+        # Значения в Redis на момент чтения и отложенные записи: None - ключ удален
+        self.read: dict[str, bytes | None] = {}
+        self.writes: dict[str, bytes | None] = {}
+        self.closed = False
+
+
+class _FlushingEventIsolation(BaseEventIsolation):
+    """
+    Блокировка стека aiogram-dialog, перед снятием которой накопленные записи уходят в Redis.
+    Без этого следующее обновление чата, дождавшееся блокировки, прочитало бы старый стек.
+    """
+
+    def __init__(self, storage: "BatchedRedisStorage", isolation: BaseEventIsolation):
+        self.storage = storage
+        self.isolation = isolation
+
+    @asynccontextmanager
+    async def lock(self, key: StorageKey) -> AsyncGenerator[None, None]:
+        async with self.isolation.lock(key):
+            try:
+                yield
+            finally:
+                await self.storage.flush()
+
+    async def close(self) -> None:
+        await self.isolation.close()
+
+
+class BatchedRedisStorage(RedisStorage):
+    """
+    RedisStorage для стека и контекстов aiogram-dialog.
+    Данные хранятся в JSON через orjson (старые записи json.dumps читаются как есть).
+    Записи за одно обновление копятся и уходят в Redis одним пайплайном при снятии блокировки
+    стека aiogram-dialog (см. events_isolation) и, что осталось, после обработчика;
+    контекст, который обработчик прочитал и не изменил, не перезаписывается.
+    """
+
+    def __init__(
+            self,
+            tel: interface.ITelemetry,
+            redis: Redis,
+            key_builder: KeyBuilder | None = None,
+            state_ttl: ExpiryT | None = None,
+            data_ttl: ExpiryT | None = None,
+    ):
+        super().__init__(redis, key_builder, state_ttl, data_ttl, json_loads=_loads, json_dumps=_dumps)
+        self.meter = tel.meter()
+        self.logger = tel.logger()
+
+        self._batch: ContextVar[_Batch | None] = ContextVar("fsm_storage_batch", default=None)
+
+        self.written_counter = self.meter.create_counter(
+            name=common.FSM_STORAGE_WRITTEN_KEY,
+            description="Записи данных FSM, отправленные в Redis",
+        )
+        self.skipped_counter = self.meter.create_counter(
+            name=common.FSM_STORAGE_SKIPPED_KEY,
+            description="Записи данных FSM, пропущенные из-за неизменного содержимого",
+        )
+
+    def events_isolation(self, isolation: BaseEventIsolation | None = None) -> BaseEventIsolation:
+        """Изоляция событий для setup_dialogs: пакет сбрасывается, пока стек еще заблокирован."""
+        return _FlushingEventIsolation(self, isolation or SimpleEventIsolation())
+
+    async def flush(self) -> None:
+        batch = self._active_batch()
+        if batch:
+            await self._flush(batch)
+
+    async def batch_middleware(
+            self,
+            handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+            event: TelegramObject,
+            data: dict[str, Any]
+    ):
+        # Вложенные обновления (фоновые менеджеры диалогов) пишут в общий пакет
+        if self._batch.get() is not None:
+            return await handler(event, data)
+
+        batch = _Batch()
+        token = self._batch.set(batch)
+        try:
+            return await handler(event, data)
+        finally:
+            self._batch.reset(token)
+            batch.closed = True
+            await self._flush(batch)
+
+    async def set_data(
+            self,
+            key: StorageKey,
+            data: Mapping[str, Any],
+    ) -> None:
+        if not isinstance(data, dict):
+            msg = f"Data must be a dict or dict-like object, got {type(data).__name__}"
+            raise DataNotDictLikeError(msg)
+
+        redis_key = self.key_builder.build(key, "data")
+        payload = self.json_dumps(data) if data else None
+
+        batch = self._active_batch()
+        if batch:
+            batch.writes[redis_key] = payload
+            return
+
+        # Задачи, пережившие обновление, пишут сразу
+        if payload is None:
+            await self.redis.delete(redis_key)
+        else:
+            await self.redis.set(redis_key, payload, ex=self.data_ttl)
+        self.written_counter.add(1)
+
+    async def get_data(
+            self,
+            key: StorageKey,
+    ) -> dict[str, Any]:
+        redis_key = self.key_builder.build(key, "data")
+
+        batch = self._active_batch()
+        if batch and redis_key in batch.writes:
+            value = batch.writes[redis_key]
+        else:
+            started_at = time.perf_counter()
+            value = await self.redis.get(redis_key)
+            record_step("fsm_storage.get_data", started_at, "client")
+            if batch:
+                batch.read.setdefault(redis_key, self._as_bytes(value))
+
+        if value is None:
+            return {}
+        return cast(dict[str, Any], self.json_loads(value))
+
+    async def _flush(self, batch: _Batch) -> None:
+        if not batch.writes:
+            return
+
+        # Записи, сделанные во время отправки пайплайна, попадут в следующий сброс
+        writes, batch.writes = batch.writes, {}
+        written = 0
+        skipped = 0
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for redis_key, payload in writes.items():
+                unchanged = redis_key in batch.read and batch.read[redis_key] == payload
+                # После сброса в Redis лежит записанное значение: с ним сравнивается следующая запись
+                batch.read[redis_key] = payload
+                if unchanged:
+                    skipped += 1
+                    if payload is not None and self.data_ttl:
+                        pipe.expire(redis_key, self.data_ttl)
+                    continue
+
+                if payload is None:
+                    pipe.delete(redis_key)
+                else:
+                    pipe.set(redis_key, payload, ex=self.data_ttl)
+                written += 1
+
+            if pipe.command_stack:
+                started_at = time.perf_counter()
+                await pipe.execute()
+                record_step("fsm_storage.flush", started_at, "client")
+
+        self.written_counter.add(written)
+        self.skipped_counter.add(skipped)
+
+    def _active_batch(self) -> _Batch | None:
+        batch = self._batch.get()
+        if batch is None or batch.closed:
+            return None
+        return batch
+
+    @staticmethod
+    def _as_bytes(value: bytes | str | None) -> bytes | None:
+        if isinstance(value, str):
+            return value.encode()
+        return value
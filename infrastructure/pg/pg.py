@@ -1,3 +1,4 @@
+import asyncio
 from typing import Any, Sequence
 
 from opentelemetry.trace import Status, StatusCode, SpanKind
@@ -5,6 +6,7 @@ from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
 from internal import interface
+from pkg.trace_wrapper import traced_method
 
 
 def NewPool(
@@ -35,9 +37,27 @@ def NewPool(
 class PG(interface.IDB):
 
     def __init__(self, tel: interface.ITelemetry, db_user, db_pass, db_host, db_port, db_name):
-        self.pool = NewPool(db_user, db_pass, db_host, db_port, db_name)
         self.tracer = tel.tracer()
 
+        self._pool_params = (db_user, db_pass, db_host, db_port, db_name)
+        self._pool: async_sessionmaker | None = None
+
+    @property
+    def pool(self) -> async_sessionmaker:
+        # Диалект asyncpg импортируется при создании движка (~250 мс) - не при импорте main, а при прогреве
+        if self._pool is None:
+            self._pool = NewPool(*self._pool_params)
+        return self._pool
+
+    async def warmup(self, connections: int) -> None:
+        """Открывает соединения пула заранее: параллельные сессии не делят соединение, в пуле остается connections штук."""
+        async def _open():
+            async with self.pool() as session:
+                await session.execute(text("SELECT 1"))
+
+        await asyncio.gather(*(_open() for _ in range(connections)))
+
+    @traced_method(SpanKind.CLIENT)
     async def insert(self, query: str, query_params: dict) -> int:
         async with self.pool() as session:
             result = await session.execute(text(query), query_params)
@@ -45,22 +65,34 @@ class PG(interface.IDB):
             rows = result.all()
             return rows[0][0]
 
+    @traced_method(SpanKind.CLIENT)
+    async def insert_many(self, query: str, query_params: dict) -> list[int]:
+        async with self.pool() as session:
+            result = await session.execute(text(query), query_params)
+            await session.commit()
+            rows = result.all()
+            return [row[0] for row in rows]
+
+    @traced_method(SpanKind.CLIENT)
     async def delete(self, query: str, query_params: dict) -> None:
         async with self.pool() as session:
             await session.execute(text(query), query_params)
             await session.commit()
 
+    @traced_method(SpanKind.CLIENT)
     async def update(self, query: str, query_params: dict) -> None:
         async with self.pool() as session:
             await session.execute(text(query), query_params)
             await session.commit()
 
+    @traced_method(SpanKind.CLIENT)
     async def select(self, query: str, query_params: dict) -> Sequence[Any]:
         async with self.pool() as session:
             result = await session.execute(text(query), query_params)
             rows = result.all()
             return rows
 
+    @traced_method(SpanKind.CLIENT)
     async def multi_query(
             self,
             queries: list[str]
@@ -2,12 +2,27 @@ import redis.asyncio as aioredis
 from redis.connection import ConnectionPool
 from typing import Any
 import json
+import time
 import asyncio
 
 from internal import interface
 
 
 class RedisClient(interface.IRedis):
+    # Проверка владельца и изменение ключа одной командой, чтобы не снять чужую блокировку
+    _DELETE_IF_EQUALS = """
+        if redis.call("GET", KEYS[1]) == ARGV[1] then
+            return redis.call("DEL", KEYS[1])
+        end
+        return 0
+    """
+    _EXPIRE_IF_EQUALS = """
+        if redis.call("GET", KEYS[1]) == ARGV[1] then
+            return redis.call("EXPIRE", KEYS[1], ARGV[2])
+        end
+        return 0
+    """
+
     def __init__(
             self,
             host: str,
@@ -47,6 +62,61 @@ class RedisClient(interface.IRedis):
         except Exception as e:
             raise e
 
+    async def set_nx(self, key: str, value: Any, ttl: int) -> bool:
+        client = await self.get_async_client()
+        serialized_value = self._serialize_value(value)
+        return bool(await client.set(key, serialized_value, ex=ttl, nx=True))
+
+    async def delete(self, key: str) -> None:
+        client = await self.get_async_client()
+        await client.delete(key)
+
+    async def delete_if_equals(self, key: str, value: Any) -> bool:
+        client = await self.get_async_client()
+        return bool(await client.eval(self._DELETE_IF_EQUALS, 1, key, self._serialize_value(value)))
+
+    async def expire_if_equals(self, key: str, value: Any, ttl: int) -> bool:
+        client = await self.get_async_client()
+        return bool(await client.eval(self._EXPIRE_IF_EQUALS, 1, key, self._serialize_value(value), ttl))
+
+    async def incr(self, key: str, ttl: int) -> int:
+        client = await self.get_async_client()
+        async with client.pipeline(transaction=True) as pipe:
+            pipe.incr(key)
+            pipe.expire(key, ttl)
+            value, _ = await pipe.execute()
+        return value
+
+    async def push(self, key: str, value: Any, ttl: int) -> None:
+        client = await self.get_async_client()
+        async with client.pipeline(transaction=True) as pipe:
+            pipe.rpush(key, self._serialize_value(value))
+            pipe.expire(key, ttl)
+            await pipe.execute()
+
+    async def pop(self, key: str, timeout: float) -> Any:
+        client = await self.get_async_client()
+        item = await client.blpop([key], timeout=timeout)
+        if item is None:
+            return None
+        return self._deserialize_value(item[1])
+
+    async def touch_member(self, key: str, member: str, ttl: int) -> None:
+        client = await self.get_async_client()
+        now = time.time()
+        async with client.pipeline(transaction=True) as pipe:
+            pipe.zadd(key, {member: now + ttl})
+            pipe.zremrangebyscore(key, "-inf", now)
+            await pipe.execute()
+
+    async def remove_member(self, key: str, member: str) -> None:
+        client = await self.get_async_client()
+        await client.zrem(key, member)
+
+    async def live_members(self, key: str) -> list[str]:
+        client = await self.get_async_client()
+        return await client.zrangebyscore(key, time.time(), "+inf")
+
     async def get(self, key: str, default: Any = None) -> Any:
         try:
             client = await self.get_async_client()
@@ -57,6 +127,10 @@ class RedisClient(interface.IRedis):
         except Exception as e:
             return default
 
+    async def ping(self) -> None:
+        client = await self.get_async_client()
+        await client.ping()
+
     async def get_async_client(self) -> aioredis.Redis:
         if self.async_client is None:
             self.async_pool = aioredis.ConnectionPool.from_url(
@@ -1,5 +1,8 @@
 import asyncio
+import hashlib
 import re
+import time
+from dataclasses import dataclass, field
 from datetime import datetime
 
 import httpx
@@ -10,6 +13,24 @@ from aiogram.enums import ParseMode
 
 from infrastructure.redis_client.redis_client import RedisClient
 
+_FRAME_RE = re.compile(r'File "([^"]+)", line (\d+), in (\S+)')
+
+# Групп в одном дайджесте не больше, чем помещается в сообщение Telegram
+MAX_DIGEST_GROUPS = 15
+# Сообщение лога вместо типа исключения в отпечатке ошибки без traceback
+MAX_FINGERPRINT_MESSAGE_LENGTH = 200
+
+
+@dataclass
+class _ErrorGroup:
+    error_type: str
+    location: str
+    trace_id: str
+    span_id: str
+    traceback: str
+    count: int = 0
+    trace_ids: list[str] = field(default_factory=list)
+
 
 class AlertManager:
     def __init__(
@@ -24,6 +45,9 @@ class AlertManager:
             monitoring_redis_db: int,
             monitoring_redis_password: str,
             openai_api_key: str = None,
+            queue_size: int = 1000,
+            digest_window: float = 10,
+            dedup_ttl: int = 60,
     ):
         self.bot = Bot(tg_bot_token)
         self.alert_tg_chat_id = alert_tg_chat_id
@@ -44,17 +68,103 @@ class AlertManager:
         else:
             self.openai_client = None
 
-    def send_error_alert(self, trace_id: str, span_id: str, traceback: str):
-        loop = asyncio.get_running_loop()
-        loop.create_task(self.__send_error_alert(trace_id, span_id, traceback))
+        # Ошибки копятся в ограниченной очереди и раз в digest_window уходят одним сообщением,
+        # сгруппированные по отпечатку (тип исключения + верхний кадр стека,
+        # без traceback - сообщение лога + место вызова логгера)
+        self.queue_size = queue_size
+        self.digest_window = digest_window
+        self.dedup_ttl = dedup_ttl
+        self._queue: asyncio.Queue | None = None
+        self._worker: asyncio.Task | None = None
+        self.dropped_count = 0
 
-    async def __send_error_alert(self, trace_id: str, span_id: str, traceback: str):
-        alert_send = await self.redis_client.get(trace_id)
-        if alert_send:
+    def send_error_alert(self, trace_id: str, span_id: str, traceback: str, message: str = "", caller: str = ""):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Вне цикла событий (поток, синхронный код) отправить некуда
+            self.dropped_count += 1
             return
 
-        await self.redis_client.set(trace_id, "1", ttl=30)
-        await self.__send_error_alert_to_tg(trace_id, span_id, traceback)
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue(maxsize=self.queue_size)
+            self._worker = loop.create_task(self.__digest_worker())
+
+        try:
+            self._queue.put_nowait((trace_id, span_id, traceback, message, caller))
+        except asyncio.QueueFull:
+            self.dropped_count += 1
+
+    async def __digest_worker(self):
+        while True:
+            errors = [await self._queue.get()]
+            window_end = time.monotonic() + self.digest_window
+
+            while (timeout := window_end - time.monotonic()) > 0:
+                try:
+                    errors.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            dropped, self.dropped_count = self.dropped_count, 0
+            try:
+                await self.__send_digest(self._group(errors), dropped)
+            except Exception as e:
+                print(f"Ошибка при отправке дайджеста ошибок: {e}", flush=True)
+
+    async def __send_digest(self, groups: list[_ErrorGroup], dropped: int):
+        fresh_groups = []
+        for group in groups:
+            # SET NX EX: отпечаток алертится один раз за dedup_ttl на все реплики, без гонки GET/SET
+            fingerprint = hashlib.blake2b(f"{group.error_type}|{group.location}".encode(), digest_size=8).hexdigest()
+            if await self.redis_client.set_nx(f"alert:{self.service_name}:{fingerprint}", "1", ttl=self.dedup_ttl):
+                fresh_groups.append(group)
+
+        if not fresh_groups:
+            if dropped:
+                print(f"Алерты об ошибках отброшены из-за переполнения очереди: {dropped}", flush=True)
+            return
+
+        if len(fresh_groups) == 1 and fresh_groups[0].count == 1 and not dropped:
+            group = fresh_groups[0]
+            await self.__send_error_alert_to_tg(group.trace_id, group.span_id, group.traceback)
+            return
+
+        await self.__send_digest_to_tg(fresh_groups, dropped)
+
+    @staticmethod
+    def _group(errors: list[tuple[str, str, str, str, str]]) -> list[_ErrorGroup]:
+        groups: dict[tuple[str, str], _ErrorGroup] = {}
+        for trace_id, span_id, traceback, message, caller in errors:
+            error_type, location = AlertManager._fingerprint(traceback, message, caller)
+            group = groups.get((error_type, location))
+            if group is None:
+                # Без traceback в алерт и анализ LLM уходит само сообщение
+                group = _ErrorGroup(error_type, location, trace_id, span_id, traceback or message)
+                groups[(error_type, location)] = group
+
+            group.count += 1
+            if trace_id not in group.trace_ids and len(group.trace_ids) < 3:
+                group.trace_ids.append(trace_id)
+
+        return sorted(groups.values(), key=lambda group: group.count, reverse=True)
+
+    @staticmethod
+    def _fingerprint(traceback: str, message: str = "", caller: str = "") -> tuple[str, str]:
+        lines = [line for line in traceback.strip().splitlines() if line.strip()]
+        if not lines:
+            # Ошибка залогирована без исключения: различаем по сообщению и месту вызова логгера
+            location = caller.rsplit('/', 1)[-1] if caller else "unknown"
+            return message[:MAX_FINGERPRINT_MESSAGE_LENGTH] or "Error", location
+
+        # Последняя строка traceback - "Тип: сообщение", последний кадр - место, где возникло исключение
+        error_type = lines[-1].split(":", 1)[0].strip()
+        frames = _FRAME_RE.findall(traceback)
+        if not frames:
+            return error_type, "unknown"
+
+        filename, line_number, function = frames[-1]
+        return error_type, f"{filename.rsplit('/', 1)[-1]}:{line_number} {function}"
 
     def _format_telegram_text(self, text: str) -> str:
         # Экранируем специальные символы HTML
@@ -128,6 +238,38 @@ class AlertManager:
                 reply_markup=keyboard
             )
 
+    async def __send_digest_to_tg(self, groups: list[_ErrorGroup], dropped: int):
+        current_time = datetime.now().strftime("%H:%M:%S")
+        total = sum(group.count for group in groups)
+
+        text = f"""🚨 <b>Ошибки в сервисе: {total}</b>
+
+<b>Сервис:</b> <code>{self.service_name}</code>
+<b>Время:</b> <code>{current_time}</code>, окно {self.digest_window:g} с"""
+
+        for group in groups[:MAX_DIGEST_GROUPS]:
+            trace_ids = ", ".join(f"<code>{trace_id}</code>" for trace_id in group.trace_ids if trace_id)
+            text += f"\n\n<b>×{group.count}</b> <code>{group.error_type}</code> в <code>{group.location}</code>"
+            if trace_ids:
+                text += f"\nTraceID: {trace_ids}"
+
+        if len(groups) > MAX_DIGEST_GROUPS:
+            text += f"\n\n<i>И еще групп: {len(groups) - MAX_DIGEST_GROUPS}</i>"
+        if dropped:
+            text += f"\n\n<i>⚠️ Отброшено из-за переполнения очереди: {dropped}</i>"
+
+        text = self._format_telegram_text(text)
+
+        try:
+            await self.bot.send_message(
+                self.alert_tg_chat_id,
+                text,
+                message_thread_id=self.alert_tg_chat_thread_id,
+                parse_mode=ParseMode.HTML
+            )
+        except Exception as e:
+            print(f"Ошибка при отправке дайджеста в Telegram: {e}", flush=True)
+
     async def generate_analysis(self, traceback: str) -> str:
         try:
             system_prompt = """Ты опытный Python-разработчик и специалист по мониторингу.
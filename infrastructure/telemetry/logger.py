@@ -1,8 +1,7 @@
 import logging
-
-import inspect
+import sys
 from contextvars import ContextVar
-from typing import Union
+from typing import Union, Callable
 
 from opentelemetry import trace
 from opentelemetry.sdk._logs import LoggerProvider, LoggingHandler
@@ -12,6 +11,17 @@ from internal import interface
 
 from .alertmanger import AlertManager
 
+_LEVELS = {
+    "DEBUG": logging.DEBUG,
+    "INFO": logging.INFO,
+    "WARN": logging.WARNING,
+    "WARNING": logging.WARNING,
+    "ERROR": logging.ERROR,
+}
+
+# Потолок кэша мест вызова: число строк с логами в коде конечно, но страхуемся от exec/eval
+_MAX_CACHED_CALLERS = 4096
+
 
 class OtelLogger(interface.IOtelLogger):
     def __init__(
@@ -20,29 +30,43 @@ class OtelLogger(interface.IOtelLogger):
             logger_provider: LoggerProvider,
             service_name: str,
             log_context: ContextVar[dict],
+            log_level: str = "DEBUG",
     ):
+        self.min_level = _LEVELS.get(log_level.upper(), logging.INFO)
         self.handler = LoggingHandler(
-            level=logging.DEBUG,
+            level=self.min_level,
             logger_provider=logger_provider
         )
         self.service_name = service_name
         self.log_context = log_context
+        self._message_prefix = service_name + " | "
 
         self.logger = logging.getLogger("main")
-        self.logger.setLevel(logging.DEBUG)
+        self.logger.setLevel(self.min_level)
         self.logger.addHandler(self.handler)
         self.logger.propagate = False
 
         self.alert_manger = alert_manger
 
-    def log(self, level: str, message: str, fields: dict = None) -> None:
-        file_info = self._get_caller_info(3)
+        # (код, смещение инструкции) -> (файл, строка, "файл:строка")
+        self._callers: dict[tuple, tuple[str, int, str]] = {}
+
+    def log(self, level: str, message: str, fields: dict | Callable[[], dict] = None) -> None:
+        log_level = _LEVELS.get(level, logging.INFO)
+        # Уровень проверяется до любой работы с полями и стеком
+        if log_level < self.min_level:
+            return
+
+        filename, line_number, file_info = self._get_caller_info(3)
         attributes: dict = {common.FILE_KEY: file_info}
 
         context_fields = self.log_context.get()
         if context_fields:
             attributes.update(context_fields)
 
+        if callable(fields):
+            fields = fields()
+
         if fields:
             extra_fields = self._extract_extra_params(fields)
             if extra_fields:
@@ -50,27 +74,36 @@ class OtelLogger(interface.IOtelLogger):
                 attributes.update(extra_fields)
 
         current_span = trace.get_current_span()
-        if current_span and current_span.get_span_context().is_valid:
-            span_context = current_span.get_span_context()
-
+        span_context = current_span.get_span_context()
+        if span_context.is_valid:
             trace_id = format(span_context.trace_id, '032x')
             span_id = format(span_context.span_id, '016x')
 
             attributes[common.TRACE_ID_KEY] =trace_id
             attributes[common.SPAN_ID_KEY] =span_id
 
-            if level == "ERROR":
+            if log_level == logging.ERROR:
                 if self.alert_manger is not None:
                     self.alert_manger.send_error_alert(
                         trace_id,
                         span_id,
-                        attributes.get(common.TRACEBACK_KEY, "")
+                        attributes.get(common.TRACEBACK_KEY, ""),
+                        message,
+                        file_info,
                     )
 
-        log_level = getattr(logging, level.upper(), logging.INFO)
-        self.logger.log(log_level, self.service_name + " | " + message, extra=attributes)
-
-
+        # Запись собирается напрямую: logging.Logger.log заново обходил бы стек в findCaller
+        record = self.logger.makeRecord(
+            self.logger.name,
+            log_level,
+            filename,
+            line_number,
+            self._message_prefix + message,
+            None,
+            None,
+            extra=attributes,
+        )
+        self.logger.handle(record)
 
     def _extract_extra_params(self, fields: dict) -> dict:
         extra_attrs = {}
@@ -86,32 +119,31 @@ class OtelLogger(interface.IOtelLogger):
             return value
         return str(value)
 
-    def _get_caller_info(self, skip: int) -> str:
+    def _get_caller_info(self, skip: int) -> tuple[str, int, str]:
         try:
-            frame = inspect.currentframe()
-            for _ in range(skip):
-                if frame is None:
-                    break
-                frame = frame.f_back
-
-            if frame is None:
-                return "unknown:0"
-
+            frame = sys._getframe(skip)
+        except ValueError:
+            return "unknown", 0, "unknown:0"
+
+        # f_lasti однозначно задает место вызова, номер строки по нему считается один раз
+        key = (frame.f_code, frame.f_lasti)
+        caller = self._callers.get(key)
+        if caller is None:
             filename = frame.f_code.co_filename
             line_number = frame.f_lineno
+            caller = (filename, line_number, f"{filename}:{line_number}")
+            if len(self._callers) < _MAX_CACHED_CALLERS:
+                self._callers[key] = caller
+        return caller
 
-            return f"{filename}:{line_number}"
-        except Exception:
-            return "unknown:0"
-
-    def debug(self, message: str, fields: dict = None) -> None:
+    def debug(self, message: str, fields: dict | Callable[[], dict] = None) -> None:
         self.log("DEBUG", message, fields)
 
-    def info(self, message: str, fields: dict = None) -> None:
+    def info(self, message: str, fields: dict | Callable[[], dict] = None) -> None:
         self.log("INFO", message, fields)
 
-    def warning(self, message: str, fields: dict = None) -> None:
+    def warning(self, message: str, fields: dict | Callable[[], dict] = None) -> None:
         self.log("WARN", message, fields)
 
-    def error(self, message: str, fields: dict = None) -> None:
+    def error(self, message: str, fields: dict | Callable[[], dict] = None) -> None:
         self.log("ERROR", message, fields)
@@ -4,8 +4,9 @@ from opentelemetry import trace, metrics, propagate
 from opentelemetry.sdk.trace import TracerProvider, SpanLimits
 from opentelemetry._logs import set_logger_provider
 from opentelemetry.sdk.trace.export import BatchSpanProcessor
-from opentelemetry.sdk.trace.sampling import TraceIdRatioBased, ALWAYS_ON
-from opentelemetry.sdk.metrics import MeterProvider
+from opentelemetry.sdk.trace.sampling import TraceIdRatioBased, ParentBased, ALWAYS_ON
+from opentelemetry.sdk.metrics import MeterProvider, Histogram
+from opentelemetry.sdk.metrics.view import View, ExplicitBucketHistogramAggregation
 from opentelemetry.sdk.metrics.export import PeriodicExportingMetricReader
 from opentelemetry.sdk._logs import LoggerProvider
 from opentelemetry.sdk._logs.export import BatchLogRecordProcessor
@@ -22,6 +23,12 @@ from .logger import OtelLogger
 from .alertmanger import AlertManager
 from internal import interface
 
+# Границы по умолчанию рассчитаны на миллисекунды; длительности в секундах иначе падают в первый бакет
+SECONDS_HISTOGRAM_BOUNDARIES = (
+    0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1, 2.5, 5, 7.5, 10, 30, 60, 120,
+)
+
+
 class Telemetry(interface.ITelemetry):
     def __init__(
             self,
@@ -33,7 +40,9 @@ class Telemetry(interface.ITelemetry):
             otlp_host: str,
             otlp_port: int,
             log_context: ContextVar[dict],
-            alert_manager: AlertManager = None
+            alert_manager: AlertManager = None,
+            trace_sample_ratio: float = 1.0,
+            max_attribute_length: int = 1024,
     ):
 
         self.log_level = log_level
@@ -44,6 +53,8 @@ class Telemetry(interface.ITelemetry):
         self.service_version = service_version
         self.otlp_endpoint = f"{otlp_host}:{otlp_port}"
         self.alert_manager = alert_manager
+        self.trace_sample_ratio = trace_sample_ratio
+        self.max_attribute_length = max_attribute_length
 
         self._setup_telemetry()
 
@@ -71,7 +82,8 @@ class Telemetry(interface.ITelemetry):
         )
 
         if self.environment == "prod":
-            sampler = ALWAYS_ON
+            # Решение о записи принимается в корне трейса и наследуется, трейс не рвется на части
+            sampler = ParentBased(TraceIdRatioBased(self.trace_sample_ratio))
         else:
             sampler = ALWAYS_ON
 
@@ -80,7 +92,7 @@ class Telemetry(interface.ITelemetry):
             max_attributes=256,
             max_events=128,
             max_links=128,
-            max_attribute_length=None
+            max_attribute_length=self.max_attribute_length
         )
 
         self._tracer_provider = TracerProvider(
@@ -116,7 +128,14 @@ class Telemetry(interface.ITelemetry):
 
         self._meter_provider = MeterProvider(
             resource=resource,
-            metric_readers=[reader]
+            metric_readers=[reader],
+            views=[
+                View(
+                    instrument_type=Histogram,
+                    instrument_unit="s",
+                    aggregation=ExplicitBucketHistogramAggregation(SECONDS_HISTOGRAM_BOUNDARIES),
+                ),
+            ],
         )
 
         metrics.set_meter_provider(self._meter_provider)
@@ -157,7 +176,8 @@ class Telemetry(interface.ITelemetry):
             self.alert_manager,
             self._logger_provider,
             self.service_name,
-            self.log_context
+            self.log_context,
+            self.log_level,
         )
 
     def logger(self) -> interface.IOtelLogger:
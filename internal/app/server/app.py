@@ -1,4 +1,8 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from typing import Annotated
+
+from fastapi import FastAPI, Header
+from fastapi.responses import JSONResponse, PlainTextResponse
 
 from internal import model, interface
 
@@ -8,21 +12,76 @@ def NewServer(
         http_middleware: interface.IHttpMiddleware,
         tg_webhook_controller: interface.ITelegramWebhookController,
         prefix: str,
-        environment: str
+        environment: str,
+        update_queue: interface.IUpdateQueue = None,
+        telethon_gateway: interface.ITelethonGateway = None,
+        chat_router: interface.IChatRouter = None,
+        loop_monitor: interface.ILoopMonitor = None,
+        update_profiler: interface.IUpdateProfiler = None,
+        sampling_profiler: interface.ISamplingProfiler = None,
+        interserver_secret_key: str = None,
+        warmup: interface.IWarmup = None,
+        drain_timeout: float = 25,
 ):
     app = FastAPI(
         openapi_url=prefix + "/openapi.json",
         docs_url=prefix + "/docs",
         redoc_url=prefix + "/redoc",
+        lifespan=new_lifespan(
+            tg_webhook_controller, update_queue, telethon_gateway, chat_router, loop_monitor, warmup, drain_timeout
+        ),
     )
     include_http_middleware(app, http_middleware)
 
-    include_db_handler(app, db, prefix, environment)
+    include_db_handler(app, db, prefix, environment, warmup)
     include_tg_webhook(app, tg_webhook_controller, prefix)
+    include_debug_handler(app, loop_monitor, update_profiler, sampling_profiler, prefix, interserver_secret_key)
 
     return app
 
 
+def new_lifespan(
+        tg_webhook_controller: interface.ITelegramWebhookController,
+        update_queue: interface.IUpdateQueue | None,
+        telethon_gateway: interface.ITelethonGateway | None,
+        chat_router: interface.IChatRouter | None,
+        loop_monitor: interface.ILoopMonitor | None,
+        warmup: interface.IWarmup | None,
+        drain_timeout: float,
+):
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        if loop_monitor:
+            await loop_monitor.start()
+        # Прогрев идет в фоне: сервер уже принимает запросы, /health отвечает 503 до его конца
+        if warmup:
+            await warmup.start()
+        if telethon_gateway:
+            await telethon_gateway.start()
+        if update_queue:
+            await update_queue.start()
+        if chat_router:
+            await chat_router.start()
+
+        yield
+
+        # Сначала уходим из кольца реплик, затем дорабатываем уже принятые обновления
+        if chat_router:
+            await chat_router.stop()
+            # Обновления, переданные соседями до выхода из кольца, уже подтверждены им
+            await tg_webhook_controller.drain(drain_timeout)
+        if update_queue:
+            await update_queue.stop()
+        if telethon_gateway:
+            await telethon_gateway.stop()
+        if warmup:
+            await warmup.stop()
+        if loop_monitor:
+            await loop_monitor.stop()
+
+    return lifespan
+
+
 def include_http_middleware(
         app: FastAPI,
         http_middleware: interface.IHttpMiddleware
@@ -77,6 +136,24 @@ def include_tg_webhook(
         methods=["POST"]
     )
 
+    app.add_api_route(
+        prefix + "/video-cut/vizard/notify/generated/batch",
+        tg_webhook_controller.notify_vizard_video_cut_generated_batch,
+        methods=["POST"]
+    )
+
+    app.add_api_route(
+        prefix + "/notify/publication/approved/batch",
+        tg_webhook_controller.notify_publication_approved_alert_batch,
+        methods=["POST"]
+    )
+
+    app.add_api_route(
+        prefix + "/notify/publication/rejected/batch",
+        tg_webhook_controller.notify_publication_rejected_alert_batch,
+        methods=["POST"]
+    )
+
     app.add_api_route(
         prefix + "/file/cache",
         tg_webhook_controller.set_cache_file,
@@ -84,10 +161,115 @@ def include_tg_webhook(
     )
 
 
-def include_db_handler(app: FastAPI, db: interface.IDB, prefix: str, environment: str):
+def include_db_handler(
+        app: FastAPI,
+        db: interface.IDB,
+        prefix: str,
+        environment: str,
+        warmup: interface.IWarmup | None,
+):
     app.add_api_route(prefix + "/table/create", create_table_handler(db), methods=["GET"])
     app.add_api_route(prefix + "/table/drop", drop_table_handler(db, environment), methods=["GET"])
-    app.add_api_route(prefix + "/health", heath_check_handler(), methods=["GET"])
+    app.add_api_route(prefix + "/health", heath_check_handler(warmup), methods=["GET"])
+
+
+def include_debug_handler(
+        app: FastAPI,
+        loop_monitor: interface.ILoopMonitor | None,
+        update_profiler: interface.IUpdateProfiler | None,
+        sampling_profiler: interface.ISamplingProfiler | None,
+        prefix: str,
+        interserver_secret_key: str | None,
+):
+    if loop_monitor:
+        app.add_api_route(
+            prefix + "/debug/loop",
+            loop_debug_handler(loop_monitor, interserver_secret_key),
+            methods=["GET"]
+        )
+
+    if update_profiler:
+        app.add_api_route(
+            prefix + "/debug/updates/{chat_id}",
+            update_profile_handler(update_profiler, interserver_secret_key),
+            methods=["GET"]
+        )
+
+    if sampling_profiler:
+        app.add_api_route(
+            prefix + "/debug/profile",
+            sampling_profile_handler(sampling_profiler, interserver_secret_key),
+            methods=["GET"]
+        )
+
+
+def loop_debug_handler(loop_monitor: interface.ILoopMonitor, interserver_secret_key: str | None):
+    async def loop_debug(
+            limit: int = 20,
+            x_loom_interserver_secret_key: Annotated[str | None, Header()] = None,
+    ):
+        # Стеки и trace id задач не отдаются без межсервисного ключа
+        if not _is_interserver(x_loom_interserver_secret_key, interserver_secret_key):
+            return _wrong_secret_response()
+
+        return loop_monitor.snapshot(limit)
+
+    return loop_debug
+
+
+def update_profile_handler(update_profiler: interface.IUpdateProfiler, interserver_secret_key: str | None):
+    async def update_profile(
+            chat_id: int,
+            limit: int = 20,
+            x_loom_interserver_secret_key: Annotated[str | None, Header()] = None,
+    ):
+        if not _is_interserver(x_loom_interserver_secret_key, interserver_secret_key):
+            return _wrong_secret_response()
+
+        return {"chat_id": chat_id, "updates": update_profiler.updates(chat_id, limit)}
+
+    return update_profile
+
+
+def sampling_profile_handler(sampling_profiler: interface.ISamplingProfiler, interserver_secret_key: str | None):
+    async def sampling_profile(
+            seconds: float = 10,
+            hz: int = 100,
+            mode: str = "cpu",
+            x_loom_interserver_secret_key: Annotated[str | None, Header()] = None,
+    ):
+        if not _is_interserver(x_loom_interserver_secret_key, interserver_secret_key):
+            return _wrong_secret_response()
+
+        if sampling_profiler.busy():
+            return JSONResponse(
+                content={"status": "error", "message": "Profiling is already running"},
+                status_code=409
+            )
+
+        try:
+            collapsed = await sampling_profiler.profile(seconds, hz, mode)
+        except ValueError as err:
+            return JSONResponse(content={"status": "error", "message": str(err)}, status_code=400)
+
+        # Формат collapsed stacks: flamegraph.pl, speedscope, inferno
+        return PlainTextResponse(
+            collapsed,
+            headers={"Content-Disposition": f'attachment; filename="profile-{mode}.collapsed"'}
+        )
+
+    return sampling_profile
+
+
+def _is_interserver(received_key: str | None, interserver_secret_key: str | None) -> bool:
+    return bool(interserver_secret_key) and received_key == interserver_secret_key
+
+
+def _wrong_secret_response() -> JSONResponse:
+    return JSONResponse(
+        content={"status": "error", "message": "Wrong secret token !"},
+        status_code=401
+    )
 
 
 def create_table_handler(db: interface.IDB):
@@ -100,8 +282,14 @@ def create_table_handler(db: interface.IDB):
     return create_table
 
 
-def heath_check_handler():
+def heath_check_handler(warmup: interface.IWarmup | None):
     async def heath_check():
+        # Готовность: пока прогрев не закончился, трафик в процесс не направляется
+        if warmup and not warmup.ready():
+            return JSONResponse(
+                content={"status": "warming_up", **warmup.report()},
+                status_code=503
+            )
         return "ok"
 
     return heath_check
@@ -1,6 +1,6 @@
 from aiogram.filters import Command
 from aiogram_dialog import setup_dialogs, BgManagerFactory
-from aiogram import Dispatcher, Router
+from aiogram import Dispatcher
 
 from internal import interface
 
@@ -9,25 +9,7 @@ def NewTg(
         dp: Dispatcher,
         command_controller: interface.ICommandController,
         tg_middleware: interface.ITelegramMiddleware,
-        auth_dialog: interface.IIntroDialog,
-        main_menu_dialog: interface.IMainMenuDialog,
-        personal_profile_dialog: interface.IPersonalProfileDialog,
-        organization_menu_dialog: interface.IOrganizationMenuDialog,
-        change_employee_dialog: interface.IChangeEmployeeDialog,
-        add_employee_dialog: interface.IAddEmployeeDialog,
-        content_menu_dialog: interface.IContentMenuDialog,
-        generate_publication_dialog: interface.IGeneratePublicationDialog,
-        generate_video_cut_dialog: interface.IGenerateVideoCutDialog,
-        moderation_publication_dialog: interface.IModerationPublicationDialog,
-        moderation_video_cut_dialog: interface.IVideoCutModerationDialog,
-        video_cuts_draft_dialog: interface.IVideoCutsDraftDialog,
-        draft_publication_dialog: interface.IDraftPublicationDialog,
-        add_social_network_dialog: interface.IAddSocialNetworkDialog,
-        alerts_dialog: interface.IAlertsDialog,
-        create_category_dialog: interface.ICreateCategoryDialog,
-        create_organization_dialog: interface.ICreateOrganizationDialog,
-        update_category_dialog: interface.IUpdateCategoryDialog,
-        update_organization_dialog: interface.IUpdateOrganizationDialog,
+        dialog_registry: interface.IDialogRegistry,
 ) -> BgManagerFactory:
     include_command_handlers(
         dp,
@@ -39,25 +21,7 @@ def NewTg(
     )
     dialog_bg_factory = include_dialogs(
         dp,
-        auth_dialog,
-        main_menu_dialog,
-        personal_profile_dialog,
-        organization_menu_dialog,
-        change_employee_dialog,
-        add_employee_dialog,
-        content_menu_dialog,
-        generate_publication_dialog,
-        generate_video_cut_dialog,
-        moderation_publication_dialog,
-        moderation_video_cut_dialog,
-        video_cuts_draft_dialog,
-        draft_publication_dialog,
-        add_social_network_dialog,
-        alerts_dialog,
-        create_category_dialog,
-        create_organization_dialog,
-        update_category_dialog,
-        update_organization_dialog,
+        dialog_registry,
     )
 
     return dialog_bg_factory
@@ -67,6 +31,17 @@ def include_tg_middleware(
         dp: Dispatcher,
         tg_middleware: interface.ITelegramMiddleware,
 ):
+    # Блокировка кнопки снимается, только когда обновление полностью обработано
+    dp.update.outer_middleware(tg_middleware.callback_lock_middleware02)
+    # Профиль задержек охватывает и ожидание блокировки чата
+    dp.update.outer_middleware(tg_middleware.update_profiler_middleware)
+    dp.update.outer_middleware(tg_middleware.chat_lock_middleware00)
+
+    # Записи FSM за обновление копятся в пакет; сбрасываются при снятии блокировки стека диалогов
+    batch_middleware = getattr(dp.storage, "batch_middleware", None)
+    if batch_middleware:
+        dp.update.outer_middleware(batch_middleware)
+
     dp.update.middleware(tg_middleware.logger_middleware01)
 
 
@@ -82,51 +57,15 @@ def include_command_handlers(
 
 def include_dialogs(
         dp: Dispatcher,
-        auth_dialog: interface.IIntroDialog,
-        main_menu_dialog: interface.IMainMenuDialog,
-        personal_profile_dialog: interface.IPersonalProfileDialog,
-        organization_menu_dialog: interface.IOrganizationMenuDialog,
-        change_employee_dialog: interface.IChangeEmployeeDialog,
-        add_employee_dialog: interface.IAddEmployeeDialog,
-        content_menu_dialog: interface.IContentMenuDialog,
-        generate_publication_dialog: interface.IGeneratePublicationDialog,
-        generate_video_cut_dialog: interface.IGenerateVideoCutDialog,
-        moderation_publication_dialog: interface.IModerationPublicationDialog,
-        moderation_video_cut_dialog: interface.IVideoCutModerationDialog,
-        video_cuts_draft_dialog: interface.IVideoCutsDraftDialog,
-        draft_publication_dialog: interface.IDraftPublicationDialog,
-        add_social_network_dialog: interface.IAddSocialNetworkDialog,
-        alerts_dialog: interface.IAlertsDialog,
-        create_category_dialog: interface.ICreateCategoryDialog,
-        create_organization_dialog: interface.ICreateOrganizationDialog,
-        update_category_dialog: interface.IUpdateCategoryDialog,
-        update_organization_dialog: interface.IUpdateOrganizationDialog,
+        dialog_registry: interface.IDialogRegistry,
 ) -> BgManagerFactory:
-    dialog_router = Router()
-    dialog_router.include_routers(
-        auth_dialog.get_dialog(),
-        main_menu_dialog.get_dialog(),
-        personal_profile_dialog.get_dialog(),
-        organization_menu_dialog.get_dialog(),
-        change_employee_dialog.get_dialog(),
-        add_employee_dialog.get_dialog(),
-        content_menu_dialog.get_dialog(),
-        generate_publication_dialog.get_dialog(),
-        moderation_publication_dialog.get_dialog(),
-        generate_video_cut_dialog.get_dialog(),
-        moderation_video_cut_dialog.get_dialog(),
-        video_cuts_draft_dialog.get_dialog(),
-        draft_publication_dialog.get_dialog(),
-        add_social_network_dialog.get_dialog(),
-        alerts_dialog.get_dialog(),
-        create_category_dialog.get_dialog(),
-        create_organization_dialog.get_dialog(),
-        update_category_dialog.get_dialog(),
-        update_organization_dialog.get_dialog(),
-    )
-
-    dp.include_routers(dialog_router)
+    # Диалоги собираются прогревом; если обновление пришло раньше - перед его обработкой
+    dp.update.outer_middleware(dialog_registry.build_middleware)
+    dp.include_routers(dialog_registry.router)
 
-    dialog_bg_factory = setup_dialogs(dp)
+    # Пакетное хранилище сбрасывает записи, пока блокировка стека еще держится: иначе
+    # без блокировки чата (inline-режим) соседнее обновление прочитало бы старый стек
+    events_isolation = getattr(dp.storage, "events_isolation", None)
+    dialog_bg_factory = setup_dialogs(dp, events_isolation=events_isolation() if events_isolation else None)
 
     return dialog_bg_factory
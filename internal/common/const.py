@@ -1,4 +1,4 @@
-from enum import Enum
+from enum import Enum, IntEnum
 
 
 class Role(Enum):
@@ -7,6 +7,13 @@ class Role(Enum):
     ADMIN = "admin"
 
 
+class SendPriority(IntEnum):
+    # Меньше значение - раньше уходит запрос к Bot API
+    INTERACTIVE = 0
+    NOTIFICATION = 1
+    CHAT_ACTION = 2
+
+
 TRACE_ID_KEY = "trace_id"
 SPAN_ID_KEY = "span_id"
 FILE_KEY = "file"
@@ -25,3 +32,51 @@ TELEGRAM_MESSAGE_DURATION_KEY = "telegram.message.duration"
 TELEGRAM_CHAT_ID_KEY = "telegram.chat.id"
 TELEGRAM_EVENT_TYPE_KEY = "telegram.event.type"
 TELEGRAM_USER_USERNAME_KEY = "telegram.user.username"
+
+PUBLICATION_TEXT_WITH_IMAGE_DURATION_KEY = "publication.text_with_image.duration"
+PUBLICATION_GENERATION_MODE_KEY = "publication.generation.mode"
+
+TEXT_VARIANT_POOL_HIT_KEY = "publication.text_variant_pool.hit"
+TEXT_VARIANT_POOL_MISS_KEY = "publication.text_variant_pool.miss"
+TEXT_VARIANT_POOL_GENERATED_KEY = "publication.text_variant_pool.generated"
+TEXT_VARIANT_POOL_WASTED_COST_KEY = "publication.text_variant_pool.wasted_cost"
+TEXT_VARIANT_POOL_SCOPE_KEY = "publication.text_variant_pool.scope"
+
+TRANSCRIPT_CACHE_HIT_KEY = "transcript_cache.hit"
+TRANSCRIPT_CACHE_MISS_KEY = "transcript_cache.miss"
+TRANSCRIPT_CACHE_SAVED_AUDIO_KEY = "transcript_cache.saved_audio"
+TRANSCRIPT_CACHE_SAVED_COST_KEY = "transcript_cache.saved_cost"
+
+UPDATE_QUEUE_DEPTH_KEY = "telegram.update_queue.depth"
+UPDATE_QUEUE_LAG_KEY = "telegram.update_queue.lag"
+UPDATE_QUEUE_MAX_CHAT_LAG_KEY = "telegram.update_queue.chat_lag.max"
+UPDATE_QUEUE_REJECTED_KEY = "telegram.update_queue.rejected"
+UPDATE_DUPLICATE_KEY = "telegram.update.duplicate"
+
+CALLBACK_LOCK_SUPPRESSED_KEY = "telegram.callback_lock.suppressed"
+CALLBACK_LOCK_SCOPE_KEY = "telegram.callback_lock.scope"
+
+SEND_SCHEDULER_QUEUE_DELAY_KEY = "telegram.send_scheduler.queue_delay"
+SEND_SCHEDULER_RETRY_AFTER_KEY = "telegram.send_scheduler.retry_after"
+SEND_SCHEDULER_PRIORITY_KEY = "telegram.send_scheduler.priority"
+
+CHAT_LOCK_WAIT_KEY = "telegram.chat_lock.wait"
+CHAT_LOCK_TIMEOUT_KEY = "telegram.chat_lock.timeout"
+
+CHAT_ROUTER_FORWARDED_KEY = "telegram.chat_router.forwarded"
+CHAT_ROUTER_FALLBACK_KEY = "telegram.chat_router.fallback"
+CHAT_ROUTER_TIMEOUT_KEY = "telegram.chat_router.timeout"
+
+FSM_STORAGE_WRITTEN_KEY = "telegram.fsm_storage.written"
+FSM_STORAGE_SKIPPED_KEY = "telegram.fsm_storage.skipped"
+
+METHOD_DURATION_KEY = "code.method.duration"
+METHOD_ERRORS_KEY = "code.method.errors"
+CODE_NAMESPACE_KEY = "code.namespace"
+CODE_FUNCTION_KEY = "code.function"
+DIALOG_STATE_KEY = "dialog.state"
+OUTCOME_KEY = "outcome"
+ERROR_TYPE_KEY = "error.type"
+
+EVENT_LOOP_LAG_KEY = "event_loop.lag"
+EVENT_LOOP_STALL_KEY = "event_loop.stall"
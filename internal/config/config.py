@@ -1,4 +1,5 @@
 import os
+import socket
 
 
 class Config:
@@ -14,9 +15,81 @@ class Config:
         self.tg_bot_token: str = os.environ.get('LOOM_TG_BOT_TOKEN')
         self.domain: str = os.environ.get("LOOM_DOMAIN")
         self.proxy: str = os.environ.get("PROXY")
+        # Свой сервер Bot API (локальный telegram-bot-api, фейк нагрузочного теста); пусто - api.telegram.org
+        self.tg_bot_api_url = os.getenv("LOOM_TG_BOT_API_URL", "")
 
         self.interserver_secret_key = os.getenv("LOOM_INTERSERVER_SECRET_KEY")
 
+        # Режим генерации текста с изображением: sequential | pipelined
+        self.publication_pipeline_mode = os.getenv("LOOM_TG_BOT_PUBLICATION_PIPELINE_MODE", "sequential")
+
+        # Пул заранее сгенерированных вариантов текста для "перегенерации", 0 - выключен
+        self.text_variant_pool_size = int(os.getenv("LOOM_TG_BOT_TEXT_VARIANT_POOL_SIZE", "0"))
+        self.text_variant_pool_ttl = int(os.getenv("LOOM_TG_BOT_TEXT_VARIANT_POOL_TTL", "600"))
+        self.text_variant_pool_organization_budget_rub = float(
+            os.getenv("LOOM_TG_BOT_TEXT_VARIANT_POOL_ORGANIZATION_BUDGET_RUB", "30")
+        )
+        self.text_variant_pool_variant_rub_cost = float(
+            os.getenv("LOOM_TG_BOT_TEXT_VARIANT_POOL_VARIANT_RUB_COST", "3")
+        )
+
+        # Кэш расшифровок голосовых по file_unique_id
+        self.transcript_cache_ttl = int(os.getenv("LOOM_TG_BOT_TRANSCRIPT_CACHE_TTL", "86400"))
+        self.transcript_rub_cost_per_minute = float(os.getenv("LOOM_TG_BOT_TRANSCRIPT_RUB_COST_PER_MINUTE", "1"))
+        self.transcript_cache_redis_db = int(os.getenv("LOOM_TG_BOT_TRANSCRIPT_CACHE_REDIS_DB", "3"))
+
+        # Прием вебхуков: inline - обработка в запросе, queue - быстрый ответ и очередь с воркерами
+        self.webhook_mode = os.getenv("LOOM_TG_BOT_WEBHOOK_MODE", "inline")
+        self.update_queue_workers = int(os.getenv("LOOM_TG_BOT_UPDATE_QUEUE_WORKERS", "16"))
+        self.update_queue_max_size = int(os.getenv("LOOM_TG_BOT_UPDATE_QUEUE_MAX_SIZE", "1000"))
+        self.update_queue_put_timeout = float(os.getenv("LOOM_TG_BOT_UPDATE_QUEUE_PUT_TIMEOUT", "1"))
+        self.update_queue_drain_timeout = float(os.getenv("LOOM_TG_BOT_UPDATE_QUEUE_DRAIN_TIMEOUT", "25"))
+
+        # Дедупликация повторных доставок вебхука: memory - в процессе, redis - общая для всех инстансов
+        self.update_dedupe_backend = os.getenv("LOOM_TG_BOT_UPDATE_DEDUPE_BACKEND", "memory")
+        self.update_dedupe_ttl = int(os.getenv("LOOM_TG_BOT_UPDATE_DEDUPE_TTL", "600"))
+        self.update_dedupe_ring_size = int(os.getenv("LOOM_TG_BOT_UPDATE_DEDUPE_RING_SIZE", "10000"))
+        self.update_dedupe_redis_db = int(os.getenv("LOOM_TG_BOT_UPDATE_DEDUPE_REDIS_DB", "4"))
+
+        # Группы кнопок, которые нельзя запускать повторно, пока предыдущее нажатие в работе
+        self.callback_lock_scopes = os.getenv(
+            "LOOM_TG_BOT_CALLBACK_LOCK_SCOPES",
+            "generate:text_only|with_image|regenerate_all|generate_image|auto_generate|custom_generate;"
+            "publish:publish_now|approve|send_moderation|save_draft|save_edits"
+        )
+        self.callback_lock_ttl = int(os.getenv("LOOM_TG_BOT_CALLBACK_LOCK_TTL", "180"))
+
+        # Лимиты исходящих запросов к Bot API
+        self.send_global_rate = float(os.getenv("LOOM_TG_BOT_SEND_GLOBAL_RATE", "30"))
+        self.send_chat_rate = float(os.getenv("LOOM_TG_BOT_SEND_CHAT_RATE", "1"))
+        self.send_chat_burst = int(os.getenv("LOOM_TG_BOT_SEND_CHAT_BURST", "3"))
+
+        # Несколько воркеров uvicorn или реплик: блокировка чатов, владелец Telethon и общий circuit breaker в Redis
+        self.http_workers = int(os.getenv("LOOM_TG_BOT_HTTP_WORKERS", "1"))
+        self.multi_instance = self.http_workers > 1 or os.getenv("LOOM_TG_BOT_MULTI_INSTANCE", "false") == "true"
+
+        # Маршрутизация вебхука между репликами по chat_id (консистентное хеширование)
+        self.chat_sharding = os.getenv("LOOM_TG_BOT_CHAT_SHARDING", "false") == "true"
+        self.multi_instance = self.multi_instance or self.chat_sharding
+        self.replica_url = os.getenv("LOOM_TG_BOT_REPLICA_URL", f"http://{socket.gethostname()}:{self.http_port}")
+        self.chat_sharding_replicas = [
+            replica for replica in os.getenv("LOOM_TG_BOT_CHAT_SHARDING_REPLICAS", "").split(",") if replica
+        ]
+        self.chat_sharding_virtual_nodes = int(os.getenv("LOOM_TG_BOT_CHAT_SHARDING_VIRTUAL_NODES", "64"))
+        self.chat_sharding_heartbeat_ttl = int(os.getenv("LOOM_TG_BOT_CHAT_SHARDING_HEARTBEAT_TTL", "15"))
+        self.chat_sharding_forward_timeout = float(os.getenv("LOOM_TG_BOT_CHAT_SHARDING_FORWARD_TIMEOUT", "5"))
+        self.chat_sharding_down_cooldown = float(os.getenv("LOOM_TG_BOT_CHAT_SHARDING_DOWN_COOLDOWN", "30"))
+        self.shared_state_redis_db = int(os.getenv("LOOM_TG_BOT_SHARED_STATE_REDIS_DB", "5"))
+        self.chat_lock_ttl = int(os.getenv("LOOM_TG_BOT_CHAT_LOCK_TTL", "60"))
+        # Circuit breaker клиентов сервисов Loom; в режиме нескольких воркеров счетчик ошибок общий
+        self.loom_circuit_breaker_enabled = os.getenv("LOOM_TG_BOT_LOOM_CIRCUIT_BREAKER", "false") == "true"
+        self.chat_lock_wait_timeout = float(os.getenv("LOOM_TG_BOT_CHAT_LOCK_WAIT_TIMEOUT", "30"))
+        self.telethon_owner_ttl = int(os.getenv("LOOM_TG_BOT_TELETHON_OWNER_TTL", "30"))
+        self.telethon_request_timeout = float(os.getenv("LOOM_TG_BOT_TELETHON_REQUEST_TIMEOUT", "60"))
+
+        # Сколько диалогов уведомлений запускается параллельно при пакетной рассылке
+        self.notify_fanout_concurrency = int(os.getenv("LOOM_TG_BOT_NOTIFY_FANOUT_CONCURRENCY", "10"))
+
         # PostgreSQL configuration
         self.db_host = os.getenv("LOOM_TG_BOT_POSTGRES_CONTAINER_NAME", "localhost")
         self.db_port = "5432"
@@ -29,12 +102,45 @@ class Config:
         self.alert_tg_chat_id = int(os.getenv("LOOM_ALERT_TG_CHAT_ID", "0"))
         self.alert_tg_chat_thread_id = int(os.getenv("LOOM_ALERT_TG_CHAT_THREAD_ID", "0"))
         self.grafana_url = os.getenv("LOOM_GRAFANA_URL", "")
+        # Алерты об ошибках: размер очереди, окно дайджеста (с) и дедупликация отпечатка в Redis (с)
+        self.alert_queue_size = int(os.getenv("LOOM_ALERT_QUEUE_SIZE", "1000"))
+        self.alert_digest_window = float(os.getenv("LOOM_ALERT_DIGEST_WINDOW", "10"))
+        self.alert_dedup_ttl = int(os.getenv("LOOM_ALERT_DEDUP_TTL", "60"))
 
         self.monitoring_redis_host = os.getenv("LOOM_MONITORING_REDIS_CONTAINER_NAME", "localhost")
         self.monitoring_redis_port = int(os.getenv("LOOM_MONITORING_REDIS_PORT", "6379"))
         self.monitoring_redis_db = int(os.getenv("LOOM_MONITORING_DEDUPLICATE_ERROR_ALERT_REDIS_DB", "0"))
         self.monitoring_redis_password = os.getenv("LOOM_MONITORING_REDIS_PASSWORD", "")
 
+        # Доля трейсов, записываемых в prod, и предельная длина строкового атрибута спана
+        self.trace_sample_ratio = float(os.getenv("LOOM_TG_BOT_TRACE_SAMPLE_RATIO", "0.1"))
+        self.trace_max_attribute_length = int(os.getenv("LOOM_TG_BOT_TRACE_MAX_ATTRIBUTE_LENGTH", "1024"))
+
+        # Логи @auto_log: all | sampled | slow_or_error; порог медленного вызова в секундах
+        self.auto_log_mode = os.getenv("LOOM_TG_BOT_AUTO_LOG_MODE", "all")
+        self.auto_log_sample_ratio = float(os.getenv("LOOM_TG_BOT_AUTO_LOG_SAMPLE_RATIO", "0.1"))
+        self.auto_log_slow_threshold = float(os.getenv("LOOM_TG_BOT_AUTO_LOG_SLOW_THRESHOLD", "1"))
+
+        # Монитор цикла событий: период пробного таймера и порог блокирующего callback, секунды
+        self.loop_monitor_enabled = os.getenv("LOOM_TG_BOT_LOOP_MONITOR", "true") == "true"
+        self.loop_monitor_interval = float(os.getenv("LOOM_TG_BOT_LOOP_MONITOR_INTERVAL", "0.5"))
+        self.loop_monitor_slow_threshold = float(os.getenv("LOOM_TG_BOT_LOOP_MONITOR_SLOW_THRESHOLD", "0.1"))
+
+        # Профиль задержек последних обновлений чата в памяти процесса
+        self.update_profiler_enabled = os.getenv("LOOM_TG_BOT_UPDATE_PROFILER", "true") == "true"
+        self.update_profiler_updates_per_chat = int(os.getenv("LOOM_TG_BOT_UPDATE_PROFILER_UPDATES_PER_CHAT", "20"))
+        self.update_profiler_max_chats = int(os.getenv("LOOM_TG_BOT_UPDATE_PROFILER_MAX_CHATS", "2000"))
+
+        # Сэмплирующий профилировщик по запросу: предельная длительность (с) и частота (Гц)
+        self.sampling_profiler_max_seconds = float(os.getenv("LOOM_TG_BOT_SAMPLING_PROFILER_MAX_SECONDS", "60"))
+        self.sampling_profiler_max_hz = int(os.getenv("LOOM_TG_BOT_SAMPLING_PROFILER_MAX_HZ", "250"))
+
+        # Прогрев после старта: сборка диалогов и соединения с зависимостями; до его конца /health отвечает 503
+        self.warmup_enabled = os.getenv("LOOM_TG_BOT_WARMUP", "true") == "true"
+        self.warmup_timeout = float(os.getenv("LOOM_TG_BOT_WARMUP_TIMEOUT", "10"))
+        self.warmup_pg_connections = int(os.getenv("LOOM_TG_BOT_WARMUP_PG_CONNECTIONS", "5"))
+        self.warmup_http_connections = int(os.getenv("LOOM_TG_BOT_WARMUP_HTTP_CONNECTIONS", "2"))
+
         # Настройки OpenTelemetry
         self.otlp_host = os.getenv("LOOM_OTEL_COLLECTOR_CONTAINER_NAME", "loom-otel-collector")
         self.otlp_port = int(os.getenv("LOOM_OTEL_COLLECTOR_GRPC_PORT", "4317"))
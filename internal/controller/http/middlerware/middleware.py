@@ -1,7 +1,7 @@
+import json
 from contextvars import ContextVar
-from typing import Callable
-from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI
+from starlette.types import ASGIApp, Scope, Receive, Send, Message
 
 from opentelemetry import propagate
 from opentelemetry.semconv.trace import SpanAttributes
@@ -9,10 +9,14 @@ from opentelemetry.trace import SpanKind, Status, StatusCode
 
 from internal import interface
 from internal import common
-from pkg.trace_wrapper import traced_method
 
 
 class HttpMiddleware(interface.IHttpMiddleware):
+    """
+    HTTP middleware на чистом ASGI: без BaseHTTPMiddleware и call_next,
+    чтобы не тратить лишнюю задачу и копирование тела на каждый вебхук.
+    """
+
     def __init__(
             self,
             tel: interface.ITelemetry,
@@ -26,71 +30,115 @@ class HttpMiddleware(interface.IHttpMiddleware):
         self.log_context = log_context
 
     def trace_middleware01(self, app: FastAPI):
-        @app.middleware("http")
-        async def _trace_middleware01(request: Request, call_next: Callable):
-            if self.prefix not in request.url.path:
-                return JSONResponse(
-                    status_code=404,
-                    content={"error": "not found"}
-                )
-            with self.tracer.start_as_current_span(
-                    f"{request.method} {request.url.path}",
-                    context=propagate.extract(dict(request.headers)),
-                    kind=SpanKind.SERVER,
-                    attributes={
-                        SpanAttributes.HTTP_ROUTE: str(request.url.path),
-                        SpanAttributes.HTTP_METHOD: request.method,
-                    }
-            ) as root_span:
-                try:
-                    response = await call_next(request)
+        http_middleware = self
+
+        class _TraceMiddleware01:
+            def __init__(self, app: ASGIApp):
+                self.app = app
+
+            async def __call__(self, scope: Scope, receive: Receive, send: Send):
+                if scope["type"] != "http":
+                    return await self.app(scope, receive, send)
+
+                path = scope["path"]
+                if http_middleware.prefix not in path:
+                    return await _send_json(send, 404, {"error": "not found"})
+
+                response_start = {}
+
+                async def _send(message: Message):
+                    if message["type"] == "http.response.start":
+                        response_start.update(message)
+                    await send(message)
+
+                with http_middleware.tracer.start_as_current_span(
+                        f"{scope['method']} {path}",
+                        context=propagate.extract(_headers(scope)),
+                        kind=SpanKind.SERVER,
+                        attributes={
+                            SpanAttributes.HTTP_ROUTE: str(path),
+                            SpanAttributes.HTTP_METHOD: scope["method"],
+                        }
+                ) as root_span:
+                    try:
+                        await self.app(scope, receive, _send)
+
+                        root_span.set_attributes({
+                            SpanAttributes.HTTP_STATUS_CODE: response_start.get("status", 0),
+                        })
+
+                        response_size = _response_header(response_start, b"content-length")
+                        if response_size:
+                            try:
+                                root_span.set_attribute(SpanAttributes.HTTP_RESPONSE_BODY_SIZE, int(response_size))
+                            except ValueError:
+                                pass
+
+                        root_span.set_status(Status(StatusCode.OK))
+
+                    except Exception as err:
+                        root_span.set_status(StatusCode.ERROR, str(err))
+                        if response_start:
+                            raise
+
+                        await _send_json(send, 500, {"message": "Internal Server Error"})
+
+        app.add_middleware(_TraceMiddleware01)
+        return _TraceMiddleware01
+
+    def logger_middleware02(self, app: FastAPI):
+        http_middleware = self
+
+        class _LoggerMiddleware02:
+            def __init__(self, app: ASGIApp):
+                self.app = app
+
+            async def __call__(self, scope: Scope, receive: Receive, send: Send):
+                if scope["type"] != "http":
+                    return await self.app(scope, receive, send)
+
+                headers = _headers(scope)
+                context_token = http_middleware.log_context.set({
+                    common.TELEGRAM_USER_USERNAME_KEY: headers.get(common.TELEGRAM_USER_USERNAME_KEY, ""),
+                    common.TELEGRAM_CHAT_ID_KEY: headers.get(common.TELEGRAM_CHAT_ID_KEY, "0"),
+                    common.TELEGRAM_EVENT_TYPE_KEY: headers.get(common.TELEGRAM_EVENT_TYPE_KEY, ""),
+                    common.ORGANIZATION_ID_KEY: headers.get(common.ORGANIZATION_ID_KEY, "0"),
+                    common.ACCOUNT_ID_KEY: headers.get(common.ACCOUNT_ID_KEY, "0"),
+                })
+
+                async def _send(message: Message):
+                    if message["type"] == "http.response.start" and 400 <= message["status"] < 500:
+                        http_middleware.logger.warning("Обработка HTTP запроса завершена с ошибкой клиента")
+                    await send(message)
 
-                    status_code = response.status_code
-                    response_size = response.headers.get("content-length")
+                try:
+                    await self.app(scope, receive, _send)
+                finally:
+                    http_middleware.log_context.reset(context_token)
 
-                    root_span.set_attributes({
-                        SpanAttributes.HTTP_STATUS_CODE: status_code,
-                    })
+        app.add_middleware(_LoggerMiddleware02)
+        return _LoggerMiddleware02
 
-                    if response_size:
-                        try:
-                            root_span.set_attribute(SpanAttributes.HTTP_RESPONSE_BODY_SIZE, int(response_size))
-                        except ValueError:
-                            pass
 
-                    root_span.set_status(Status(StatusCode.OK))
+def _headers(scope: Scope) -> dict[str, str]:
+    return {name.decode("latin-1"): value.decode("latin-1") for name, value in scope["headers"]}
 
-                    return response
 
-                except Exception as err:
-                    root_span.set_status(StatusCode.ERROR, str(err))
-                    return JSONResponse(
-                        status_code=500,
-                        content={"message": "Internal Server Error"},
-                    )
+def _response_header(response_start: dict, name: bytes) -> str | None:
+    for header_name, value in response_start.get("headers", []):
+        if header_name.lower() == name:
+            return value.decode("latin-1")
+    return None
 
-        return _trace_middleware01
 
-    def logger_middleware02(self, app: FastAPI):
-        @app.middleware("http")
-        async def _logger_middleware02(request: Request, call_next: Callable):
-            context_token = self.log_context.set({
-                common.TELEGRAM_USER_USERNAME_KEY: request.headers.get(common.TELEGRAM_USER_USERNAME_KEY, ""),
-                common.TELEGRAM_CHAT_ID_KEY: request.headers.get(common.TELEGRAM_CHAT_ID_KEY, "0"),
-                common.TELEGRAM_EVENT_TYPE_KEY: request.headers.get(common.TELEGRAM_EVENT_TYPE_KEY, ""),
-                common.ORGANIZATION_ID_KEY: request.headers.get(common.ORGANIZATION_ID_KEY, "0"),
-                common.ACCOUNT_ID_KEY: request.headers.get(common.ACCOUNT_ID_KEY, "0"),
-            })
-            try:
-                response = await call_next(request)
-
-                status_code = response.status_code
-
-                if 400 <= status_code < 500:
-                    self.logger.warning("Обработка HTTP запроса завершена с ошибкой клиента")
-
-                return response
-            finally:
-                self.log_context.reset(context_token)
-
-        return _logger_middleware02
+async def _send_json(send: Send, status_code: int, content: dict) -> None:
+    body = json.dumps(content).encode()
+    await send({
+        "type": "http.response.start",
+        "status": status_code,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
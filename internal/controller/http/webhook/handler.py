@@ -1,3 +1,5 @@
+import asyncio
+from contextvars import ContextVar
 from typing import Annotated
 
 from aiogram import Bot, Dispatcher
@@ -6,7 +8,7 @@ from aiogram_dialog import BgManagerFactory, ShowMode, StartMode
 from fastapi import Header
 from starlette.responses import JSONResponse
 
-from internal import interface, model
+from internal import interface, model, common
 from pkg.log_wrapper import auto_log
 from pkg.trace_wrapper import traced_method
 from .model import *
@@ -22,7 +24,13 @@ class TelegramWebhookController(interface.ITelegramWebhookController):
             dialog_bg_factory: BgManagerFactory,
             domain: str,
             prefix: str,
-            interserver_secret_key: str
+            interserver_secret_key: str,
+            update_queue: interface.IUpdateQueue = None,
+            update_deduplicator: interface.IUpdateDeduplicator = None,
+            send_priority: ContextVar[common.SendPriority] = None,
+            notify_fanout_concurrency: int = 10,
+            chat_router: interface.IChatRouter = None,
+            callback_lock: interface.ICallbackLock = None,
     ):
         self.tracer = tel.tracer()
         self.logger = tel.logger()
@@ -35,23 +43,106 @@ class TelegramWebhookController(interface.ITelegramWebhookController):
         self.domain = domain
         self.prefix = prefix
         self.interserver_secret_key = interserver_secret_key
+        self.update_queue = update_queue
+        self.update_deduplicator = update_deduplicator
+        self.send_priority = send_priority
+        self.notify_fanout_concurrency = notify_fanout_concurrency
+        self.chat_router = chat_router
+        self.callback_lock = callback_lock
+
+        # Обработка обновлений, переданных другой репликой: ссылки держат задачи до завершения
+        self._forwarded_tasks: set[asyncio.Task] = set()
+        self._draining = False
 
     @traced_method()
     async def bot_webhook(
             self,
             update: dict,
-            x_telegram_bot_api_secret_token: Annotated[str | None, Header()] = None
+            x_telegram_bot_api_secret_token: Annotated[str | None, Header()] = None,
+            x_loom_forwarded_by: Annotated[str | None, Header()] = None,
     ):
         if x_telegram_bot_api_secret_token != "secret":
             return {"status": "error", "message": "Wrong secret token !"}
 
         telegram_update = Update(**update)
+
+        # Чат принадлежит другой реплике - отдаем обновление ей, уже переданное не маршрутизируем повторно
+        if self.chat_router and x_loom_forwarded_by is None:
+            if await self.chat_router.forward(telegram_update, update, x_telegram_bot_api_secret_token):
+                return None
+
+        # Повторная доставка того же обновления не должна снова запускать обработчики
+        if self.update_deduplicator and await self.update_deduplicator.is_duplicate(telegram_update.update_id):
+            return None
+
+        # Повторное нажатие кнопки отклоняется до очереди и блокировки чата, иначе оно дождалось бы первого
+        if self.callback_lock and not await self.callback_lock.acquire(telegram_update):
+            await self.bot.answer_callback_query(
+                telegram_update.callback_query.id,
+                text="⏳ Еще выполняется, подождите...",
+            )
+            return None
+
+        # Быстрый ответ Telegram: обновление обработается воркером очереди
+        if self.update_queue:
+            if not await self.update_queue.put(telegram_update):
+                if self.update_deduplicator:
+                    await self.update_deduplicator.forget(telegram_update.update_id)
+                if self.callback_lock:
+                    await self.callback_lock.release(telegram_update.update_id)
+                return JSONResponse(
+                    content={"status": "error", "message": "Update queue is full"},
+                    status_code=503
+                )
+            return None
+
+        # Реплика, передавшая обновление, ждет только подтверждения приема, а не обработки
+        if x_loom_forwarded_by is not None:
+            # При остановке не принимаем: на ошибку передавшая реплика отдаст обновление другому владельцу
+            if self._draining:
+                if self.update_deduplicator:
+                    await self.update_deduplicator.forget(telegram_update.update_id)
+                if self.callback_lock:
+                    await self.callback_lock.release(telegram_update.update_id)
+                return JSONResponse(
+                    content={"status": "error", "message": "Replica is shutting down"},
+                    status_code=503
+                )
+
+            task = asyncio.create_task(self._feed_forwarded_update(telegram_update))
+            self._forwarded_tasks.add(task)
+            task.add_done_callback(self._forwarded_tasks.discard)
+            return None
+
         await self.dp.feed_webhook_update(
             bot=self.bot,
             update=telegram_update
         )
         return None
 
+    async def _feed_forwarded_update(self, telegram_update: Update) -> None:
+        try:
+            await self.dp.feed_webhook_update(
+                bot=self.bot,
+                update=telegram_update
+            )
+        except Exception:
+            # Ошибку уже записал диспетчер aiogram, ответа вебхука для нее нет
+            pass
+
+    async def drain(self, timeout: float) -> None:
+        self._draining = True
+        if not self._forwarded_tasks:
+            return
+
+        # Прием уже подтвержден передавшей реплике: без ожидания обновление потерялось бы при остановке
+        _, pending = await asyncio.wait(set(self._forwarded_tasks), timeout=timeout)
+        if pending:
+            self.logger.warning(
+                "Переданные обновления не успели обработаться до остановки",
+                {"pending_updates": len(pending)}
+            )
+
     @auto_log()
     @traced_method()
     async def bot_set_webhook(self):
@@ -96,6 +187,8 @@ class TelegramWebhookController(interface.ITelegramWebhookController):
                 status_code=401
             )
 
+        self._mark_notification_sends()
+
         user_state = (await self.state_service.state_by_account_id(
             body.account_id
         ))[0]
@@ -130,6 +223,8 @@ class TelegramWebhookController(interface.ITelegramWebhookController):
                 status_code=401
             )
 
+        self._mark_notification_sends()
+
         user_state = (await self.state_service.state_by_account_id(
             body.account_id
         ))[0]
@@ -171,6 +266,8 @@ class TelegramWebhookController(interface.ITelegramWebhookController):
                 status_code=401
             )
 
+        self._mark_notification_sends()
+
         user_state = (await self.state_service.state_by_account_id(
             body.account_id
         ))[0]
@@ -216,6 +313,8 @@ class TelegramWebhookController(interface.ITelegramWebhookController):
                 status_code=401
             )
 
+        self._mark_notification_sends()
+
         user_state = (await self.state_service.state_by_account_id(
             body.account_id
         ))[0]
@@ -260,6 +359,8 @@ class TelegramWebhookController(interface.ITelegramWebhookController):
                 status_code=401
             )
 
+        self._mark_notification_sends()
+
         user_state = (await self.state_service.state_by_account_id(
             body.account_id
         ))[0]
@@ -291,6 +392,120 @@ class TelegramWebhookController(interface.ITelegramWebhookController):
             status_code=200
         )
 
+    @auto_log()
+    @traced_method()
+    async def notify_vizard_video_cut_generated_batch(
+            self,
+            body: NotifyVizardVideoCutGeneratedBatch,
+    ) -> JSONResponse:
+        if body.interserver_secret_key != self.interserver_secret_key:
+            self.logger.warning("Не верный межсервисный ключ")
+            return JSONResponse(
+                content={"status": "error", "message": "Wrong secret token !"},
+                status_code=401
+            )
+
+        self._mark_notification_sends()
+
+        states_by_account_id = await self._states_by_account_id([item.account_id for item in body.items])
+        items = [item for item in body.items if item.account_id in states_by_account_id]
+
+        if items:
+            await self.state_service.create_vizard_video_cut_alerts([
+                (states_by_account_id[item.account_id].id, item.youtube_video_reference, item.video_count)
+                for item in items
+            ])
+
+        notified = await self._show_alerts(
+            [states_by_account_id[item.account_id] for item in items],
+            model.AlertsStates.video_generated_alert,
+        )
+
+        return JSONResponse(
+            content={
+                "status": "ok",
+                "notified": notified,
+                "missing_account_ids": self._missing_account_ids(body.items, states_by_account_id),
+            },
+            status_code=200
+        )
+
+    @auto_log()
+    @traced_method()
+    async def notify_publication_approved_alert_batch(
+            self,
+            body: NotifyPublicationApprovedBatchBody,
+    ) -> JSONResponse:
+        if body.interserver_secret_key != self.interserver_secret_key:
+            self.logger.warning("Не верный межсервисный ключ")
+            return JSONResponse(
+                content={"status": "error", "message": "Wrong secret token !"},
+                status_code=401
+            )
+
+        self._mark_notification_sends()
+
+        states_by_account_id = await self._states_by_account_id([item.account_id for item in body.items])
+        items = [item for item in body.items if item.account_id in states_by_account_id]
+
+        if items:
+            await self.state_service.create_publication_approved_alerts([
+                (states_by_account_id[item.account_id].id, item.publication_id)
+                for item in items
+            ])
+
+        notified = await self._show_alerts(
+            [states_by_account_id[item.account_id] for item in items],
+            model.AlertsStates.publication_approved_alert,
+        )
+
+        return JSONResponse(
+            content={
+                "status": "ok",
+                "notified": notified,
+                "missing_account_ids": self._missing_account_ids(body.items, states_by_account_id),
+            },
+            status_code=200
+        )
+
+    @auto_log()
+    @traced_method()
+    async def notify_publication_rejected_alert_batch(
+            self,
+            body: NotifyPublicationRejectedBatchBody,
+    ) -> JSONResponse:
+        if body.interserver_secret_key != self.interserver_secret_key:
+            self.logger.warning("Не верный межсервисный ключ")
+            return JSONResponse(
+                content={"status": "error", "message": "Wrong secret token !"},
+                status_code=401
+            )
+
+        self._mark_notification_sends()
+
+        states_by_account_id = await self._states_by_account_id([item.account_id for item in body.items])
+        items = [item for item in body.items if item.account_id in states_by_account_id]
+
+        if items:
+            await self.state_service.create_publication_rejected_alerts([
+                (states_by_account_id[item.account_id].id, item.publication_id)
+                for item in items
+            ])
+
+        notified = await self._show_alerts(
+            [states_by_account_id[item.account_id] for item in items],
+            model.AlertsStates.publication_rejected_alert,
+        )
+
+        return JSONResponse(
+            content={
+                "status": "ok",
+                "notified": notified,
+                "missing_account_ids": self._missing_account_ids(body.items, states_by_account_id),
+            },
+            status_code=200
+        )
+
     @auto_log()
     @traced_method()
     async def set_cache_file(
@@ -314,6 +529,61 @@ class TelegramWebhookController(interface.ITelegramWebhookController):
             status_code=200
         )
 
+    async def _states_by_account_id(self, account_ids: list[int]) -> dict[int, model.UserState]:
+        user_states = await self.state_service.states_by_account_ids(list(set(account_ids)))
+
+        states_by_account_id = {}
+        for user_state in user_states:
+            states_by_account_id.setdefault(user_state.account_id, user_state)
+
+        return states_by_account_id
+
+    async def _show_alerts(self, user_states: list[model.UserState], alert_state) -> int:
+        # Один аккаунт может прийти в пакете несколько раз, диалог показываем один раз
+        unique_states = {user_state.id: user_state for user_state in user_states}
+        states_to_show = [user_state for user_state in unique_states.values() if user_state.can_show_alerts]
+        if not states_to_show:
+            return 0
+
+        await self.state_service.disable_alerts_by_state_ids([user_state.id for user_state in states_to_show])
+
+        semaphore = asyncio.Semaphore(self.notify_fanout_concurrency)
+
+        async def _show_alert(user_state: model.UserState) -> bool:
+            async with semaphore:
+                try:
+                    dialog_manager = self.dialog_bg_factory.bg(
+                        bot=self.bot,
+                        user_id=user_state.tg_chat_id,
+                        chat_id=user_state.tg_chat_id,
+                    )
+                    await dialog_manager.start(
+                        alert_state,
+                        mode=StartMode.RESET_STACK,
+                        show_mode=ShowMode.DELETE_AND_SEND
+                    )
+                    return True
+                except Exception as err:
+                    self.logger.warning(
+                        "Не удалось показать алерт пользователю",
+                        {common.TELEGRAM_CHAT_ID_KEY: str(user_state.tg_chat_id), common.ERROR_KEY: str(err)}
+                    )
+                    return False
+
+        results = await asyncio.gather(*[_show_alert(user_state) for user_state in states_to_show])
+        self.logger.info("Пакетный показ алертов завершен", {"notified": sum(results), "total": len(results)})
+
+        return sum(results)
+
+    @staticmethod
+    def _missing_account_ids(items: list, states_by_account_id: dict[int, model.UserState]) -> list[int]:
+        return sorted({item.account_id for item in items if item.account_id not in states_by_account_id})
+
+    def _mark_notification_sends(self) -> None:
+        # Уведомления уступают очередь отправки интерактивным ответам в диалогах
+        if self.send_priority:
+            self.send_priority.set(common.SendPriority.NOTIFICATION)
+
     def _format_notification_message(self, body: EmployeeAddedNotificationBody) -> str:
         role_names = {
             "employee": "Сотрудник",
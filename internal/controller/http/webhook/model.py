@@ -1,4 +1,7 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+
+# Получателей в одном пакетном уведомлении: пакет вставляется одним INSERT (см. VALUES_CHUNK_SIZE в StateRepo)
+MAX_BATCH_ITEMS = 1000
 
 
 class EmployeeAddedNotificationBody(BaseModel):
@@ -33,6 +36,27 @@ class NotifyPublicationRejectedBody(BaseModel):
     publication_id: int
     interserver_secret_key: str
 
+class VizardVideoCutAlertItem(BaseModel):
+    account_id: int
+    youtube_video_reference: str
+    video_count: int
+
+class NotifyVizardVideoCutGeneratedBatch(BaseModel):
+    items: list[VizardVideoCutAlertItem] = Field(max_length=MAX_BATCH_ITEMS)
+    interserver_secret_key: str
+
+class PublicationAlertItem(BaseModel):
+    account_id: int
+    publication_id: int
+
+class NotifyPublicationApprovedBatchBody(BaseModel):
+    items: list[PublicationAlertItem] = Field(max_length=MAX_BATCH_ITEMS)
+    interserver_secret_key: str
+
+class NotifyPublicationRejectedBatchBody(BaseModel):
+    items: list[PublicationAlertItem] = Field(max_length=MAX_BATCH_ITEMS)
+    interserver_secret_key: str
+
 
 class SendMessageWebhookBody(BaseModel):
     tg_chat_id: int
@@ -1,3 +1,4 @@
+import time
 import traceback
 from contextvars import ContextVar
 
@@ -8,7 +9,7 @@ from aiogram_dialog import StartMode
 
 from internal import interface, common, model
 from pkg.log_wrapper import auto_log
-from pkg.trace_wrapper import traced_method
+from pkg.trace_wrapper import traced_method, record_step
 
 
 class TgMiddleware(interface.ITelegramMiddleware):
@@ -18,6 +19,9 @@ class TgMiddleware(interface.ITelegramMiddleware):
             state_service: interface.IStateService,
             bot: Bot,
             log_context: ContextVar[dict],
+            callback_lock: interface.ICallbackLock = None,
+            chat_lock: interface.IChatLock = None,
+            update_profiler: interface.IUpdateProfiler = None,
     ):
         self.tracer = tel.tracer()
         self.meter = tel.meter()
@@ -26,8 +30,39 @@ class TgMiddleware(interface.ITelegramMiddleware):
         self.state_service = state_service
         self.bot = bot
         self.log_context = log_context
+        self.callback_lock = callback_lock
+        self.chat_lock = chat_lock
+        self.update_profiler = update_profiler
         self.dialog_bg_factory = None
 
+    async def update_profiler_middleware(
+            self,
+            handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+            event: Update,
+            data: dict[str, Any]
+    ):
+        chat_id = self.__extract_chat_id(event)
+        if self.update_profiler is None or chat_id is None:
+            return await handler(event, data)
+
+        async with self.update_profiler.profile(chat_id, event.update_id, event.event_type):
+            return await handler(event, data)
+
+    async def chat_lock_middleware00(
+            self,
+            handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+            event: Update,
+            data: dict[str, Any]
+    ):
+        chat_id = self.__extract_chat_id(event)
+        if self.chat_lock is None or chat_id is None:
+            return await handler(event, data)
+
+        started_at = time.perf_counter()
+        async with self.chat_lock.hold(chat_id):
+            record_step("chat_lock.wait", started_at)
+            return await handler(event, data)
+
     @traced_method()
     async def logger_middleware01(
             self,
@@ -67,6 +102,19 @@ class TgMiddleware(interface.ITelegramMiddleware):
         finally:
             self.log_context.reset(context_token)
 
+    async def callback_lock_middleware02(
+            self,
+            handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+            event: Update,
+            data: dict[str, Any]
+    ):
+        # Блокировку кнопки берет вебхук до очереди чата; здесь она снимается после обработки
+        try:
+            return await handler(event, data)
+        finally:
+            if self.callback_lock:
+                await self.callback_lock.release(event.update_id)
+
     @auto_log()
     @traced_method()
     async def _recovery_start_functionality(self, tg_chat_id: int, tg_username: str):
@@ -108,6 +156,18 @@ class TgMiddleware(interface.ITelegramMiddleware):
         )
         return True
 
+    @staticmethod
+    def __extract_chat_id(event: Update) -> int | None:
+        if event.message:
+            return event.message.chat.id
+
+        if event.callback_query:
+            if event.callback_query.message:
+                return event.callback_query.message.chat.id
+            return event.callback_query.from_user.id
+
+        return None
+
     def __extract_metadata(self, event: Update):
         if event is None:
             return "", "", "", "", 0, 0
@@ -23,6 +23,7 @@ class LLMChatManager:
             create_category_prompt_generator: interface.ICreateCategoryPromptGenerator,
             train_category_prompt_generator: interface.ITrainCategoryPromptGenerator,
             llm_chat_repo: interface.ILLMChatRepo,
+            transcript_cache: interface.ITranscriptCache = None,
     ):
         self.logger = logger
         self.bot = bot
@@ -38,7 +39,8 @@ class LLMChatManager:
         self.message_extractor = MessageExtractor(
             logger=self.logger,
             bot=self.bot,
-            loom_content_client=self.loom_content_client
+            loom_content_client=self.loom_content_client,
+            transcript_cache=transcript_cache,
         )
         self.llm_context_manager = LLMContextManager(
             logger=self.logger,
@@ -31,7 +31,8 @@ class CreateCategoryService(interface.ICreateCategoryService):
             llm_chat_repo: interface.ILLMChatRepo,
             state_repo: interface.IStateRepo,
             loom_organization_client: interface.ILoomOrganizationClient,
-            loom_content_client: interface.ILoomContentClient
+            loom_content_client: interface.ILoomContentClient,
+            transcript_cache: interface.ITranscriptCache = None,
     ):
         self.tracer = tel.tracer()
         self.logger = tel.logger()
@@ -68,6 +69,7 @@ class CreateCategoryService(interface.ICreateCategoryService):
             self.create_category_prompt_generator,
             self.train_category_prompt_generator,
             self.llm_chat_repo,
+            transcript_cache,
         )
 
     @auto_log()
@@ -18,6 +18,7 @@ class LLMChatManager:
             loom_content_client: interface.ILoomContentClient,
             create_organization_prompt_generator: interface.ICreateOrganizationPromptGenerator,
             llm_chat_repo: interface.ILLMChatRepo,
+            transcript_cache: interface.ITranscriptCache = None,
     ):
         self.logger = logger
         self.bot = bot
@@ -29,7 +30,8 @@ class LLMChatManager:
         self.message_extractor = MessageExtractor(
             logger=self.logger,
             bot=self.bot,
-            loom_content_client=self.loom_content_client
+            loom_content_client=self.loom_content_client,
+            transcript_cache=transcript_cache,
         )
         self.llm_context_manager = LLMContextManager(
             logger=self.logger,
@@ -29,7 +29,8 @@ class CreateOrganizationService(interface.ICreateOrganizationService):
             loom_employee_client: interface.ILoomEmployeeClient,
             loom_content_client: interface.ILoomContentClient,
             llm_chat_repo: interface.ILLMChatRepo,
-            state_repo: interface.IStateRepo
+            state_repo: interface.IStateRepo,
+            transcript_cache: interface.ITranscriptCache = None,
     ):
         self.tracer = tel.tracer()
         self.logger = tel.logger()
@@ -49,7 +50,8 @@ class CreateOrganizationService(interface.ICreateOrganizationService):
         self.message_extractor = MessageExtractor(
             logger=self.logger,
             bot=self.bot,
-            loom_content_client=self.loom_content_client
+            loom_content_client=self.loom_content_client,
+            transcript_cache=transcript_cache,
         )
         self._organization_manager = OrganizationManager(
             loom_organization_client=self.loom_organization_client,
@@ -64,6 +66,7 @@ class CreateOrganizationService(interface.ICreateOrganizationService):
             loom_content_client=self.loom_content_client,
             create_organization_prompt_generator=self.create_organization_prompt_generator,
             llm_chat_repo=self.llm_chat_repo,
+            transcript_cache=transcript_cache,
         )
 
     @auto_log()
@@ -30,7 +30,8 @@ class UpdateCategoryService(interface.IUpdateCategoryService):
             loom_content_client: interface.ILoomContentClient,
             telegram_client: interface.ITelegramClient,
             llm_chat_repo: interface.ILLMChatRepo,
-            state_repo: interface.IStateRepo
+            state_repo: interface.IStateRepo,
+            transcript_cache: interface.ITranscriptCache = None,
     ):
         self.tracer = tel.tracer()
         self.logger = tel.logger()
@@ -65,6 +66,7 @@ class UpdateCategoryService(interface.IUpdateCategoryService):
             self.loom_content_client,
             self.update_category_prompt_generator,
             self.llm_chat_repo,
+            transcript_cache,
         )
 
     @auto_log()
@@ -18,6 +18,7 @@ class LLMChatManager:
             update_organization_prompt_generator: interface.IUpdateOrganizationPromptGenerator,
             loom_organization_client: interface.ILoomOrganizationClient,
             llm_chat_repo: interface.ILLMChatRepo,
+            transcript_cache: interface.ITranscriptCache = None,
     ):
         self.logger = logger
         self.bot = bot
@@ -30,7 +31,8 @@ class LLMChatManager:
         self.message_extractor = MessageExtractor(
             logger=self.logger,
             bot=self.bot,
-            loom_content_client=self.loom_content_client
+            loom_content_client=self.loom_content_client,
+            transcript_cache=transcript_cache,
         )
         self.llm_context_manager = LLMContextManager(
             logger=self.logger,
@@ -28,7 +28,8 @@ class UpdateOrganizationService(interface.IUpdateOrganizationService):
             loom_organization_client: interface.ILoomOrganizationClient,
             loom_content_client: interface.ILoomContentClient,
             llm_chat_repo: interface.ILLMChatRepo,
-            state_repo: interface.IStateRepo
+            state_repo: interface.IStateRepo,
+            transcript_cache: interface.ITranscriptCache = None,
     ):
         self.tracer = tel.tracer()
         self.logger = tel.logger()
@@ -47,7 +48,8 @@ class UpdateOrganizationService(interface.IUpdateOrganizationService):
         self.message_extractor = MessageExtractor(
             logger=self.logger,
             bot=self.bot,
-            loom_content_client=self.loom_content_client
+            loom_content_client=self.loom_content_client,
+            transcript_cache=transcript_cache,
         )
         self._organization_manager = OrganizationManager(
             loom_organization_client=self.loom_organization_client,
@@ -60,6 +62,7 @@ class UpdateOrganizationService(interface.IUpdateOrganizationService):
             update_organization_prompt_generator=self.update_organization_prompt_generator,
             loom_organization_client=self.loom_organization_client,
             llm_chat_repo=self.llm_chat_repo,
+            transcript_cache=transcript_cache,
         )
 
     @auto_log()
@@ -1,7 +1,7 @@
 from aiogram import Bot
 from aiogram_dialog import DialogManager
 
-from internal import interface, model
+from internal import interface
 from pkg.log_wrapper import auto_log
 from pkg.trace_wrapper import traced_method
 
@@ -20,7 +20,8 @@ class DraftPublicationGetter(interface.IDraftPublicationGetter):
             state_repo: interface.IStateRepo,
             loom_employee_client: interface.ILoomEmployeeClient,
             loom_content_client: interface.ILoomContentClient,
-            loom_domain: str
+            loom_domain: str,
+            text_variant_pool: interface.ITextVariantPool = None,
     ):
         self.tracer = tel.tracer()
         self.logger = tel.logger()
@@ -29,6 +30,7 @@ class DraftPublicationGetter(interface.IDraftPublicationGetter):
         self.loom_employee_client = loom_employee_client
         self.state_repo = state_repo
         self.loom_domain = loom_domain
+        self.text_variant_pool = text_variant_pool
 
         # Инициализация вспомогательных классов
         self.state_manager = StateManager(
@@ -50,7 +52,8 @@ class DraftPublicationGetter(interface.IDraftPublicationGetter):
             self.bot,
             self.loom_content_client,
             self.state_restorer,
-            self.image_manager
+            self.image_manager,
+            self.text_variant_pool,
         )
         self.social_network_manger = SocialNetworkManager(
             logger=self.logger
@@ -75,7 +78,7 @@ class DraftPublicationGetter(interface.IDraftPublicationGetter):
         )
 
         draft_publications = [
-            pub.to_dict() for pub in publications
+            pub for pub in publications
             if pub.moderation_status == "draft" and pub.creator_id == state.account_id
         ]
 
@@ -87,11 +90,12 @@ class DraftPublicationGetter(interface.IDraftPublicationGetter):
                 "period_text": "",
             }
 
-        self.dialog_data_helper.set_draft_list(dialog_manager, draft_publications)
+        # В dialog_data только id: он сериализуется в Redis на каждом обновлении, тексты берем из свежего списка
+        self.dialog_data_helper.set_draft_list(dialog_manager, [pub.id for pub in draft_publications])
         self.dialog_data_helper.initialize_current_index_if_needed(dialog_manager)
 
         current_index = self.dialog_data_helper.get_current_index(dialog_manager)
-        current_pub = model.Publication(**draft_publications[current_index])
+        current_pub = draft_publications[current_index]
 
         creator = await self.loom_employee_client.get_employee_by_account_id(current_pub.creator_id)
         category = await self.loom_content_client.get_category_by_id(current_pub.category_id)
@@ -160,6 +164,11 @@ class DraftPublicationGetter(interface.IDraftPublicationGetter):
     ) -> dict:
         self.dialog_data_helper.initialize_working_from_original(dialog_manager)
 
+        # Варианты для "перегенерации" готовятся, пока пользователь читает публикацию
+        if self.text_variant_pool and self.text_variant_pool.enabled:
+            state = await self.state_manager.get_state(dialog_manager)
+            self.publication_manager.prefill_text_variants(dialog_manager, state.organization_id)
+
         working_pub = self.dialog_data_helper.get_working_publication(dialog_manager)
         original_pub = self.dialog_data_helper.get_original_publication(dialog_manager)
 
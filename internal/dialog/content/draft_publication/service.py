@@ -28,7 +28,9 @@ class DraftPublicationService(interface.IDraftPublicationService):
             state_repo: interface.IStateRepo,
             loom_content_client: interface.ILoomContentClient,
             loom_organization_client: interface.ILoomOrganizationClient,
-            loom_domain: str
+            loom_domain: str,
+            text_variant_pool: interface.ITextVariantPool = None,
+            transcript_cache: interface.ITranscriptCache = None,
     ):
         self.tracer = tel.tracer()
         self.logger = tel.logger()
@@ -51,7 +53,8 @@ class DraftPublicationService(interface.IDraftPublicationService):
         self.message_extractor = MessageExtractor(
             logger=self.logger,
             bot=self.bot,
-            loom_content_client=self.loom_content_client
+            loom_content_client=self.loom_content_client,
+            transcript_cache=transcript_cache,
         )
         self.alerts_manager = AlertsManager(
             self.state_repo
@@ -75,7 +78,7 @@ class DraftPublicationService(interface.IDraftPublicationService):
             loom_content_client=self.loom_content_client,
             state_restorer=self.state_restorer,
             image_manager=self.image_manager,
-
+            text_variant_pool=text_variant_pool,
         )
         self.navigation_manager = NavigationManager(
             logger=self.logger
@@ -128,6 +131,8 @@ class DraftPublicationService(interface.IDraftPublicationService):
             )
             self.dialog_data_helper.update_working_text(dialog_manager, regenerated_data["text"])
 
+        self.publication_manager.prefill_text_variants(dialog_manager, state.organization_id)
+
         if await self.text_processor.check_text_length_with_image(dialog_manager):
             return
 
@@ -180,6 +185,8 @@ class DraftPublicationService(interface.IDraftPublicationService):
             )
             self.dialog_data_helper.update_working_text(dialog_manager, regenerated_data["text"])
 
+        self.publication_manager.prefill_text_variants(dialog_manager, state.organization_id)
+
         self.dialog_data_helper.set_regenerating_text_flag(dialog_manager, False)
         self.dialog_data_helper.clear_regenerate_text_prompt(dialog_manager)
 
@@ -1,3 +1,5 @@
+from typing import AsyncIterator
+
 import aiohttp
 from aiogram import Bot
 from aiogram.types import BufferedInputFile, ContentType
@@ -6,6 +8,7 @@ from aiogram_dialog.api.entities import MediaAttachment, MediaId
 
 from internal import interface, model, common
 from pkg.tg_action_wrapper import tg_action
+from pkg.tg_file_stream import tg_file_stream
 from internal.dialog.content.generate_publication.helpers.dialog_data_helper import DialogDataHelper
 
 
@@ -162,13 +165,35 @@ class ImageManager:
             self.logger.error(f"Ошибка при получении данных изображения: {err}")
             return None
 
+    async def stream_image(self, image_url: str, chunk_size: int = 65536) -> AsyncIterator[bytes]:
+        async with aiohttp.ClientSession() as session:
+            async with session.get(image_url) as response:
+                response.raise_for_status()
+                async for chunk in response.content.iter_chunked(chunk_size):
+                    yield chunk
+
+    def get_current_image_stream(self, dialog_manager: DialogManager) -> tuple[AsyncIterator[bytes], str] | None:
+        # Изображение не скачивается целиком, а передается в loom-content по мере чтения
+        custom_image_file_id = self.dialog_data_helper.get_custom_image_file_id(dialog_manager)
+        if custom_image_file_id:
+            return tg_file_stream(self.bot, custom_image_file_id), f"{custom_image_file_id}.jpg"
+
+        publication_images_url = self.dialog_data_helper.get_publication_images_url(dialog_manager)
+        if publication_images_url:
+            current_index = self.dialog_data_helper.get_current_image_index(dialog_manager)
+
+            if current_index < len(publication_images_url):
+                current_url = publication_images_url[current_index]
+                return self.stream_image(current_url), f"generated_image_{current_index}.jpg"
+
+        return None
+
     async def get_selected_image_data(self, dialog_manager: DialogManager) -> tuple[
-        str | None, bytes | None, str | None
+        str | None, AsyncIterator[bytes] | None, str | None
     ]:
         custom_image_file_id = self.dialog_data_helper.get_custom_image_file_id(dialog_manager)
         if custom_image_file_id:
-            image_content = await self.bot.download(custom_image_file_id)
-            return None, image_content.read(), f"{custom_image_file_id}.jpg"
+            return None, tg_file_stream(self.bot, custom_image_file_id), f"{custom_image_file_id}.jpg"
 
         publication_images_url = self.dialog_data_helper.get_publication_images_url(dialog_manager)
         if publication_images_url:
@@ -380,6 +405,37 @@ class ImageManager:
 
         return images_url
 
+    async def generate_speculative_image(
+            self,
+            dialog_manager: DialogManager,
+    ) -> list[str]:
+        """
+        Генерирует изображение до готовности текста публикации.
+        Запрос тот же, что в generate_new_image, только вместо текста публикации - референс пользователя;
+        стиль рубрики сервис контента берет по category_id сам.
+        """
+        self.backup_current_image(dialog_manager)
+
+        category_id = self.dialog_data_helper.get_category_id(dialog_manager)
+        generate_text_prompt = self.dialog_data_helper.get_generate_text_prompt(dialog_manager)
+
+        try:
+            images_url, has_no_data = await self.loom_content_client.generate_publication_image(
+                category_id=category_id,
+                publication_text=generate_text_prompt,
+                text_reference=generate_text_prompt,
+            )
+        except common.ErrExternalAIImageService:
+            self.dialog_data_helper.set_has_external_error_generate_image_result(dialog_manager, True)
+            return []
+
+        # Если нейросеть не стала генерировать изображение
+        if has_no_data:
+            self.dialog_data_helper.set_has_no_generate_image_result(dialog_manager, True)
+            return []
+
+        return images_url
+
     async def edit_image_with_prompt(
             self,
             dialog_manager: DialogManager,
@@ -391,10 +447,9 @@ class ImageManager:
         current_image_content = None
         current_image_filename = None
 
-        if await self.get_current_image_data(dialog_manager=dialog_manager):
-            current_image_content, current_image_filename = await self.get_current_image_data(
-                dialog_manager=dialog_manager
-            )
+        current_image = self.get_current_image_stream(dialog_manager=dialog_manager)
+        if current_image:
+            current_image_content, current_image_filename = current_image
 
         try:
             images_url, has_no_data = await self.loom_content_client.edit_image(
@@ -497,9 +552,7 @@ class ImageManager:
         images_filenames = []
 
         for i, file_id in enumerate(combine_images_list):
-            image_io = await self.bot.download(file_id)
-            content = image_io.read()
-            images_content.append(content)
+            images_content.append(tg_file_stream(self.bot, file_id))
             images_filenames.append(f"image_{i}.jpg")
 
         category_id = self.dialog_data_helper.get_category_id(dialog_manager)
@@ -1,3 +1,5 @@
+import hashlib
+
 from aiogram_dialog import DialogManager
 
 from internal import interface, model
@@ -11,10 +13,12 @@ class PublicationManager:
             logger,
             loom_content_client: interface.ILoomContentClient,
             image_manager: ImageManager,
+            text_variant_pool: interface.ITextVariantPool = None,
     ):
         self.logger = logger
         self.loom_content_client = loom_content_client
         self.image_manager = image_manager
+        self.text_variant_pool = text_variant_pool
         self.dialog_data_helper = DialogDataHelper(self.logger)
 
     async def generate_publication_text(self, dialog_manager: DialogManager) -> str:
@@ -28,6 +32,46 @@ class PublicationManager:
 
         return publication_data["text"]
 
+    async def generate_next_publication_text(self, dialog_manager: DialogManager, tg_chat_id: int) -> str:
+        if self.text_variant_pool:
+            pooled_text = self.text_variant_pool.take(
+                pool_key=self._text_variant_pool_key(dialog_manager, tg_chat_id),
+                base_text=self.dialog_data_helper.get_publication_text(dialog_manager),
+            )
+            if pooled_text is not None:
+                self.logger.info("Текст публикации взят из пула вариантов")
+                return pooled_text
+
+        return await self.generate_publication_text(dialog_manager)
+
+    def prefill_text_variants(self, dialog_manager: DialogManager, state: model.UserState) -> None:
+        if not self.text_variant_pool:
+            return
+
+        category_id = self.dialog_data_helper.get_category_id(dialog_manager)
+        generate_text_prompt = self.dialog_data_helper.get_generate_text_prompt(dialog_manager)
+
+        async def _generate() -> str:
+            publication_data = await self.loom_content_client.generate_publication_text(
+                category_id=category_id,
+                text_reference=generate_text_prompt,
+            )
+            return publication_data["text"]
+
+        self.text_variant_pool.prefill(
+            pool_key=self._text_variant_pool_key(dialog_manager, state.tg_chat_id),
+            base_text=self.dialog_data_helper.get_publication_text(dialog_manager),
+            organization_id=state.organization_id,
+            scope="generate",
+            generate=_generate,
+        )
+
+    def _text_variant_pool_key(self, dialog_manager: DialogManager, tg_chat_id: int) -> str:
+        category_id = self.dialog_data_helper.get_category_id(dialog_manager)
+        generate_text_prompt = self.dialog_data_helper.get_generate_text_prompt(dialog_manager)
+        prompt_hash = hashlib.sha1(generate_text_prompt.encode()).hexdigest()
+        return f"generate:{tg_chat_id}:{category_id}:{prompt_hash}"
+
     async def regenerate_publication_text(self, dialog_manager: DialogManager, regenerate_text_prompt: str) -> str:
         category_id = self.dialog_data_helper.get_category_id(dialog_manager)
         publication_text = self.dialog_data_helper.get_publication_text(dialog_manager)
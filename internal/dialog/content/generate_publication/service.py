@@ -1,3 +1,5 @@
+import asyncio
+import time
 from typing import Any
 
 from aiogram_dialog.widgets.input import MessageInput
@@ -8,7 +10,7 @@ from aiogram_dialog import DialogManager, StartMode
 from aiogram_dialog.widgets.kbd import ManagedCheckbox, Button
 from sulguk import SULGUK_PARSE_MODE
 
-from internal import interface, model
+from internal import interface, model, common
 from pkg.log_wrapper import auto_log
 from pkg.tg_action_wrapper import tg_action
 from pkg.trace_wrapper import traced_method
@@ -33,8 +35,12 @@ class GeneratePublicationService(interface.IGeneratePublicationService):
             loom_content_client: interface.ILoomContentClient,
             loom_employee_client: interface.ILoomEmployeeClient,
             loom_organization_client: interface.ILoomOrganizationClient,
+            publication_pipeline_mode: str = "sequential",
+            text_variant_pool: interface.ITextVariantPool = None,
+            transcript_cache: interface.ITranscriptCache = None,
     ):
         self.tracer = tel.tracer()
+        self.meter = tel.meter()
         self.logger = tel.logger()
         self.bot = bot
         self.state_repo = state_repo
@@ -42,6 +48,13 @@ class GeneratePublicationService(interface.IGeneratePublicationService):
         self.loom_content_client = loom_content_client
         self.loom_employee_client = loom_employee_client
         self.loom_organization_client = loom_organization_client
+        self.publication_pipeline_mode = publication_pipeline_mode
+
+        self.text_with_image_duration = self.meter.create_histogram(
+            name=common.PUBLICATION_TEXT_WITH_IMAGE_DURATION_KEY,
+            unit="s",
+            description="Время генерации текста и изображения публикации",
+        )
 
         # Инициализация приватных сервисов
         self.state_manager = StateManager(
@@ -56,7 +69,8 @@ class GeneratePublicationService(interface.IGeneratePublicationService):
         self.message_extractor = MessageExtractor(
             logger=self.logger,
             bot=self.bot,
-            loom_content_client=self.loom_content_client
+            loom_content_client=self.loom_content_client,
+            transcript_cache=transcript_cache,
         )
         self.alerts_manager = AlertsManager(
             self.state_repo
@@ -76,6 +90,7 @@ class GeneratePublicationService(interface.IGeneratePublicationService):
             logger=self.logger,
             loom_content_client=self.loom_content_client,
             image_manager=self.image_manager,
+            text_variant_pool=text_variant_pool,
         )
         self.social_network_manager = SocialNetworkManager(
             logger=self.logger,
@@ -201,6 +216,7 @@ class GeneratePublicationService(interface.IGeneratePublicationService):
             )
 
         self.dialog_data_helper.set_publication_text(dialog_manager, publication_text)
+        self.publication_manager.prefill_text_variants(dialog_manager, state)
 
         await dialog_manager.switch_to(state=model.GeneratePublicationStates.preview)
 
@@ -234,12 +250,17 @@ class GeneratePublicationService(interface.IGeneratePublicationService):
             parse_mode=SULGUK_PARSE_MODE
         )
 
-        async with tg_action(self.bot, callback.message.chat.id):
-            publication_text = await self.publication_manager.generate_publication_text(dialog_manager)
-            self.dialog_data_helper.set_publication_text(dialog_manager, publication_text)
+        started_at = time.perf_counter()
+        if self.publication_pipeline_mode == "pipelined":
+            images_url = await self._generate_text_and_image_pipelined(dialog_manager, callback.message.chat.id)
+        else:
+            images_url = await self._generate_text_and_image_sequential(dialog_manager, callback.message.chat.id)
 
-        async with tg_action(self.bot, callback.message.chat.id, "upload_photo"):
-            images_url = await self.image_manager.generate_new_image(dialog_manager)
+        self.text_with_image_duration.record(
+            time.perf_counter() - started_at,
+            {common.PUBLICATION_GENERATION_MODE_KEY: self.publication_pipeline_mode}
+        )
+        self.publication_manager.prefill_text_variants(dialog_manager, state)
 
         # Проверка ошибки генерации изображения
         if self.dialog_data_helper.get_has_external_error_generate_image_result(dialog_manager):
@@ -257,6 +278,35 @@ class GeneratePublicationService(interface.IGeneratePublicationService):
 
         await dialog_manager.switch_to(state=model.GeneratePublicationStates.preview)
 
+    async def _generate_text_and_image_sequential(
+            self,
+            dialog_manager: DialogManager,
+            chat_id: int
+    ) -> list[str]:
+        async with tg_action(self.bot, chat_id):
+            publication_text = await self.publication_manager.generate_publication_text(dialog_manager)
+            self.dialog_data_helper.set_publication_text(dialog_manager, publication_text)
+
+        async with tg_action(self.bot, chat_id, "upload_photo"):
+            return await self.image_manager.generate_new_image(dialog_manager)
+
+    async def _generate_text_and_image_pipelined(
+            self,
+            dialog_manager: DialogManager,
+            chat_id: int
+    ) -> list[str]:
+        # Изображение генерируется по референсу и стилю рубрики, не дожидаясь текста
+        async with tg_action(self.bot, chat_id, "upload_photo"):
+            image_task = asyncio.create_task(self.image_manager.generate_speculative_image(dialog_manager))
+            try:
+                publication_text = await self.publication_manager.generate_publication_text(dialog_manager)
+            except Exception:
+                image_task.cancel()
+                raise
+            self.dialog_data_helper.set_publication_text(dialog_manager, publication_text)
+
+            return await image_task
+
     @auto_log()
     @traced_method()
     async def handle_next_image(
@@ -312,10 +362,15 @@ class GeneratePublicationService(interface.IGeneratePublicationService):
         self.dialog_data_helper.set_is_regenerating_text(dialog_manager, True)
         await dialog_manager.show()
 
+        # Вариант из пула, если показанный текст не менялся мимо него
         async with tg_action(self.bot, callback.message.chat.id):
-            publication_text = await self.publication_manager.generate_publication_text(dialog_manager)
+            publication_text = await self.publication_manager.generate_next_publication_text(
+                dialog_manager,
+                state.tg_chat_id,
+            )
             self.dialog_data_helper.set_publication_text(dialog_manager, publication_text)
 
+        self.publication_manager.prefill_text_variants(dialog_manager, state)
         self.dialog_data_helper.set_is_regenerating_text(dialog_manager, False)
 
         if await self.text_processor.check_text_length_with_image(dialog_manager=dialog_manager):
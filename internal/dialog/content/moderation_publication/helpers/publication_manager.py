@@ -5,9 +5,12 @@ from internal import interface, model
 from internal.dialog.content.moderation_publication.helpers.dialog_data_helper import DialogDataHelper
 from internal.dialog.content.moderation_publication.helpers.state_restorer import StateRestorer
 from internal.dialog.content.moderation_publication.helpers.image_manager import ImageManager
+from pkg.tg_file_stream import tg_file_stream
 
 
 class PublicationManager:
+    REGENERATE_TEXT_PROMPT = "Используй тему поста, но сгенерируй пост по-другому как-нибудь не меняя смысл"
+
     def __init__(
             self,
             logger,
@@ -15,12 +18,14 @@ class PublicationManager:
             loom_content_client: interface.ILoomContentClient,
             state_restorer: StateRestorer,
             image_manager: ImageManager,
+            text_variant_pool: interface.ITextVariantPool = None,
     ):
         self.logger = logger
         self.bot = bot
         self.loom_content_client = loom_content_client
         self.state_restorer = state_restorer
         self.image_manager = image_manager
+        self.text_variant_pool = text_variant_pool
         self.dialog_data_helper = DialogDataHelper()
 
     def has_changes(self, dialog_manager: DialogManager) -> bool:
@@ -78,7 +83,7 @@ class PublicationManager:
             # Проверяем тип изображения и получаем выбранное
             if working_pub.get("custom_image_file_id"):
                 # Пользовательское изображение
-                image_content = await self.bot.download(working_pub["custom_image_file_id"])
+                image_content = tg_file_stream(self.bot, working_pub["custom_image_file_id"])
                 image_filename = working_pub["custom_image_file_id"] + ".jpg"
 
             elif working_pub.get("generated_images_url"):
@@ -194,10 +199,44 @@ class PublicationManager:
         self.state_restorer.save_state_before_modification(dialog_manager, include_image=False)
 
         working_pub = self.dialog_data_helper.get_working_publication(dialog_manager)
+
+        if self.text_variant_pool:
+            pooled_text = self.text_variant_pool.take(
+                pool_key=f"moderation:{working_pub['id']}",
+                base_text=working_pub["text"],
+            )
+            if pooled_text is not None:
+                self.logger.info("Текст публикации взят из пула вариантов")
+                return {"text": pooled_text}
+
         return await self.loom_content_client.regenerate_publication_text(
             category_id=working_pub["category_id"],
             publication_text=working_pub["text"],
-            prompt="Используй тему поста, но сгенерируй пост по-другому как-нибудь не меняя смысл"
+            prompt=self.REGENERATE_TEXT_PROMPT
+        )
+
+    def prefill_text_variants(self, dialog_manager: DialogManager, organization_id: int) -> None:
+        if not self.text_variant_pool:
+            return
+
+        working_pub = self.dialog_data_helper.get_working_publication(dialog_manager)
+        category_id = working_pub["category_id"]
+        publication_text = working_pub["text"]
+
+        async def _generate() -> str:
+            regenerated_data = await self.loom_content_client.regenerate_publication_text(
+                category_id=category_id,
+                publication_text=publication_text,
+                prompt=self.REGENERATE_TEXT_PROMPT
+            )
+            return regenerated_data["text"]
+
+        self.text_variant_pool.prefill(
+            pool_key=f"moderation:{working_pub['id']}",
+            base_text=publication_text,
+            organization_id=organization_id,
+            scope="moderation",
+            generate=_generate,
         )
 
     async def regenerate_text(
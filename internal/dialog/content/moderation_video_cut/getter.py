@@ -38,7 +38,7 @@ class VideoCutModerationGetter(interface.IVideoCutModerationGetter):
         )
 
         moderation_video_cuts = [
-            video_cut.to_dict() for video_cut in video_cuts
+            video_cut for video_cut in video_cuts
             if video_cut.moderation_status == "moderation"
         ]
 
@@ -50,14 +50,15 @@ class VideoCutModerationGetter(interface.IVideoCutModerationGetter):
                 "period_text": "",
             }
 
-        dialog_manager.dialog_data["moderation_list"] = moderation_video_cuts
+        # В dialog_data только id: он сериализуется в Redis на каждом обновлении
+        dialog_manager.dialog_data["moderation_list"] = [video_cut.id for video_cut in moderation_video_cuts]
 
         # Устанавливаем текущий индекс (0 если не был установлен)
         if "current_index" not in dialog_manager.dialog_data:
             dialog_manager.dialog_data["current_index"] = 0
 
         current_index = dialog_manager.dialog_data["current_index"]
-        current_video_cut = model.VideoCut(**moderation_video_cuts[current_index])
+        current_video_cut = moderation_video_cuts[current_index]
 
         creator = await self.loom_employee_client.get_employee_by_account_id(
             current_video_cut.creator_id
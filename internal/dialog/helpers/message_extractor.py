@@ -1,9 +1,12 @@
+import asyncio
+
 from aiogram import Bot
 from aiogram.enums import ContentType
 from aiogram.types import Message
 from aiogram_dialog import DialogManager
 
 from internal import interface, common
+from pkg.tg_file_stream import tg_file_stream
 
 
 class MessageExtractor:
@@ -11,11 +14,13 @@ class MessageExtractor:
             self,
             logger,
             bot: Bot,
-            loom_content_client: interface.ILoomContentClient
+            loom_content_client: interface.ILoomContentClient,
+            transcript_cache: interface.ITranscriptCache = None,
     ):
         self.logger = logger
         self.bot = bot
         self.loom_content_client = loom_content_client
+        self.transcript_cache = transcript_cache
 
     async def process_voice_or_text_input(
             self,
@@ -40,16 +45,83 @@ class MessageExtractor:
             organization_id: int,
             show_is_transcribe: bool = True,
     ) -> str:
+        # Аудио всего дерева (сообщение, пересланное, ответ) расшифровываются параллельно, одинаковое - один раз
+        audios: dict[str, tuple[Message, bool]] = {}
+        self._collect_audios(message, show_is_transcribe, audios)
+
+        transcripts = await self._transcribe_all(dialog_manager, organization_id, audios)
+
+        return self._compose_text(message, transcripts)
+
+    def _collect_audios(
+            self,
+            message: Message,
+            show_is_transcribe: bool,
+            audios: dict[str, tuple[Message, bool]],
+    ) -> None:
+        if message.content_type in [ContentType.AUDIO, ContentType.VOICE]:
+            file_unique_id = (message.voice or message.audio).file_unique_id
+            _, show = audios.get(file_unique_id, (message, False))
+            audios[file_unique_id] = (message, show or show_is_transcribe)
+
+        forward_from_message = self._forward_from_message(message)
+        if forward_from_message:
+            self._collect_audios(forward_from_message, show_is_transcribe, audios)
+
+        # Ответ, как и раньше, показывает индикатор расшифровки всегда
+        if message.reply_to_message:
+            self._collect_audios(message.reply_to_message, True, audios)
+
+    async def _transcribe_all(
+            self,
+            dialog_manager: DialogManager,
+            organization_id: int,
+            audios: dict[str, tuple[Message, bool]],
+    ) -> dict[str, str]:
+        transcripts = {}
+        pending = {}
+        for file_unique_id, (message, show) in audios.items():
+            audio = message.voice or message.audio
+            cached_text = await self.transcript_cache.get(
+                file_unique_id, audio.duration
+            ) if self.transcript_cache else None
+
+            if cached_text is not None:
+                transcripts[file_unique_id] = cached_text
+            else:
+                pending[file_unique_id] = (message, show)
+
+        if not pending:
+            return transcripts
+
+        # Состояние диалога меняется один раз до и один раз после всех расшифровок, а не в каждой задаче
+        dialog_manager.dialog_data["voice_transcribe"] = True
+        if any(show for _, show in pending.values()):
+            await dialog_manager.show()
+
+        tasks = {
+            file_unique_id: asyncio.create_task(self._transcribe(message, organization_id))
+            for file_unique_id, (message, _) in pending.items()
+        }
+        try:
+            texts = await asyncio.gather(*tasks.values())
+        except common.ErrInsufficientBalance:
+            self.logger.warning(f"Insufficient balance for transcription, organization_id={organization_id}")
+            dialog_manager.dialog_data["has_insufficient_balance"] = True
+            texts = [""] * len(tasks)
+        finally:
+            # Ошибка одной расшифровки отменяет остальные: их результат уже не нужен
+            for task in tasks.values():
+                task.cancel()
+            dialog_manager.dialog_data["voice_transcribe"] = False
+
+        return {**transcripts, **dict(zip(tasks, texts))}
+
+    def _compose_text(self, message: Message, transcripts: dict[str, str]) -> str:
         text_parts = []
 
         if message.content_type in [ContentType.AUDIO, ContentType.VOICE]:
-            audio_text = await self.speech_to_text(
-                message=message,
-                dialog_manager=dialog_manager,
-                organization_id=organization_id,
-                show_is_transcribe=show_is_transcribe,
-            )
-            text_parts.append(audio_text)
+            text_parts.append(transcripts[(message.voice or message.audio).file_unique_id])
 
         if message.html_text:
             text_parts.append(message.html_text)
@@ -60,23 +132,14 @@ class MessageExtractor:
         elif message.caption:
             text_parts.append(message.caption)
 
-        if message.forward_origin:
-            if hasattr(message, 'forward_from_message') and message.forward_from_message:
-                forwarded_text = await self.extract_text_from_message(
-                    dialog_manager=dialog_manager,
-                    message=message.forward_from_message,
-                    organization_id=organization_id,
-                    show_is_transcribe=show_is_transcribe
-                )
-                if forwarded_text:
-                    text_parts.append(f"[Пересланное сообщение]: {forwarded_text}")
+        forward_from_message = self._forward_from_message(message)
+        if forward_from_message:
+            forwarded_text = self._compose_text(forward_from_message, transcripts)
+            if forwarded_text:
+                text_parts.append(f"[Пересланное сообщение]: {forwarded_text}")
 
         if message.reply_to_message:
-            reply_text = await self.extract_text_from_message(
-                dialog_manager=dialog_manager,
-                message=message.reply_to_message,
-                organization_id=organization_id
-            )
+            reply_text = self._compose_text(message.reply_to_message, transcripts)
             if reply_text:
                 text_parts.append(f"[Ответ на]: {reply_text}")
 
@@ -87,6 +150,26 @@ class MessageExtractor:
 
         return result
 
+    @staticmethod
+    def _forward_from_message(message: Message) -> Message | None:
+        if not message.forward_origin:
+            return None
+        return getattr(message, 'forward_from_message', None)
+
+    async def _transcribe(self, message: Message, organization_id: int) -> str:
+        audio = message.voice or message.audio
+
+        text = await self.loom_content_client.transcribe_audio(
+            organization_id=organization_id,
+            audio_content=tg_file_stream(self.bot, audio.file_id),
+            audio_filename="audio.mp3",
+        )
+
+        if self.transcript_cache:
+            await self.transcript_cache.set(audio.file_unique_id, text)
+
+        return text
+
     async def speech_to_text(
             self,
             message: Message,
@@ -94,24 +177,19 @@ class MessageExtractor:
             organization_id: int,
             show_is_transcribe: bool = True,
     ) -> str:
-        if message.voice:
-            file_id = message.voice.file_id
-        else:
-            file_id = message.audio.file_id
+        audio = message.voice or message.audio
+
+        if self.transcript_cache:
+            cached_text = await self.transcript_cache.get(audio.file_unique_id, audio.duration)
+            if cached_text is not None:
+                return cached_text
 
         dialog_manager.dialog_data["voice_transcribe"] = True
         if show_is_transcribe:
             await dialog_manager.show()
 
-        file = await self.bot.get_file(file_id)
-        file_data = await self.bot.download_file(file.file_path)
-
         try:
-            text = await self.loom_content_client.transcribe_audio(
-                organization_id=organization_id,
-                audio_content=file_data.read(),
-                audio_filename="audio.mp3",
-            )
+            text = await self._transcribe(message, organization_id)
         except common.ErrInsufficientBalance:
             self.logger.warning(f"Insufficient balance for transcription, organization_id={organization_id}")
             dialog_manager.dialog_data["voice_transcribe"] = False
@@ -22,7 +22,8 @@ class MainMenuService(interface.IMainMenuService):
             tel: interface.ITelemetry,
             bot: Bot,
             state_repo: interface.IStateRepo,
-            loom_content_client: interface.ILoomContentClient
+            loom_content_client: interface.ILoomContentClient,
+            transcript_cache: interface.ITranscriptCache = None,
     ):
         self.tracer = tel.tracer()
         self.logger = tel.logger()
@@ -40,7 +41,8 @@ class MainMenuService(interface.IMainMenuService):
         self.message_extractor = MessageExtractor(
             self.logger,
             self.bot,
-            self.loom_content_client
+            self.loom_content_client,
+            transcript_cache,
         )
         self.navigation = NavigationManager(
             state_repo
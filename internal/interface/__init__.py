@@ -1,6 +1,19 @@
 from internal.interface.user_state import *
 from internal.interface.general import *
 from internal.interface.llm_chat import *
+from internal.interface.text_variant_pool import *
+from internal.interface.transcript_cache import *
+from internal.interface.update_queue import *
+from internal.interface.update_deduplicator import *
+from internal.interface.callback_lock import *
+from internal.interface.chat_lock import *
+from internal.interface.telethon_gateway import *
+from internal.interface.chat_router import *
+from internal.interface.loop_monitor import *
+from internal.interface.update_profiler import *
+from internal.interface.sampling_profiler import *
+from internal.interface.dialog_registry import *
+from internal.interface.warmup import *
 
 from internal.interface.dialog.intro.intro import *
 from internal.interface.dialog.brief.create_organization import *
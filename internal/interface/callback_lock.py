@@ -0,0 +1,15 @@
+from typing import Protocol
+from abc import abstractmethod
+
+from aiogram.types import Update
+
+
+class ICallbackLock(Protocol):
+    @abstractmethod
+    def scope_for(self, action: str) -> str | None: pass
+
+    @abstractmethod
+    async def acquire(self, update: Update) -> bool: pass
+
+    @abstractmethod
+    async def release(self, update_id: int) -> None: pass
@@ -0,0 +1,7 @@
+from typing import Protocol, AsyncContextManager
+from abc import abstractmethod
+
+
+class IChatLock(Protocol):
+    @abstractmethod
+    def hold(self, chat_id: int) -> AsyncContextManager[bool]: pass
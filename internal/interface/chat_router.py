@@ -0,0 +1,15 @@
+from typing import Protocol
+from abc import abstractmethod
+
+from aiogram.types import Update
+
+
+class IChatRouter(Protocol):
+    @abstractmethod
+    async def forward(self, update: Update, raw_update: dict, secret_token: str) -> bool: pass
+
+    @abstractmethod
+    async def start(self) -> None: pass
+
+    @abstractmethod
+    async def stop(self) -> None: pass
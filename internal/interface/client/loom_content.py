@@ -1,5 +1,5 @@
 import io
-from typing import Protocol
+from typing import Protocol, AsyncIterable
 from abc import abstractmethod
 from datetime import datetime
 
@@ -50,7 +50,7 @@ class ILoomContentClient(Protocol):
             publication_text: str,
             text_reference: str,
             prompt: str = None,
-            image_content: bytes = None,
+            image_content: bytes | AsyncIterable[bytes] = None,
             image_filename: str = None,
     ) -> tuple[list[str] | None, bool]: pass
 
@@ -64,7 +64,7 @@ class ILoomContentClient(Protocol):
             text: str,
             moderation_status: str,
             image_url: str = None,
-            image_content: bytes = None,
+            image_content: bytes | AsyncIterable[bytes] = None,
             image_filename: str = None,
     ) -> dict: pass
 
@@ -77,7 +77,7 @@ class ILoomContentClient(Protocol):
             text: str = None,
             time_for_publication: datetime = None,
             image_url: str = None,
-            image_content: bytes = None,
+            image_content: bytes | AsyncIterable[bytes] = None,
             image_filename: str = None,
     ) -> None: pass
 
@@ -247,7 +247,7 @@ class ILoomContentClient(Protocol):
     async def transcribe_audio(
             self,
             organization_id: int,
-            audio_content: bytes = None,
+            audio_content: bytes | AsyncIterable[bytes] = None,
             audio_filename: str = None,
     ) -> str: pass
 
@@ -255,7 +255,7 @@ class ILoomContentClient(Protocol):
     async def edit_image(
             self,
             organization_id: int,
-            image_content: bytes,
+            image_content: bytes | AsyncIterable[bytes],
             image_filename: str,
             prompt: str,
     ) -> tuple[list[str] | None, bool]: pass
@@ -265,7 +265,7 @@ class ILoomContentClient(Protocol):
             self,
             organization_id: int,
             category_id: int,
-            images_content: list[bytes],
+            images_content: list[bytes | AsyncIterable[bytes]],
             images_filenames: list[str],
             prompt: str,
     ) -> tuple[list[str] | None, bool]: pass
@@ -0,0 +1,23 @@
+from typing import Protocol, Any, Awaitable, Callable
+from abc import abstractmethod
+
+from aiogram import Router
+from aiogram.types import TelegramObject
+
+
+class IDialogRegistry(Protocol):
+    router: Router
+
+    @abstractmethod
+    def build(self) -> None: pass
+
+    @abstractmethod
+    async def build_in_background(self) -> None: pass
+
+    @abstractmethod
+    async def build_middleware(
+            self,
+            handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+            event: TelegramObject,
+            data: dict[str, Any]
+    ): pass
@@ -21,6 +21,22 @@ class ICommandController(Protocol):
 
 
 class ITelegramMiddleware(Protocol):
+    @abstractmethod
+    async def update_profiler_middleware(
+            self,
+            handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+            event: Update,
+            data: dict[str, Any]
+    ): pass
+
+    @abstractmethod
+    async def chat_lock_middleware00(
+            self,
+            handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+            event: Update,
+            data: dict[str, Any]
+    ): pass
+
     @abstractmethod
     async def logger_middleware01(
             self,
@@ -29,15 +45,27 @@ class ITelegramMiddleware(Protocol):
             data: dict[str, Any]
     ): pass
 
+    @abstractmethod
+    async def callback_lock_middleware02(
+            self,
+            handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+            event: Update,
+            data: dict[str, Any]
+    ): pass
+
 
 class ITelegramWebhookController(Protocol):
     @abstractmethod
     async def bot_webhook(
             self,
             update: dict,
-            x_telegram_bot_api_secret_token: Annotated[str | None, Header()] = None
+            x_telegram_bot_api_secret_token: Annotated[str | None, Header()] = None,
+            x_loom_forwarded_by: Annotated[str | None, Header()] = None,
     ): pass
 
+    @abstractmethod
+    async def drain(self, timeout: float) -> None: pass
+
     @abstractmethod
     async def bot_set_webhook(self): pass
 
@@ -70,6 +98,24 @@ class ITelegramWebhookController(Protocol):
             body: NotifyPublicationRejectedBody,
     ) -> JSONResponse: pass
 
+    @abstractmethod
+    async def notify_vizard_video_cut_generated_batch(
+            self,
+            body: NotifyVizardVideoCutGeneratedBatch,
+    ) -> JSONResponse: pass
+
+    @abstractmethod
+    async def notify_publication_approved_alert_batch(
+            self,
+            body: NotifyPublicationApprovedBatchBody,
+    ) -> JSONResponse: pass
+
+    @abstractmethod
+    async def notify_publication_rejected_alert_batch(
+            self,
+            body: NotifyPublicationRejectedBatchBody,
+    ) -> JSONResponse: pass
+
     @abstractmethod
     async def set_cache_file(
             self,
@@ -87,19 +133,19 @@ class IHttpMiddleware(Protocol):
 
 class IOtelLogger(Protocol):
     @abstractmethod
-    def debug(self, message: str, fields: dict = None) -> None:
+    def debug(self, message: str, fields: dict | Callable[[], dict] = None) -> None:
         pass
 
     @abstractmethod
-    def info(self, message: str, fields: dict = None) -> None:
+    def info(self, message: str, fields: dict | Callable[[], dict] = None) -> None:
         pass
 
     @abstractmethod
-    def warning(self, message: str, fields: dict = None) -> None:
+    def warning(self, message: str, fields: dict | Callable[[], dict] = None) -> None:
         pass
 
     @abstractmethod
-    def error(self, message: str, fields: dict = None) -> None:
+    def error(self, message: str, fields: dict | Callable[[], dict] = None) -> None:
         pass
 
 
@@ -121,14 +167,50 @@ class IRedis(Protocol):
     @abstractmethod
     async def set(self, key: str, value: Any, ttl: int = None) -> bool: pass
 
+    @abstractmethod
+    async def set_nx(self, key: str, value: Any, ttl: int) -> bool: pass
+
+    @abstractmethod
+    async def delete(self, key: str) -> None: pass
+
+    @abstractmethod
+    async def delete_if_equals(self, key: str, value: Any) -> bool: pass
+
+    @abstractmethod
+    async def expire_if_equals(self, key: str, value: Any, ttl: int) -> bool: pass
+
+    @abstractmethod
+    async def incr(self, key: str, ttl: int) -> int: pass
+
+    @abstractmethod
+    async def push(self, key: str, value: Any, ttl: int) -> None: pass
+
+    @abstractmethod
+    async def pop(self, key: str, timeout: float) -> Any: pass
+
+    @abstractmethod
+    async def touch_member(self, key: str, member: str, ttl: int) -> None: pass
+
+    @abstractmethod
+    async def remove_member(self, key: str, member: str) -> None: pass
+
+    @abstractmethod
+    async def live_members(self, key: str) -> list[str]: pass
+
     @abstractmethod
     async def get(self, key: str, default: Any = None) -> Any: pass
 
+    @abstractmethod
+    async def ping(self) -> None: pass
+
 
 class IDB(Protocol):
     @abstractmethod
     async def insert(self, query: str, query_params: dict) -> int: pass
 
+    @abstractmethod
+    async def insert_many(self, query: str, query_params: dict) -> list[int]: pass
+
     @abstractmethod
     async def delete(self, query: str, query_params: dict) -> None: pass
 
@@ -141,6 +223,9 @@ class IDB(Protocol):
     @abstractmethod
     async def multi_query(self, queries: list[str]) -> None: pass
 
+    @abstractmethod
+    async def warmup(self, connections: int) -> None: pass
+
 
 class ITelegramClient(Protocol):
     @abstractmethod
@@ -204,3 +289,6 @@ class IAnthropicClient(Protocol):
             max_searches: int = 5,
             images: list[bytes] = None,
     ) -> tuple[dict, dict]: pass
+
+    @abstractmethod
+    async def warmup(self) -> None: pass
@@ -0,0 +1,13 @@
+from typing import Protocol
+from abc import abstractmethod
+
+
+class ILoopMonitor(Protocol):
+    @abstractmethod
+    async def start(self) -> None: pass
+
+    @abstractmethod
+    async def stop(self) -> None: pass
+
+    @abstractmethod
+    def snapshot(self, limit: int) -> dict: pass
@@ -0,0 +1,10 @@
+from typing import Protocol
+from abc import abstractmethod
+
+
+class ISamplingProfiler(Protocol):
+    @abstractmethod
+    def busy(self) -> bool: pass
+
+    @abstractmethod
+    async def profile(self, seconds: float, hz: int, mode: str) -> str: pass
@@ -0,0 +1,12 @@
+from typing import Protocol
+from abc import abstractmethod
+
+from internal.interface.general import ITelegramClient
+
+
+class ITelethonGateway(ITelegramClient, Protocol):
+    @abstractmethod
+    async def start(self) -> None: pass
+
+    @abstractmethod
+    async def stop(self) -> None: pass
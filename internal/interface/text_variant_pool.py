@@ -0,0 +1,24 @@
+from typing import Protocol, Callable, Awaitable
+from abc import abstractmethod
+
+
+class ITextVariantPool(Protocol):
+    @property
+    @abstractmethod
+    def enabled(self) -> bool: pass
+
+    @abstractmethod
+    def take(self, pool_key: str, base_text: str) -> str | None: pass
+
+    @abstractmethod
+    def prefill(
+            self,
+            pool_key: str,
+            base_text: str,
+            organization_id: int,
+            scope: str,
+            generate: Callable[[], Awaitable[str]],
+    ) -> None: pass
+
+    @abstractmethod
+    def discard(self, pool_key: str) -> None: pass
@@ -0,0 +1,10 @@
+from typing import Protocol
+from abc import abstractmethod
+
+
+class ITranscriptCache(Protocol):
+    @abstractmethod
+    async def get(self, file_unique_id: str, duration: int) -> str | None: pass
+
+    @abstractmethod
+    async def set(self, file_unique_id: str, text: str) -> None: pass
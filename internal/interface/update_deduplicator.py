@@ -0,0 +1,10 @@
+from typing import Protocol
+from abc import abstractmethod
+
+
+class IUpdateDeduplicator(Protocol):
+    @abstractmethod
+    async def is_duplicate(self, update_id: int) -> bool: pass
+
+    @abstractmethod
+    async def forget(self, update_id: int) -> None: pass
@@ -0,0 +1,10 @@
+from typing import Protocol, AsyncContextManager
+from abc import abstractmethod
+
+
+class IUpdateProfiler(Protocol):
+    @abstractmethod
+    def profile(self, chat_id: int, update_id: int, event_type: str) -> AsyncContextManager[None]: pass
+
+    @abstractmethod
+    def updates(self, chat_id: int, limit: int) -> list[dict]: pass
@@ -0,0 +1,15 @@
+from typing import Protocol
+from abc import abstractmethod
+
+from aiogram.types import Update
+
+
+class IUpdateQueue(Protocol):
+    @abstractmethod
+    async def put(self, update: Update) -> bool: pass
+
+    @abstractmethod
+    async def start(self) -> None: pass
+
+    @abstractmethod
+    async def stop(self) -> None: pass
@@ -15,6 +15,12 @@ class IStateService(Protocol):
     @abstractmethod
     async def state_by_account_id(self, account_id: int) -> list[model.UserState]: pass
 
+    @abstractmethod
+    async def states_by_account_ids(self, account_ids: list[int]) -> list[model.UserState]: pass
+
+    @abstractmethod
+    async def disable_alerts_by_state_ids(self, state_ids: list[int]) -> None: pass
+
     @abstractmethod
     async def change_user_state(
             self,
@@ -48,6 +54,15 @@ class IStateService(Protocol):
     @abstractmethod
     async def create_publication_rejected_alert(self, state_id: int, publication_id: int) -> int: pass
 
+    @abstractmethod
+    async def create_vizard_video_cut_alerts(self, alerts: list[tuple[int, str, int]]) -> list[int]: pass
+
+    @abstractmethod
+    async def create_publication_approved_alerts(self, alerts: list[tuple[int, int]]) -> list[int]: pass
+
+    @abstractmethod
+    async def create_publication_rejected_alerts(self, alerts: list[tuple[int, int]]) -> list[int]: pass
+
 
 
 class IStateRepo(Protocol):
@@ -67,6 +82,12 @@ class IStateRepo(Protocol):
     @abstractmethod
     async def get_cache_file(self, filename: str) -> list[model.CachedFile]: pass
 
+    @abstractmethod
+    async def states_by_account_ids(self, account_ids: list[int]) -> list[model.UserState]: pass
+
+    @abstractmethod
+    async def disable_alerts_by_state_ids(self, state_ids: list[int]) -> None: pass
+
     @abstractmethod
     async def change_user_state(
             self,
@@ -112,6 +133,15 @@ class IStateRepo(Protocol):
     @abstractmethod
     async def create_publication_rejected_alert(self, state_id: int, publication_id: int) -> int: pass
 
+    @abstractmethod
+    async def create_vizard_video_cut_alerts(self, alerts: list[tuple[int, str, int]]) -> list[int]: pass
+
+    @abstractmethod
+    async def create_publication_approved_alerts(self, alerts: list[tuple[int, int]]) -> list[int]: pass
+
+    @abstractmethod
+    async def create_publication_rejected_alerts(self, alerts: list[tuple[int, int]]) -> list[int]: pass
+
     @abstractmethod
     async def get_publication_rejected_alert_by_state_id(self, state_id: int) -> list[model.PublicationRejectedAlert]: pass
 
@@ -0,0 +1,16 @@
+from typing import Protocol
+from abc import abstractmethod
+
+
+class IWarmup(Protocol):
+    @abstractmethod
+    async def start(self) -> None: pass
+
+    @abstractmethod
+    async def stop(self) -> None: pass
+
+    @abstractmethod
+    def ready(self) -> bool: pass
+
+    @abstractmethod
+    def report(self) -> dict: pass
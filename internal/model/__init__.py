@@ -1,6 +1,8 @@
 from internal.model.sql_model import *
 from internal.model.user_state import *
 from internal.model.llm_chat import *
+from internal.model.text_variant_pool import *
+from internal.model.update_queue import *
 
 from internal.model.dialog_states.intro.intro import *
 from internal.model.dialog_states.brief.create_organization import *
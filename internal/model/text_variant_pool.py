@@ -0,0 +1,16 @@
+from dataclasses import dataclass, field
+
+
+@dataclass
+class TextVariant:
+    text: str
+    created_at: float
+
+
+@dataclass
+class TextVariantPoolEntry:
+    organization_id: int
+    scope: str
+    base_hashes: set[str]
+    variants: list[TextVariant] = field(default_factory=list)
+    in_flight: int = 0
@@ -0,0 +1,14 @@
+from contextvars import Context
+from dataclasses import dataclass
+
+from aiogram.types import Update
+
+
+@dataclass
+class QueuedUpdate:
+    update: Update
+    chat_id: int
+    enqueued_at: float
+    context: Context
+    # Взято воркером: из общей очереди ожидания удаляется лениво
+    taken: bool = False
@@ -14,6 +14,17 @@ SELECT * FROM user_states
 WHERE account_id = :account_id;
 """
 
+states_by_account_ids = """
+SELECT * FROM user_states
+WHERE account_id = ANY(:account_ids);
+"""
+
+disable_alerts_by_state_ids = """
+UPDATE user_states
+SET can_show_alerts = FALSE
+WHERE id = ANY(:state_ids);
+"""
+
 set_cache_file = """
 INSERT INTO cache_files (filename, file_id)
 VALUES (:filename, :file_id)
@@ -36,6 +47,12 @@ VALUES (:state_id, :youtube_video_reference, :video_count)
 RETURNING id;
 """
 
+create_vizard_video_cut_alerts = """
+INSERT INTO vizard_video_cut_alerts (state_id, youtube_video_reference, video_count)
+VALUES {values}
+RETURNING id;
+"""
+
 get_vizard_video_cut_alert_by_state_id = """
 SELECT * FROM vizard_video_cut_alerts
 WHERE state_id = :state_id;
@@ -52,6 +69,12 @@ VALUES (:state_id, :publication_id)
 RETURNING id;
 """
 
+create_publication_approved_alerts = """
+INSERT INTO publication_approved_alerts (state_id, publication_id)
+VALUES {values}
+RETURNING id;
+"""
+
 get_publication_approved_alert_by_state_id = """
 SELECT * FROM publication_approved_alerts
 WHERE state_id = :state_id;
@@ -68,6 +91,12 @@ VALUES (:state_id, :publication_id)
 RETURNING id;
 """
 
+create_publication_rejected_alerts = """
+INSERT INTO publication_rejected_alerts (state_id, publication_id)
+VALUES {values}
+RETURNING id;
+"""
+
 get_publication_rejected_alert_by_state_id = """
 SELECT * FROM publication_rejected_alerts
 WHERE state_id = :state_id;
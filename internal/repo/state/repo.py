@@ -5,6 +5,9 @@ from .query import *
 from internal import model
 from internal import interface
 
+# Строк в одном многострочном INSERT
+VALUES_CHUNK_SIZE = 1000
+
 
 class StateRepo(interface.IStateRepo):
     def __init__(self, tel: interface.ITelemetry, db: interface.IDB):
@@ -37,6 +40,20 @@ class StateRepo(interface.IStateRepo):
 
         return rows
 
+    @traced_method()
+    async def states_by_account_ids(self, account_ids: list[int]) -> list[model.UserState]:
+        args = {'account_ids': account_ids}
+        rows = await self.db.select(states_by_account_ids, args)
+        if rows:
+            rows = model.UserState.serialize(rows)
+
+        return rows
+
+    @traced_method()
+    async def disable_alerts_by_state_ids(self, state_ids: list[int]) -> None:
+        args = {'state_ids': state_ids}
+        await self.db.update(disable_alerts_by_state_ids, args)
+
     @traced_method()
     async def set_cache_file(self, filename: str, file_id: str):
         args = {'filename': filename, "file_id": file_id}
@@ -117,6 +134,12 @@ class StateRepo(interface.IStateRepo):
 
         return alert_id
 
+    @traced_method()
+    async def create_vizard_video_cut_alerts(self, alerts: list[tuple[int, str, int]]) -> list[int]:
+        alert_ids = await self._insert_values(create_vizard_video_cut_alerts, ("state_id", "youtube_video_reference", "video_count"), alerts)
+
+        return alert_ids
+
     @traced_method()
     async def get_vizard_video_cut_alert_by_state_id(self, state_id: int) -> list[model.VizardVideoCutAlert]:
         args = {'state_id': state_id}
@@ -143,6 +166,12 @@ class StateRepo(interface.IStateRepo):
 
         return alert_id
 
+    @traced_method()
+    async def create_publication_approved_alerts(self, alerts: list[tuple[int, int]]) -> list[int]:
+        alert_ids = await self._insert_values(create_publication_approved_alerts, ("state_id", "publication_id"), alerts)
+
+        return alert_ids
+
     @traced_method()
     async def get_publication_approved_alert_by_state_id(self, state_id: int) -> list[model.PublicationApprovedAlert]:
         args = {'state_id': state_id}
@@ -169,6 +198,12 @@ class StateRepo(interface.IStateRepo):
 
         return alert_id
 
+    @traced_method()
+    async def create_publication_rejected_alerts(self, alerts: list[tuple[int, int]]) -> list[int]:
+        alert_ids = await self._insert_values(create_publication_rejected_alerts, ("state_id", "publication_id"), alerts)
+
+        return alert_ids
+
     @traced_method()
     async def get_publication_rejected_alert_by_state_id(self, state_id: int) -> list[model.PublicationRejectedAlert]:
         args = {'state_id': state_id}
@@ -184,3 +219,23 @@ class StateRepo(interface.IStateRepo):
             'state_id': state_id
         }
         await self.db.delete(delete_publication_rejected_alert, args)
+
+    async def _insert_values(self, query: str, columns: tuple[str, ...], rows: list[tuple]) -> list[int]:
+        # Строки уходят пачками по VALUES_CHUNK_SIZE: число параметров запроса в PG ограничено 32767
+        ids = []
+        for start in range(0, len(rows), VALUES_CHUNK_SIZE):
+            values, args = self._values_clause(columns, rows[start:start + VALUES_CHUNK_SIZE])
+            ids.extend(await self.db.insert_many(query.format(values=values), args))
+
+        return ids
+
+    @staticmethod
+    def _values_clause(columns: tuple[str, ...], rows: list[tuple]) -> tuple[str, dict]:
+        # Многострочный VALUES для вставки пачки строк одним запросом
+        placeholders = []
+        args = {}
+        for i, row in enumerate(rows):
+            placeholders.append("(" + ", ".join(f":{column}_{i}" for column in columns) + ")")
+            args.update({f"{column}_{i}": value for column, value in zip(columns, row)})
+
+        return ",\n".join(placeholders), args
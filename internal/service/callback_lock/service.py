@@ -0,0 +1,106 @@
+import uuid
+
+from aiogram.types import Update
+
+from internal import interface, common
+
+
+class CallbackLock(interface.ICallbackLock):
+    """
+    Блокировка дорогих действий на время их выполнения: пока кнопка чата в работе,
+    повторные нажатия кнопок той же группы (scope) не запускают обработчик еще раз.
+
+    Решение принимается в вебхуке, до очереди чата и блокировки чата: повторное нажатие,
+    вставшее в очередь за первым, выполнилось бы уже после снятия блокировки. Блокировка -
+    SET NX EX в Redis по (chat_id, scope), общая для воркеров и реплик; снимается, когда
+    обновление, взявшее ее, обработано диспетчером.
+
+    Группы задаются строкой вида "generate:text_only|with_image;publish:publish_now|approve".
+    """
+
+    def __init__(
+            self,
+            tel: interface.ITelemetry,
+            redis: interface.IRedis,
+            scopes: str,
+            ttl: int,
+    ):
+        self.tracer = tel.tracer()
+        self.meter = tel.meter()
+        self.logger = tel.logger()
+
+        self.redis = redis
+        self.ttl = ttl
+        self._action_scopes = self._parse_scopes(scopes)
+        # update_id -> (ключ, токен) блокировок, взятых этим процессом
+        self._held: dict[int, tuple[str, str]] = {}
+
+        self.suppressed_counter = self.meter.create_counter(
+            name=common.CALLBACK_LOCK_SUPPRESSED_KEY,
+            description="Повторные нажатия, отклоненные из-за выполняющегося действия",
+        )
+
+    def scope_for(self, action: str) -> str | None:
+        return self._action_scopes.get(action)
+
+    async def acquire(self, update: Update) -> bool:
+        callback_query = update.callback_query
+        if callback_query is None:
+            return True
+
+        scope = self.scope_for(self._extract_action(callback_query.data))
+        if scope is None:
+            return True
+
+        chat_id = callback_query.message.chat.id if callback_query.message else callback_query.from_user.id
+        key = f"callback_lock:{chat_id}:{scope}"
+        token = uuid.uuid4().hex
+
+        try:
+            acquired = await self.redis.set_nx(key, token, ttl=self.ttl)
+        except Exception as err:
+            # Без Redis лучше выполнить нажатие, чем потерять его
+            self.logger.warning("Не удалось взять блокировку кнопки", {common.ERROR_KEY: str(err)})
+            return True
+
+        # Истекший TTL не даст навсегда запереть кнопку, если обработчик завис
+        if not acquired:
+            self.suppressed_counter.add(1, {common.CALLBACK_LOCK_SCOPE_KEY: scope})
+            self.logger.info("Повторное нажатие во время выполнения действия", {"scope": scope})
+            return False
+
+        self._held[update.update_id] = (key, token)
+        return True
+
+    async def release(self, update_id: int) -> None:
+        held = self._held.pop(update_id, None)
+        if held is None:
+            return
+
+        key, token = held
+        try:
+            await self.redis.delete_if_equals(key, token)
+        except Exception as err:
+            self.logger.warning("Не удалось снять блокировку кнопки", {common.ERROR_KEY: str(err)})
+
+    @staticmethod
+    def _extract_action(callback_data: str | None) -> str:
+        if not callback_data:
+            return ""
+
+        # aiogram-dialog: "<intent_id>\x1d<widget_id>[:<item_id>]"
+        widget_data = callback_data.split("\x1d", 1)[-1]
+        return widget_data.split(":", 1)[0]
+
+    @staticmethod
+    def _parse_scopes(scopes: str) -> dict[str, str]:
+        action_scopes = {}
+        for scope_definition in scopes.split(";"):
+            if not scope_definition.strip():
+                continue
+
+            scope, actions = scope_definition.split(":", 1)
+            for action in actions.split("|"):
+                action_scopes[action.strip()] = scope.strip()
+
+        return action_scopes
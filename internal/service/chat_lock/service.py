@@ -0,0 +1,94 @@
+import asyncio
+import time
+import uuid
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from internal import interface, common
+
+
+class ChatLock(interface.IChatLock):
+    """
+    Блокировка чата в Redis на время обработки обновления.
+    При нескольких воркерах или репликах обновления одного чата не обрабатываются одновременно,
+    поэтому состояние aiogram-dialog не перезаписывается параллельными обработчиками.
+    """
+
+    POLL_INTERVAL = 0.05
+
+    def __init__(
+            self,
+            tel: interface.ITelemetry,
+            redis: interface.IRedis,
+            ttl: int,
+            wait_timeout: float,
+    ):
+        self.tracer = tel.tracer()
+        self.meter = tel.meter()
+        self.logger = tel.logger()
+
+        self.redis = redis
+        self.ttl = ttl
+        self.wait_timeout = wait_timeout
+
+        self.wait_histogram = self.meter.create_histogram(
+            name=common.CHAT_LOCK_WAIT_KEY,
+            unit="s",
+            description="Ожидание блокировки чата перед обработкой обновления",
+        )
+        self.timeout_counter = self.meter.create_counter(
+            name=common.CHAT_LOCK_TIMEOUT_KEY,
+            description="Обновления, обработанные без блокировки чата после таймаута ожидания",
+        )
+
+    @asynccontextmanager
+    async def hold(self, chat_id: int) -> AsyncIterator[bool]:
+        key = self._key(chat_id)
+        token = uuid.uuid4().hex
+
+        acquired = await self._acquire(key, token)
+        renewal = asyncio.create_task(self._renew(key, token)) if acquired else None
+
+        try:
+            yield acquired
+        finally:
+            if renewal:
+                renewal.cancel()
+                try:
+                    await self.redis.delete_if_equals(key, token)
+                except Exception as err:
+                    self.logger.warning("Не удалось снять блокировку чата", {common.ERROR_KEY: str(err)})
+
+    async def _acquire(self, key: str, token: str) -> bool:
+        started_at = time.monotonic()
+        deadline = started_at + self.wait_timeout
+
+        try:
+            while not await self.redis.set_nx(key, token, ttl=self.ttl):
+                if time.monotonic() >= deadline:
+                    # Лучше обработать обновление без блокировки, чем потерять действие пользователя
+                    self.timeout_counter.add(1)
+                    self.logger.warning("Не дождались блокировки чата", {"wait_timeout": self.wait_timeout})
+                    return False
+                await asyncio.sleep(self.POLL_INTERVAL)
+        except Exception as err:
+            self.logger.warning("Не удалось взять блокировку чата", {common.ERROR_KEY: str(err)})
+            return False
+        finally:
+            self.wait_histogram.record(time.monotonic() - started_at)
+
+        return True
+
+    async def _renew(self, key: str, token: str) -> None:
+        # Генерация публикации может идти дольше ttl, поэтому блокировка продлевается, пока обработчик жив
+        while True:
+            await asyncio.sleep(self.ttl / 3)
+            try:
+                if not await self.redis.expire_if_equals(key, token, self.ttl):
+                    return
+            except Exception as err:
+                self.logger.warning("Не удалось продлить блокировку чата", {common.ERROR_KEY: str(err)})
+
+    @staticmethod
+    def _key(chat_id: int) -> str:
+        return f"chat_lock:{chat_id}"
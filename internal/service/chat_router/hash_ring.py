@@ -0,0 +1,34 @@
+import bisect
+import hashlib
+
+
+class HashRing:
+    def __init__(self, nodes: list[str], virtual_nodes: int):
+        self.nodes = sorted(set(nodes))
+        self._points: list[int] = []
+        self._owners: list[str] = []
+
+        # Виртуальные узлы выравнивают нагрузку: при уходе реплики ее чаты расходятся по всем остальным
+        points = sorted(
+            (self._hash(f"{node}#{index}"), node)
+            for node in self.nodes
+            for index in range(virtual_nodes)
+        )
+        for point, node in points:
+            self._points.append(point)
+            self._owners.append(node)
+
+    def owner(self, key: int | str, exclude: set[str] = frozenset()) -> str | None:
+        if len(exclude) >= len(self.nodes):
+            return None
+
+        index = bisect.bisect(self._points, self._hash(str(key)))
+        for offset in range(len(self._owners)):
+            node = self._owners[(index + offset) % len(self._owners)]
+            if node not in exclude:
+                return node
+        return None
+
+    @staticmethod
+    def _hash(value: str) -> int:
+        return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), "big")
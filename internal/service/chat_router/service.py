@@ -0,0 +1,157 @@
+import asyncio
+import time
+
+import httpx
+from aiogram.types import Update
+
+from internal import interface, common
+from internal.service.chat_router.hash_ring import HashRing
+
+
+class ChatRouter(interface.IChatRouter):
+    """
+    Маршрутизация вебхука между репликами по chat_id через консистентное хеширование.
+    Обновления чата обрабатывает одна реплика, поэтому ее кэши состояния и истории остаются горячими.
+    Реплики объявляют себя в Redis с TTL; при уходе реплики ее чаты переходят к соседям по кольцу,
+    а недоступная реплика временно исключается из маршрутизации.
+    """
+
+    MEMBERS_KEY = "chat_router:replicas"
+    FORWARDED_HEADER = "X-Loom-Forwarded-By"
+
+    def __init__(
+            self,
+            tel: interface.ITelemetry,
+            redis: interface.IRedis | None,
+            replica_url: str,
+            static_replicas: list[str],
+            prefix: str,
+            virtual_nodes: int,
+            heartbeat_ttl: int,
+            forward_timeout: float,
+            down_cooldown: float,
+    ):
+        self.tracer = tel.tracer()
+        self.meter = tel.meter()
+        self.logger = tel.logger()
+
+        self.redis = redis
+        self.replica_url = replica_url
+        self.static_replicas = static_replicas
+        self.prefix = prefix
+        self.virtual_nodes = virtual_nodes
+        self.heartbeat_ttl = heartbeat_ttl
+        self.down_cooldown = down_cooldown
+
+        self._ring = HashRing(static_replicas or [replica_url], virtual_nodes)
+        self._down_until: dict[str, float] = {}
+        self._task: asyncio.Task | None = None
+        self._client = httpx.AsyncClient(timeout=forward_timeout)
+
+        self.forwarded_counter = self.meter.create_counter(
+            name=common.CHAT_ROUTER_FORWARDED_KEY,
+            description="Обновления, переданные реплике-владельцу чата",
+        )
+        self.fallback_counter = self.meter.create_counter(
+            name=common.CHAT_ROUTER_FALLBACK_KEY,
+            description="Обновления, не доставленные владельцу чата и переданные дальше по кольцу",
+        )
+        self.timeout_counter = self.meter.create_counter(
+            name=common.CHAT_ROUTER_TIMEOUT_KEY,
+            description="Обновления, владелец которых не подтвердил прием вовремя и которые обработаны локально",
+        )
+
+    async def forward(self, update: Update, raw_update: dict, secret_token: str) -> bool:
+        chat_id = self._chat_id(update)
+        if chat_id is None:
+            return False
+
+        while True:
+            owner = self._ring.owner(chat_id, exclude=self._down_replicas())
+            if owner is None or owner == self.replica_url:
+                return False
+
+            try:
+                response = await self._client.post(
+                    f"{owner}{self.prefix}/update",
+                    json=raw_update,
+                    headers={
+                        "X-Telegram-Bot-Api-Secret-Token": secret_token,
+                        self.FORWARDED_HEADER: self.replica_url,
+                    },
+                )
+                response.raise_for_status()
+                self.forwarded_counter.add(1)
+                return True
+            except httpx.ReadTimeout as err:
+                # Владелец подтверждает прием до обработки, поэтому таймаут - сбой, а не долгий обработчик.
+                # Обновление обрабатывается здесь; если владелец его все же получил, повтор отсечет
+                # общая дедупликация в Redis
+                self.timeout_counter.add(1)
+                self.logger.warning(
+                    "Реплика-владелец чата не подтвердила прием обновления",
+                    {"replica": owner, common.ERROR_KEY: str(err)}
+                )
+                self._down_until[owner] = time.monotonic() + self.down_cooldown
+                return False
+            except httpx.HTTPError as err:
+                self.fallback_counter.add(1)
+                self.logger.warning(
+                    "Реплика-владелец чата недоступна",
+                    {"replica": owner, common.ERROR_KEY: str(err)}
+                )
+                self._down_until[owner] = time.monotonic() + self.down_cooldown
+
+    async def start(self) -> None:
+        if self.redis and not self.static_replicas:
+            try:
+                await self._refresh()
+            except Exception as err:
+                self.logger.warning("Не удалось войти в кольцо реплик", {common.ERROR_KEY: str(err)})
+            self._task = asyncio.create_task(self._heartbeat())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+            # Уходим из кольца до остановки очереди, чтобы новые обновления сразу шли соседям
+            try:
+                await self.redis.remove_member(self.MEMBERS_KEY, self.replica_url)
+            except Exception as err:
+                self.logger.warning("Не удалось выйти из кольца реплик", {common.ERROR_KEY: str(err)})
+
+        await self._client.aclose()
+
+    async def _heartbeat(self) -> None:
+        while True:
+            await asyncio.sleep(self.heartbeat_ttl / 3)
+            try:
+                await self._refresh()
+            except Exception as err:
+                self.logger.warning("Не удалось обновить кольцо реплик", {common.ERROR_KEY: str(err)})
+
+    async def _refresh(self) -> None:
+        await self.redis.touch_member(self.MEMBERS_KEY, self.replica_url, self.heartbeat_ttl)
+        replicas = await self.redis.live_members(self.MEMBERS_KEY)
+
+        if sorted(set(replicas)) != self._ring.nodes:
+            self.logger.info("Состав реплик изменился", {"replicas": replicas})
+            self._ring = HashRing(replicas, self.virtual_nodes)
+
+    def _down_replicas(self) -> set[str]:
+        now = time.monotonic()
+        return {replica for replica, down_until in self._down_until.items() if down_until > now}
+
+    @staticmethod
+    def _chat_id(update: Update) -> int | None:
+        if update.message:
+            return update.message.chat.id
+
+        if update.callback_query:
+            if update.callback_query.message:
+                return update.callback_query.message.chat.id
+            return update.callback_query.from_user.id
+
+        return None
@@ -0,0 +1,80 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable
+
+from aiogram import Router
+from aiogram.types import TelegramObject
+from aiogram_dialog import Dialog
+
+from internal import interface
+from pkg.trace_wrapper import record_step
+
+
+class LazyDialogRegistry(interface.IDialogRegistry):
+    """
+    Диалоги aiogram-dialog, собираемые не при импорте main, а фоновой задачей прогрева
+    или, если прогрев не успел, синхронно перед первым обновлением.
+    Роутер включается в диспетчер до setup_dialogs пустым: реестр aiogram-dialog читает
+    дерево роутеров лениво, при первом поиске диалога, то есть уже после сборки.
+    """
+
+    def __init__(
+            self,
+            tel: interface.ITelemetry,
+            # Обертки диалогов: get_dialog() собирает Dialog с окнами и виджетами
+            dialogs: list,
+    ):
+        self.logger = tel.logger()
+
+        self.router = Router(name="dialogs")
+
+        self._pending = list(dialogs)
+        self._built: list[Dialog] = []
+        self._included = False
+
+    def build(self) -> None:
+        if self._included:
+            return
+
+        started_at = time.perf_counter()
+        while self._pending:
+            self._build_next()
+        self._include(started_at, "first_update")
+
+    async def build_in_background(self) -> None:
+        started_at = time.perf_counter()
+        while self._pending and not self._included:
+            self._build_next()
+            # Между диалогами цикл событий отдается запросам, пришедшим во время прогрева
+            await asyncio.sleep(0)
+
+        if not self._included:
+            self._include(started_at, "warmup")
+
+    async def build_middleware(
+            self,
+            handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+            event: TelegramObject,
+            data: dict[str, Any]
+    ):
+        if not self._included:
+            started_at = time.perf_counter()
+            self.build()
+            record_step("dialogs.build", started_at)
+
+        return await handler(event, data)
+
+    def _build_next(self) -> None:
+        # Из очереди диалог уходит только собранным: ошибка сборки повторится при следующей попытке
+        self._built.append(self._pending[0].get_dialog())
+        self._pending.pop(0)
+
+    def _include(self, started_at: float, trigger: str) -> None:
+        self.router.include_routers(*self._built)
+        self._included = True
+
+        self.logger.info("Диалоги собраны", {
+            "dialogs": len(self._built),
+            "trigger": trigger,
+            "duration_ms": round((time.perf_counter() - started_at) * 1000, 1),
+        })
@@ -0,0 +1,243 @@
+import asyncio
+import io
+import sys
+import threading
+import time
+import traceback
+import weakref
+from collections import deque
+from contextvars import ContextVar
+
+from opentelemetry import context as otel_context, trace
+
+from internal import interface, common
+from pkg.trace_wrapper.trace_wrapper import is_wrapper_frame
+
+
+class LoopMonitor(interface.ILoopMonitor):
+    """
+    Монитор цикла событий. Пробная задача раз в interval засыпает и пишет в гистограмму,
+    насколько позже запланированного она проснулась. Сторожевой поток ставит в цикл короткий callback;
+    если он не выполнился за slow_threshold, цикл чем-то занят - поток снимает стек потока цикла,
+    текущую задачу и ее trace id, пока блокировка еще идет.
+    """
+
+    def __init__(
+            self,
+            tel: interface.ITelemetry,
+            log_context: ContextVar[dict],
+            interval: float,
+            slow_threshold: float,
+            max_stalls: int = 50,
+    ):
+        self.meter = tel.meter()
+        self.logger = tel.logger()
+
+        self.log_context = log_context
+        self.interval = interval
+        self.slow_threshold = slow_threshold
+
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._loop_thread_id: int | None = None
+        self._probe_task: asyncio.Task | None = None
+        self._watchdog: threading.Thread | None = None
+        self._stopped = threading.Event()
+
+        # Момент, когда сторожевой поток запросил еще не выполненный callback
+        self._beat_requested_at: float | None = None
+
+        self._last_lag = 0.0
+        self._max_lag = 0.0
+        self._stalls: deque[dict] = deque(maxlen=max_stalls)
+        self._stalls_lock = threading.Lock()
+        self._task_first_seen: weakref.WeakKeyDictionary[asyncio.Task, float] = weakref.WeakKeyDictionary()
+
+        self.lag_histogram = self.meter.create_histogram(
+            name=common.EVENT_LOOP_LAG_KEY,
+            unit="s",
+            description="Опоздание пробного таймера относительно запланированного времени",
+        )
+        self.stall_counter = self.meter.create_counter(
+            name=common.EVENT_LOOP_STALL_KEY,
+            description="Блокировки цикла событий дольше порога",
+        )
+
+    async def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._stopped.clear()
+
+        self._probe_task = asyncio.create_task(self._probe())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-monitor", daemon=True)
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        self._stopped.set()
+
+        if self._probe_task:
+            self._probe_task.cancel()
+            try:
+                await self._probe_task
+            except asyncio.CancelledError:
+                pass
+            self._probe_task = None
+
+        if self._watchdog:
+            await asyncio.to_thread(self._watchdog.join, self.slow_threshold * 2)
+            self._watchdog = None
+
+    def snapshot(self, limit: int) -> dict:
+        now = time.monotonic()
+
+        with self._stalls_lock:
+            stalls = sorted(self._stalls, key=lambda stall: stall["duration"], reverse=True)[:limit]
+            stalls = [dict(stall) for stall in stalls]
+
+        tasks = []
+        for task in asyncio.all_tasks(self._loop):
+            if task.done():
+                continue
+            first_seen = self._task_first_seen.get(task)
+            if first_seen is None:
+                first_seen = self._task_first_seen.setdefault(task, now)
+            tasks.append((now - first_seen, task))
+        tasks.sort(key=lambda item: item[0], reverse=True)
+
+        return {
+            "lag": {
+                "last": round(self._last_lag, 4),
+                "max": round(self._max_lag, 4),
+            },
+            "slowest_callbacks": stalls,
+            "oldest_tasks": [
+                {
+                    "name": task.get_name(),
+                    "age": round(age, 3),
+                    "coroutine": getattr(task.get_coro(), "__qualname__", repr(task.get_coro())),
+                    "trace_id": self._trace_id(task, task.get_stack()),
+                    "stack": self._task_stack(task),
+                }
+                for age, task in tasks[:limit]
+            ],
+        }
+
+    async def _probe(self) -> None:
+        while True:
+            scheduled_at = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+
+            lag = max(time.monotonic() - scheduled_at, 0.0)
+            self._last_lag = lag
+            self._max_lag = max(self._max_lag, lag)
+            self.lag_histogram.record(lag)
+
+            # Возраст задачи считается от первой пробы, которая ее застала
+            now = time.monotonic()
+            for task in asyncio.all_tasks():
+                self._task_first_seen.setdefault(task, now)
+
+    def _beat(self) -> None:
+        self._beat_requested_at = None
+
+    def _watch(self) -> None:
+        step = self.slow_threshold / 2
+        stall: dict | None = None
+
+        while not self._stopped.wait(step):
+            requested_at = self._beat_requested_at
+            now = time.monotonic()
+
+            if requested_at is None:
+                stall = None
+                self._beat_requested_at = now
+                try:
+                    self._loop.call_soon_threadsafe(self._beat)
+                except RuntimeError:
+                    # Цикл закрыт
+                    return
+                continue
+
+            blocked_for = now - requested_at
+            if blocked_for < self.slow_threshold:
+                continue
+
+            if stall is None:
+                stall = self._capture_stall(blocked_for)
+            else:
+                with self._stalls_lock:
+                    stall["duration"] = round(blocked_for, 4)
+
+    def _capture_stall(self, blocked_for: float) -> dict:
+        frame = sys._current_frames().get(self._loop_thread_id)
+        stack = "".join(traceback.format_stack(frame)) if frame is not None else ""
+        frames = []
+        while frame is not None:
+            frames.append(frame)
+            frame = frame.f_back
+
+        task = self._current_task()
+        stall = {
+            "at": time.time(),
+            "duration": round(blocked_for, 4),
+            "task": task.get_name() if task else None,
+            "trace_id": self._trace_id(task, frames),
+            "context": self._log_fields(task) if task else {},
+            "stack": stack,
+        }
+        with self._stalls_lock:
+            self._stalls.append(stall)
+
+        self.stall_counter.add(1)
+        self.logger.warning("Цикл событий заблокирован дольше порога", {
+            "blocked_for": round(blocked_for, 4),
+            "blocked_task": stall["task"] or "",
+            "blocked_trace_id": stall["trace_id"] or "",
+            common.TRACEBACK_KEY: stack,
+            **stall["context"],
+        })
+        return stall
+
+    def _current_task(self) -> asyncio.Task | None:
+        try:
+            return asyncio.current_task(self._loop)
+        except RuntimeError:
+            return None
+
+    @staticmethod
+    def _task_context(task: asyncio.Task):
+        get_context = getattr(task, "get_context", None)
+        return get_context() if get_context else getattr(task, "_context", None)
+
+    def _trace_id(self, task: asyncio.Task | None, frames: list) -> str | None:
+        task_context = self._task_context(task) if task else None
+        if task_context is not None:
+            # Контекст OpenTelemetry лежит в одной из contextvars задачи
+            for value in list(task_context.values()):
+                if isinstance(value, otel_context.Context):
+                    span_context = trace.get_current_span(value).get_span_context()
+                    if span_context.is_valid:
+                        return format(span_context.trace_id, '032x')
+
+        # До Python 3.12 контекст задачи недоступен - ищем спан в рамках traced_method на стеке
+        for frame in frames:
+            if not is_wrapper_frame(frame):
+                continue
+            span = frame.f_locals.get("span")
+            if span is not None:
+                span_context = span.get_span_context()
+                if span_context.is_valid:
+                    return format(span_context.trace_id, '032x')
+        return None
+
+    def _log_fields(self, task: asyncio.Task) -> dict:
+        task_context = self._task_context(task)
+        # До Python 3.12 контекст задачи недоступен
+        if task_context is None:
+            return {}
+        return dict(task_context.get(self.log_context, {}))
+
+    @staticmethod
+    def _task_stack(task: asyncio.Task) -> str:
+        output = io.StringIO()
+        task.print_stack(limit=10, file=output)
+        return output.getvalue()
@@ -0,0 +1,128 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+from internal import interface
+from pkg.trace_wrapper.trace_wrapper import is_wrapper_frame
+
+
+class SamplingProfiler(interface.ISamplingProfiler):
+    """
+    Статистический профилировщик по запросу, результат - collapsed stacks для flamegraph.pl / speedscope.
+    cpu: отдельный поток с частотой hz снимает стеки всех потоков через sys._current_frames();
+    для потока цикла событий это то, на что тратится CPU.
+    async: корутина в цикле с частотой hz снимает стеки ожидающих задач - где обновления ждут.
+    Корнем каждого стека идет состояние диалога из ближайшей обертки traced_method.
+    """
+
+    MODES = ("cpu", "async")
+
+    def __init__(self, root_path: str, max_seconds: float, max_hz: int):
+        self.root_path = os.path.abspath(root_path) + os.sep
+        self.max_seconds = max_seconds
+        self.max_hz = max_hz
+
+        self._lock = asyncio.Lock()
+        self._labels: dict = {}
+
+    def busy(self) -> bool:
+        return self._lock.locked()
+
+    async def profile(self, seconds: float, hz: int, mode: str) -> str:
+        if mode not in self.MODES:
+            raise ValueError(f"unknown profile mode: {mode}")
+
+        seconds = min(max(seconds, 0.1), self.max_seconds)
+        interval = 1 / min(max(hz, 1), self.max_hz)
+
+        async with self._lock:
+            if mode == "cpu":
+                samples = await asyncio.to_thread(self._sample_threads, threading.get_ident(), seconds, interval)
+            else:
+                samples = await self._sample_tasks(seconds, interval)
+
+        return "".join(f"{stack} {count}\n" for stack, count in samples.most_common())
+
+    def _sample_threads(self, loop_thread_id: int, seconds: float, interval: float) -> Counter:
+        own_thread_id = threading.get_ident()
+        samples = Counter()
+        deadline = time.monotonic() + seconds
+
+        while time.monotonic() < deadline:
+            thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_thread_id:
+                    continue
+
+                # Стек от внешней рамки к внутренней
+                frames = []
+                while frame is not None:
+                    frames.append(frame)
+                    frame = frame.f_back
+                frames.reverse()
+
+                root = "event_loop" if thread_id == loop_thread_id else f"thread:{thread_names.get(thread_id, thread_id)}"
+                samples[self._collapse(root, frames)] += 1
+            # Рамки не держим между сэмплами
+            frame = frames = None
+
+            time.sleep(interval)
+
+        return samples
+
+    async def _sample_tasks(self, seconds: float, interval: float) -> Counter:
+        own_task = asyncio.current_task()
+        samples = Counter()
+        deadline = time.monotonic() + seconds
+
+        while time.monotonic() < deadline:
+            for task in asyncio.all_tasks():
+                if task is own_task or task.done():
+                    continue
+                samples[self._collapse("task", self._awaiting_frames(task))] += 1
+
+            await asyncio.sleep(interval)
+
+        return samples
+
+    @staticmethod
+    def _awaiting_frames(task: asyncio.Task) -> list:
+        # Task.get_stack для корутины отдает только внешнюю рамку - идем по цепочке cr_await
+        frames = []
+        awaitable = task.get_coro()
+        while awaitable is not None and len(frames) < 128:
+            frame = getattr(awaitable, "cr_frame", None) or getattr(awaitable, "gi_frame", None)
+            if frame is None:
+                break
+            frames.append(frame)
+            awaitable = getattr(awaitable, "cr_await", None) or getattr(awaitable, "gi_yieldfrom", None)
+        return frames
+
+    def _collapse(self, root: str, frames: list) -> str:
+        state = "none"
+        labels = []
+        for frame in frames:
+            if is_wrapper_frame(frame):
+                # Внутренняя обертка с состоянием перекрывает внешние
+                state = frame.f_locals.get("dialog_state_name") or state
+                continue
+            labels.append(self._label(frame.f_code))
+
+        return ";".join([root, f"state:{state}", *labels])
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            filename = code.co_filename
+            if filename.startswith(self.root_path):
+                filename = filename[len(self.root_path):]
+            else:
+                filename = filename.rsplit(os.sep, 1)[-1]
+            name = getattr(code, "co_qualname", code.co_name)
+            # ";" - разделитель рамок в формате collapsed stacks
+            label = f"{name} ({filename}:{code.co_firstlineno})".replace(";", ":")
+            self._labels[code] = label
+        return label
@@ -0,0 +1,176 @@
+import asyncio
+import heapq
+import itertools
+import time
+from contextvars import ContextVar
+
+from aiogram import Bot
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import TelegramMethod, Response, SendChatAction
+from aiogram.methods.base import TelegramType
+
+from internal import interface, common
+from pkg.trace_wrapper import record_step
+from internal.service.send_scheduler.token_bucket import TokenBucket
+
+
+class SendScheduler(BaseRequestMiddleware):
+    """
+    Планировщик исходящих запросов Bot API, подключается middleware к сессии aiogram.
+    Держит общий лимит бота и лимит на чат (token bucket), соблюдает retry_after
+    и пропускает интерактивные ответы диалогов раньше уведомлений.
+    """
+
+    RATE_LIMITED_PREFIXES = ("send", "edit", "copy", "forward")
+    MAX_CHAT_BUCKETS = 10000
+
+    def __init__(
+            self,
+            tel: interface.ITelemetry,
+            send_priority: ContextVar[common.SendPriority],
+            global_rate: float,
+            chat_rate: float,
+            chat_burst: int,
+            max_retries: int = 3,
+    ):
+        self.tracer = tel.tracer()
+        self.meter = tel.meter()
+        self.logger = tel.logger()
+
+        self.send_priority = send_priority
+        self.global_rate = global_rate
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.max_retries = max_retries
+
+        self._global_buckets: dict[int, TokenBucket] = {}
+        self._chat_buckets: dict[tuple[int, int | str], TokenBucket] = {}
+        self._waiters: dict[int, list[tuple[int, int, asyncio.Future]]] = {}
+        self._pumps: dict[int, asyncio.Task] = {}
+        self._sequence = itertools.count()
+
+        self.queue_delay_histogram = self.meter.create_histogram(
+            name=common.SEND_SCHEDULER_QUEUE_DELAY_KEY,
+            unit="s",
+            description="Ожидание запроса к Bot API в планировщике отправки",
+        )
+        self.retry_after_counter = self.meter.create_counter(
+            name=common.SEND_SCHEDULER_RETRY_AFTER_KEY,
+            description="Ответы Bot API 429 с retry_after",
+        )
+
+    async def __call__(
+            self,
+            make_request: NextRequestMiddlewareType[TelegramType],
+            bot: Bot,
+            method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        started_at = time.perf_counter()
+        error = False
+        try:
+            return await self._send(make_request, bot, method)
+        except Exception:
+            error = True
+            raise
+        finally:
+            # Шаг профиля обновления включает и ожидание в планировщике
+            record_step(f"bot.{method.__api_method__}", started_at, "client", error)
+
+    async def _send(
+            self,
+            make_request: NextRequestMiddlewareType[TelegramType],
+            bot: Bot,
+            method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        if not method.__api_method__.startswith(self.RATE_LIMITED_PREFIXES):
+            return await make_request(bot, method)
+
+        chat_id = getattr(method, "chat_id", None)
+        priority = common.SendPriority.CHAT_ACTION if isinstance(method, SendChatAction) else self.send_priority.get()
+
+        for attempt in range(self.max_retries + 1):
+            started_at = time.monotonic()
+            await self._acquire(bot.id, chat_id, priority)
+            self.queue_delay_histogram.record(
+                time.monotonic() - started_at,
+                {common.SEND_SCHEDULER_PRIORITY_KEY: priority.name.lower()}
+            )
+
+            try:
+                return await make_request(bot, method)
+            except TelegramRetryAfter as err:
+                self.retry_after_counter.add(1, {common.SEND_SCHEDULER_PRIORITY_KEY: priority.name.lower()})
+                if attempt == self.max_retries:
+                    raise
+
+                self.logger.warning(
+                    "Bot API попросил подождать перед повторной отправкой",
+                    {"retry_after": err.retry_after, "method": method.__api_method__}
+                )
+                # Ограничение чата не должно тормозить остальные чаты, без чата - ставим на паузу весь бот
+                if chat_id is not None:
+                    self._chat_bucket(bot.id, chat_id).pause(err.retry_after)
+                else:
+                    self._global_bucket(bot.id).pause(err.retry_after)
+
+    async def _acquire(self, bot_id: int, chat_id: int | str | None, priority: common.SendPriority) -> None:
+        # Индикатор "печатает" не расходует лимит чата, чтобы не задерживать сами сообщения
+        if chat_id is not None and priority != common.SendPriority.CHAT_ACTION:
+            delay = self._chat_bucket(bot_id, chat_id).reserve()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+        global_bucket = self._global_bucket(bot_id)
+        waiters = self._waiters.setdefault(bot_id, [])
+
+        if not waiters and global_bucket.delay() == 0:
+            global_bucket.take()
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(waiters, (priority, next(self._sequence), future))
+
+        if bot_id not in self._pumps or self._pumps[bot_id].done():
+            self._pumps[bot_id] = asyncio.create_task(self._pump(bot_id))
+
+        await future
+
+    async def _pump(self, bot_id: int) -> None:
+        global_bucket = self._global_bucket(bot_id)
+        waiters = self._waiters[bot_id]
+
+        while waiters:
+            delay = global_bucket.delay()
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue
+
+            _, _, future = heapq.heappop(waiters)
+            if future.done():
+                continue
+
+            global_bucket.take()
+            future.set_result(None)
+
+    def _global_bucket(self, bot_id: int) -> TokenBucket:
+        bucket = self._global_buckets.get(bot_id)
+        if bucket is None:
+            bucket = TokenBucket(self.global_rate, self.global_rate)
+            self._global_buckets[bot_id] = bucket
+        return bucket
+
+    def _chat_bucket(self, bot_id: int, chat_id: int | str) -> TokenBucket:
+        bucket = self._chat_buckets.get((bot_id, chat_id))
+        if bucket is None:
+            if len(self._chat_buckets) >= self.MAX_CHAT_BUCKETS:
+                self._prune_chat_buckets()
+
+            bucket = TokenBucket(self.chat_rate, self.chat_burst)
+            self._chat_buckets[(bot_id, chat_id)] = bucket
+        return bucket
+
+    def _prune_chat_buckets(self) -> None:
+        for key, bucket in list(self._chat_buckets.items()):
+            if bucket.is_idle():
+                del self._chat_buckets[key]
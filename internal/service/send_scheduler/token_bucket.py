@@ -0,0 +1,36 @@
+import time
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self.paused_until = 0.0
+
+    def delay(self) -> float:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+        pause_delay = max(0.0, self.paused_until - now)
+        token_delay = 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+        return max(pause_delay, token_delay)
+
+    def take(self) -> None:
+        self.tokens -= 1
+
+    def reserve(self) -> float:
+        # Токен списывается сразу (баланс может уйти в минус), поэтому ожидающие получают слоты по порядку
+        delay = self.delay()
+        self.take()
+        return delay
+
+    def pause(self, seconds: float) -> None:
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    def is_idle(self) -> bool:
+        return self.delay() == 0 and self.tokens >= self.capacity
@@ -23,6 +23,15 @@ class StateService(interface.IStateService):
         state = await self.state_repo.state_by_account_id(account_id)
         return state
 
+    @traced_method()
+    async def states_by_account_ids(self, account_ids: list[int]) -> list[model.UserState]:
+        states = await self.state_repo.states_by_account_ids(account_ids)
+        return states
+
+    @traced_method()
+    async def disable_alerts_by_state_ids(self, state_ids: list[int]) -> None:
+        await self.state_repo.disable_alerts_by_state_ids(state_ids)
+
     @traced_method()
     async def change_user_state(
             self,
@@ -75,4 +84,19 @@ class StateService(interface.IStateService):
             state_id,
             publication_id
         )
-        return alert_id
\ No newline at end of file
+        return alert_id
+
+    @traced_method()
+    async def create_vizard_video_cut_alerts(self, alerts: list[tuple[int, str, int]]) -> list[int]:
+        alert_ids = await self.state_repo.create_vizard_video_cut_alerts(alerts)
+        return alert_ids
+
+    @traced_method()
+    async def create_publication_approved_alerts(self, alerts: list[tuple[int, int]]) -> list[int]:
+        alert_ids = await self.state_repo.create_publication_approved_alerts(alerts)
+        return alert_ids
+
+    @traced_method()
+    async def create_publication_rejected_alerts(self, alerts: list[tuple[int, int]]) -> list[int]:
+        alert_ids = await self.state_repo.create_publication_rejected_alerts(alerts)
+        return alert_ids
@@ -0,0 +1,145 @@
+import asyncio
+import traceback
+import uuid
+
+from internal import interface, common
+
+
+class TelethonGateway(interface.ITelethonGateway):
+    """
+    Единственный владелец пользовательской сессии Telethon среди воркеров и реплик.
+    Владелец выбирается арендой ключа в Redis; остальные процессы отправляют ему запросы
+    через список Redis и ждут ответ, а методы Bot API выполняют сами.
+    """
+
+    OWNER_KEY = "telethon:owner"
+    REQUESTS_KEY = "telethon:requests"
+    OWNER_METHODS = ("get_channel_posts", "download_emoji_pack")
+
+    def __init__(
+            self,
+            tel: interface.ITelemetry,
+            telegram_client: interface.ITelegramClient,
+            redis: interface.IRedis,
+            owner_ttl: int,
+            request_timeout: float,
+    ):
+        self.tracer = tel.tracer()
+        self.meter = tel.meter()
+        self.logger = tel.logger()
+
+        self.telegram_client = telegram_client
+        self.redis = redis
+        self.owner_ttl = owner_ttl
+        self.request_timeout = request_timeout
+
+        self._token = uuid.uuid4().hex
+        self._is_owner = False
+        self._task: asyncio.Task | None = None
+        self._handling: set[asyncio.Task] = set()
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+        if self._is_owner:
+            self._is_owner = False
+            try:
+                await self.redis.delete_if_equals(self.OWNER_KEY, self._token)
+            except Exception as err:
+                self.logger.warning("Не удалось освободить сессию Telethon", {common.ERROR_KEY: str(err)})
+
+    async def send_text_message(self, channel_id: str | int, text: str, parse_mode: str = None) -> str:
+        return await self.telegram_client.send_text_message(channel_id, text)
+
+    async def send_photo(self, channel_id: str | int, photo: bytes, caption: str = None, parse_mode: str = None) -> str:
+        return await self.telegram_client.send_photo(channel_id, photo, caption)
+
+    async def check_permission(self, channel_id: str | int) -> bool:
+        return await self.telegram_client.check_permission(channel_id)
+
+    async def get_channel_posts(self, channel_id: str, limit: int = None) -> list[dict]:
+        return await self._call("get_channel_posts", channel_id=channel_id, limit=limit)
+
+    async def download_emoji_pack(self):
+        return await self._call("download_emoji_pack")
+
+    async def _call(self, method: str, **kwargs):
+        if self._is_owner:
+            return await getattr(self.telegram_client, method)(**kwargs)
+
+        request_id = uuid.uuid4().hex
+        await self.redis.push(
+            self.REQUESTS_KEY,
+            {"id": request_id, "method": method, "kwargs": kwargs},
+            ttl=int(self.request_timeout),
+        )
+
+        response = await self.redis.pop(self._response_key(request_id), timeout=self.request_timeout)
+        if response is None:
+            raise TimeoutError(f"Владелец сессии Telethon не ответил на {method} за {self.request_timeout}с")
+        if "error" in response:
+            raise Exception(response["error"])
+
+        return response["result"]
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self._elect()
+                if self._is_owner:
+                    await self._serve_one()
+                else:
+                    await asyncio.sleep(self.owner_ttl / 3)
+            except asyncio.CancelledError:
+                raise
+            except Exception as err:
+                self.logger.warning("Ошибка цикла владельца сессии Telethon", {common.ERROR_KEY: str(err)})
+                await asyncio.sleep(1)
+
+    async def _elect(self) -> None:
+        if self._is_owner:
+            self._is_owner = await self.redis.expire_if_equals(self.OWNER_KEY, self._token, self.owner_ttl)
+            if not self._is_owner:
+                self.logger.warning("Аренда сессии Telethon потеряна")
+            return
+
+        self._is_owner = await self.redis.set_nx(self.OWNER_KEY, self._token, ttl=self.owner_ttl)
+        if self._is_owner:
+            self.logger.info("Процесс стал владельцем сессии Telethon")
+
+    async def _serve_one(self) -> None:
+        # Ожидание короче аренды, чтобы продлевать ее между запросами
+        request = await self.redis.pop(self.REQUESTS_KEY, timeout=self.owner_ttl / 3)
+        if request is None:
+            return
+
+        # Запросы выполняются параллельно, чтобы долгий канал не задерживал остальных
+        handling = asyncio.create_task(self._handle(request))
+        self._handling.add(handling)
+        handling.add_done_callback(self._handling.discard)
+
+    async def _handle(self, request: dict) -> None:
+        if request["method"] not in self.OWNER_METHODS:
+            response = {"error": f"Неизвестный метод {request['method']}"}
+        else:
+            try:
+                result = await getattr(self.telegram_client, request["method"])(**request["kwargs"])
+                response = {"result": result}
+            except Exception as err:
+                self.logger.error(
+                    "Ошибка запроса к сессии Telethon",
+                    {common.ERROR_KEY: str(err), common.TRACEBACK_KEY: traceback.format_exc()}
+                )
+                response = {"error": str(err)}
+
+        await self.redis.push(self._response_key(request["id"]), response, ttl=int(self.request_timeout))
+
+    @staticmethod
+    def _response_key(request_id: str) -> str:
+        return f"telethon:response:{request_id}"
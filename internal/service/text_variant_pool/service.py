@@ -0,0 +1,192 @@
+import asyncio
+import hashlib
+import time
+from typing import Callable, Awaitable
+
+from internal import model, interface, common
+
+
+class TextVariantPool(interface.ITextVariantPool):
+    """
+    Пул заранее сгенерированных вариантов текста публикации для мгновенной "перегенерации".
+    Варианты генерируются в фоне после показа текста, с лимитом трат на организацию.
+    """
+
+    def __init__(
+            self,
+            tel: interface.ITelemetry,
+            pool_size: int,
+            ttl: int,
+            organization_budget_rub: float,
+            # Стоимость одного варианта: ответы генерации текста не сообщают фактическую цену
+            variant_rub_cost: float,
+            budget_window: int = 3600,
+    ):
+        self.tracer = tel.tracer()
+        self.meter = tel.meter()
+        self.logger = tel.logger()
+
+        self.pool_size = pool_size
+        self.ttl = ttl
+        self.organization_budget_rub = organization_budget_rub
+        self.variant_rub_cost = variant_rub_cost
+        self.budget_window = budget_window
+
+        self._pools: dict[str, model.TextVariantPoolEntry] = {}
+        self._organization_spend: dict[int, tuple[float, float]] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+        self.hit_counter = self.meter.create_counter(
+            name=common.TEXT_VARIANT_POOL_HIT_KEY,
+            description="Перегенерации, обслуженные из пула вариантов",
+        )
+        self.miss_counter = self.meter.create_counter(
+            name=common.TEXT_VARIANT_POOL_MISS_KEY,
+            description="Перегенерации, ушедшие в синхронный запрос к LLM",
+        )
+        self.generated_counter = self.meter.create_counter(
+            name=common.TEXT_VARIANT_POOL_GENERATED_KEY,
+            description="Варианты текста, сгенерированные в фоне",
+        )
+        self.wasted_cost_counter = self.meter.create_counter(
+            name=common.TEXT_VARIANT_POOL_WASTED_COST_KEY,
+            unit="rub",
+            description="Стоимость вариантов текста, которые не были показаны",
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.pool_size > 0
+
+    def take(self, pool_key: str, base_text: str) -> str | None:
+        if not self.enabled:
+            return None
+
+        entry = self._pools.get(pool_key)
+        if entry is None:
+            return None
+
+        self._expire_variants(entry)
+
+        # Текст изменился не через пул (ручное редактирование, перегенерация с промптом)
+        if self._hash(base_text) not in entry.base_hashes:
+            self.discard(pool_key)
+            self.miss_counter.add(1, {common.TEXT_VARIANT_POOL_SCOPE_KEY: entry.scope})
+            return None
+
+        if not entry.variants:
+            self.miss_counter.add(1, {common.TEXT_VARIANT_POOL_SCOPE_KEY: entry.scope})
+            return None
+
+        variant = entry.variants.pop(0)
+        entry.base_hashes.add(self._hash(variant.text))
+        self.hit_counter.add(1, {common.TEXT_VARIANT_POOL_SCOPE_KEY: entry.scope})
+
+        return variant.text
+
+    def prefill(
+            self,
+            pool_key: str,
+            base_text: str,
+            organization_id: int,
+            scope: str,
+            generate: Callable[[], Awaitable[str]],
+    ) -> None:
+        if not self.enabled:
+            return
+
+        self._expire_pools()
+
+        entry = self._pools.get(pool_key)
+        if entry is not None and self._hash(base_text) not in entry.base_hashes:
+            self.discard(pool_key)
+            entry = None
+
+        if entry is None:
+            entry = model.TextVariantPoolEntry(
+                organization_id=organization_id,
+                scope=scope,
+                base_hashes={self._hash(base_text)},
+            )
+            self._pools[pool_key] = entry
+
+        missing = self.pool_size - len(entry.variants) - entry.in_flight
+        for _ in range(missing):
+            if not self._reserve_budget(organization_id):
+                self.logger.info("Бюджет организации на варианты текста исчерпан")
+                break
+
+            entry.in_flight += 1
+            task = asyncio.create_task(self._generate_variant(pool_key, entry, generate))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    def discard(self, pool_key: str) -> None:
+        entry = self._pools.pop(pool_key, None)
+        if entry is None:
+            return
+
+        self._count_wasted(entry, len(entry.variants))
+        entry.variants.clear()
+
+    async def _generate_variant(
+            self,
+            pool_key: str,
+            entry: model.TextVariantPoolEntry,
+            generate: Callable[[], Awaitable[str]],
+    ) -> None:
+        try:
+            text = await generate()
+        except Exception as err:
+            self.logger.warning("Не удалось сгенерировать вариант текста", {common.ERROR_KEY: str(err)})
+            return
+        finally:
+            entry.in_flight -= 1
+
+        self.generated_counter.add(1, {common.TEXT_VARIANT_POOL_SCOPE_KEY: entry.scope})
+
+        # Пул сброшен, пока вариант генерировался
+        if self._pools.get(pool_key) is not entry:
+            self._count_wasted(entry, 1)
+            return
+
+        entry.variants.append(model.TextVariant(text=text, created_at=time.monotonic()))
+
+    def _reserve_budget(self, organization_id: int) -> bool:
+        now = time.monotonic()
+        window_started_at, spent = self._organization_spend.get(organization_id, (now, 0.0))
+
+        if now - window_started_at > self.budget_window:
+            window_started_at, spent = now, 0.0
+
+        if spent + self.variant_rub_cost > self.organization_budget_rub:
+            return False
+
+        self._organization_spend[organization_id] = (window_started_at, spent + self.variant_rub_cost)
+        return True
+
+    def _expire_variants(self, entry: model.TextVariantPoolEntry) -> None:
+        deadline = time.monotonic() - self.ttl
+        fresh_variants = [variant for variant in entry.variants if variant.created_at > deadline]
+
+        self._count_wasted(entry, len(entry.variants) - len(fresh_variants))
+        entry.variants = fresh_variants
+
+    def _expire_pools(self) -> None:
+        for pool_key, entry in list(self._pools.items()):
+            self._expire_variants(entry)
+            if not entry.variants and entry.in_flight == 0:
+                del self._pools[pool_key]
+
+    def _count_wasted(self, entry: model.TextVariantPoolEntry, variants_count: int) -> None:
+        if variants_count <= 0:
+            return
+
+        self.wasted_cost_counter.add(
+            variants_count * self.variant_rub_cost,
+            {common.TEXT_VARIANT_POOL_SCOPE_KEY: entry.scope}
+        )
+
+    @staticmethod
+    def _hash(text: str) -> str:
+        return hashlib.sha1(text.encode()).hexdigest()
@@ -0,0 +1,68 @@
+from internal import interface, common
+
+
+class TranscriptCache(interface.ITranscriptCache):
+    """
+    Кэш расшифровок аудио по file_unique_id Telegram.
+    Одно и то же голосовое, пересланное или процитированное повторно, расшифровывается и оплачивается один раз.
+    """
+
+    def __init__(
+            self,
+            tel: interface.ITelemetry,
+            redis: interface.IRedis,
+            ttl: int,
+            rub_cost_per_minute: float,
+    ):
+        self.tracer = tel.tracer()
+        self.meter = tel.meter()
+        self.logger = tel.logger()
+
+        self.redis = redis
+        self.ttl = ttl
+        self.rub_cost_per_minute = rub_cost_per_minute
+
+        self.hit_counter = self.meter.create_counter(
+            name=common.TRANSCRIPT_CACHE_HIT_KEY,
+            description="Расшифровки аудио, найденные в кэше",
+        )
+        self.miss_counter = self.meter.create_counter(
+            name=common.TRANSCRIPT_CACHE_MISS_KEY,
+            description="Расшифровки аудио, отправленные в loom-content",
+        )
+        self.saved_audio_counter = self.meter.create_counter(
+            name=common.TRANSCRIPT_CACHE_SAVED_AUDIO_KEY,
+            unit="s",
+            description="Секунды аудио, которые не пришлось расшифровывать повторно",
+        )
+        self.saved_cost_counter = self.meter.create_counter(
+            name=common.TRANSCRIPT_CACHE_SAVED_COST_KEY,
+            unit="rub",
+            description="Сэкономленная стоимость повторных расшифровок",
+        )
+
+    async def get(self, file_unique_id: str, duration: int) -> str | None:
+        cached = await self.redis.get(self._key(file_unique_id))
+        if not cached:
+            self.miss_counter.add(1)
+            return None
+
+        self.hit_counter.add(1)
+        self.saved_audio_counter.add(duration)
+        self.saved_cost_counter.add(duration / 60 * self.rub_cost_per_minute)
+
+        return cached["text"]
+
+    async def set(self, file_unique_id: str, text: str) -> None:
+        # Пустые расшифровки не кэшируем, чтобы не закрепить неудачный результат
+        if not text:
+            return
+
+        try:
+            await self.redis.set(self._key(file_unique_id), {"text": text}, ttl=self.ttl)
+        except Exception as err:
+            self.logger.warning("Не удалось сохранить расшифровку в кэш", {common.ERROR_KEY: str(err)})
+
+    @staticmethod
+    def _key(file_unique_id: str) -> str:
+        return f"transcript:{file_unique_id}"
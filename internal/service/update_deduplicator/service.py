@@ -0,0 +1,77 @@
+from collections import deque
+
+from internal import interface, common
+
+
+class UpdateDeduplicator(interface.IUpdateDeduplicator):
+    """
+    Отсекает повторные доставки вебхука Telegram по update_id до диспетчера.
+    С Redis дедупликация общая для всех инстансов, без него - кольцевой буфер в памяти процесса.
+    """
+
+    def __init__(
+            self,
+            tel: interface.ITelemetry,
+            redis: interface.IRedis | None,
+            ttl: int,
+            ring_size: int,
+    ):
+        self.tracer = tel.tracer()
+        self.meter = tel.meter()
+        self.logger = tel.logger()
+
+        self.redis = redis
+        self.ttl = ttl
+
+        self._ring: deque[int] = deque(maxlen=ring_size)
+        self._seen: set[int] = set()
+
+        self.duplicate_counter = self.meter.create_counter(
+            name=common.UPDATE_DUPLICATE_KEY,
+            description="Повторные доставки обновлений Telegram, отброшенные до обработки",
+        )
+
+    async def is_duplicate(self, update_id: int) -> bool:
+        if self.redis:
+            is_duplicate = await self._is_duplicate_redis(update_id)
+        else:
+            is_duplicate = self._is_duplicate_memory(update_id)
+
+        if is_duplicate:
+            self.duplicate_counter.add(1)
+            self.logger.info("Повторная доставка обновления отброшена", {"update_id": update_id})
+
+        return is_duplicate
+
+    async def forget(self, update_id: int) -> None:
+        # Обновление не было принято в обработку, повторная доставка Telegram должна пройти
+        self._seen.discard(update_id)
+
+        if self.redis:
+            try:
+                await self.redis.delete(self._key(update_id))
+            except Exception as err:
+                self.logger.warning("Не удалось удалить update_id из Redis", {common.ERROR_KEY: str(err)})
+
+    async def _is_duplicate_redis(self, update_id: int) -> bool:
+        try:
+            return not await self.redis.set_nx(self._key(update_id), 1, ttl=self.ttl)
+        except Exception as err:
+            # Недоступность Redis не должна останавливать прием обновлений
+            self.logger.warning("Не удалось проверить update_id в Redis", {common.ERROR_KEY: str(err)})
+            return self._is_duplicate_memory(update_id)
+
+    def _is_duplicate_memory(self, update_id: int) -> bool:
+        if update_id in self._seen:
+            return True
+
+        if len(self._ring) == self._ring.maxlen:
+            self._seen.discard(self._ring[0])
+
+        self._ring.append(update_id)
+        self._seen.add(update_id)
+        return False
+
+    @staticmethod
+    def _key(update_id: int) -> str:
+        return f"tg_update:{update_id}"
@@ -0,0 +1,86 @@
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from typing import AsyncIterator
+
+from internal import interface
+from pkg.trace_wrapper.trace_wrapper import update_steps
+
+
+class UpdateProfiler(interface.IUpdateProfiler):
+    """
+    Профиль задержек последних обновлений каждого чата в памяти процесса.
+    На время обновления в контекст кладется список шагов; в него пишут traced_method,
+    хранилище FSM, блокировка чата и запросы Bot API. Готовый водопад шагов попадает
+    в кольцевой буфер чата, чаты вытесняются по давности последнего обновления.
+    """
+
+    def __init__(self, updates_per_chat: int, max_chats: int):
+        self.updates_per_chat = updates_per_chat
+        self.max_chats = max_chats
+
+        self._chats: OrderedDict[int, deque[dict]] = OrderedDict()
+
+    @asynccontextmanager
+    async def profile(self, chat_id: int, update_id: int, event_type: str) -> AsyncIterator[None]:
+        steps = []
+        token = update_steps.set(steps)
+        started_at = time.perf_counter()
+        at = time.time()
+        error = False
+        try:
+            yield
+        except Exception:
+            error = True
+            raise
+        finally:
+            finished_at = time.perf_counter()
+            update_steps.reset(token)
+            # Фоновые задачи обновления могут дописывать в список и после выхода - сохраняем копию
+            self._store(chat_id, {
+                "update_id": update_id,
+                "event_type": event_type,
+                "at": datetime.fromtimestamp(at, timezone.utc).isoformat(),
+                "duration_ms": round((finished_at - started_at) * 1000, 2),
+                "error": error,
+                "steps": steps[:],
+                "started_at": started_at,
+            })
+
+    def updates(self, chat_id: int, limit: int) -> list[dict]:
+        records = list(self._chats.get(chat_id, ()))[-limit:]
+        return [self._waterfall(record) for record in reversed(records)]
+
+    def _store(self, chat_id: int, record: dict) -> None:
+        chat_updates = self._chats.get(chat_id)
+        if chat_updates is None:
+            chat_updates = deque(maxlen=self.updates_per_chat)
+            self._chats[chat_id] = chat_updates
+            if len(self._chats) > self.max_chats:
+                self._chats.popitem(last=False)
+        else:
+            self._chats.move_to_end(chat_id)
+        chat_updates.append(record)
+
+    @staticmethod
+    def _waterfall(record: dict) -> dict:
+        base = record["started_at"]
+        steps = sorted(record["steps"], key=lambda step: step[2])
+        return {
+            "update_id": record["update_id"],
+            "event_type": record["event_type"],
+            "at": record["at"],
+            "duration_ms": record["duration_ms"],
+            "error": record["error"],
+            "steps": [
+                {
+                    "name": name,
+                    "kind": kind,
+                    "start_ms": round((started_at - base) * 1000, 2),
+                    "duration_ms": round((finished_at - started_at) * 1000, 2),
+                    "error": error,
+                }
+                for name, kind, started_at, finished_at, error in steps
+            ],
+        }
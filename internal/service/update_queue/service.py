@@ -0,0 +1,175 @@
+import asyncio
+import contextvars
+import time
+import traceback
+from collections import deque
+from typing import Callable, Awaitable, Any, Iterable
+
+from aiogram.types import Update
+from opentelemetry.metrics import CallbackOptions, Observation
+
+from internal import model, interface, common
+
+
+class UpdateQueue(interface.IUpdateQueue):
+    """
+    Очередь входящих обновлений Telegram: вебхук отвечает сразу, обработка идет в пуле воркеров.
+    Обновления одного чата обрабатываются строго по порядку, разные чаты - параллельно.
+    """
+
+    def __init__(
+            self,
+            tel: interface.ITelemetry,
+            handle: Callable[[Update], Awaitable[Any]],
+            workers_count: int,
+            max_size: int,
+            put_timeout: float,
+            drain_timeout: float,
+    ):
+        self.tracer = tel.tracer()
+        self.meter = tel.meter()
+        self.logger = tel.logger()
+
+        self.handle = handle
+        self.workers_count = workers_count
+        self.put_timeout = put_timeout
+        self.drain_timeout = drain_timeout
+
+        # Чат есть в _chats, пока его обновления ждут воркера или обрабатываются
+        self._chats: dict[int, deque[model.QueuedUpdate]] = {}
+        self._ready: asyncio.Queue[int] = asyncio.Queue()
+        self._slots = asyncio.Semaphore(max_size)
+        self._workers: list[asyncio.Task] = []
+        self._accepting = False
+        # Все ожидающие обновления в порядке приема и время приема самого старого из них.
+        # Меняются только в цикле событий; метрика читает одно число из потока экспорта OTel
+        self._waiting: deque[model.QueuedUpdate] = deque()
+        self._oldest_enqueued_at: float | None = None
+
+        self.depth_counter = self.meter.create_up_down_counter(
+            name=common.UPDATE_QUEUE_DEPTH_KEY,
+            description="Обновления, ожидающие обработки",
+        )
+        self.lag_histogram = self.meter.create_histogram(
+            name=common.UPDATE_QUEUE_LAG_KEY,
+            unit="s",
+            description="Время от приема вебхука до начала обработки обновления",
+        )
+        self.rejected_counter = self.meter.create_counter(
+            name=common.UPDATE_QUEUE_REJECTED_KEY,
+            description="Обновления, отклоненные из-за переполнения очереди",
+        )
+        self.meter.create_observable_gauge(
+            name=common.UPDATE_QUEUE_MAX_CHAT_LAG_KEY,
+            callbacks=[self._observe_max_chat_lag],
+            unit="s",
+            description="Возраст самого старого необработанного обновления среди чатов",
+        )
+
+    async def put(self, update: Update) -> bool:
+        if not self._accepting:
+            return False
+
+        # Backpressure: при переполнении вебхук ждет, а затем отвечает ошибкой, и Telegram повторит доставку
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=self.put_timeout)
+        except asyncio.TimeoutError:
+            self.rejected_counter.add(1)
+            self.logger.warning("Очередь обновлений переполнена")
+            return False
+
+        queued = model.QueuedUpdate(
+            update=update,
+            chat_id=self._chat_id(update),
+            enqueued_at=time.monotonic(),
+            context=contextvars.copy_context(),
+        )
+
+        pending = self._chats.get(queued.chat_id)
+        if pending is None:
+            self._chats[queued.chat_id] = deque([queued])
+            self._ready.put_nowait(queued.chat_id)
+        else:
+            pending.append(queued)
+
+        self._waiting.append(queued)
+        if self._oldest_enqueued_at is None:
+            self._oldest_enqueued_at = queued.enqueued_at
+
+        self.depth_counter.add(1)
+        return True
+
+    async def start(self) -> None:
+        self._accepting = True
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.workers_count)]
+        self.logger.info("Очередь обновлений запущена", {"workers_count": self.workers_count})
+
+    async def stop(self) -> None:
+        self._accepting = False
+
+        try:
+            await asyncio.wait_for(self._ready.join(), timeout=self.drain_timeout)
+        except asyncio.TimeoutError:
+            self.logger.warning(
+                "Очередь обновлений не успела опустеть до остановки",
+                {"pending_chats": len(self._chats)}
+            )
+
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def _worker(self) -> None:
+        while True:
+            chat_id = await self._ready.get()
+            pending = self._chats[chat_id]
+            try:
+                queued = pending.popleft()
+                self._mark_taken(queued)
+                self._slots.release()
+                self.depth_counter.add(-1)
+                self.lag_histogram.record(time.monotonic() - queued.enqueued_at)
+
+                await self._process(queued)
+            finally:
+                # Следующее обновление чата встает в конец, чтобы не задерживать остальные чаты
+                if pending:
+                    self._ready.put_nowait(chat_id)
+                else:
+                    del self._chats[chat_id]
+                self._ready.task_done()
+
+    async def _process(self, queued: model.QueuedUpdate) -> None:
+        try:
+            # Контекст запроса вебхука сохраняет трейс и лог-контекст для обработчиков
+            await asyncio.create_task(self.handle(queued.update), context=queued.context)
+        except Exception as err:
+            self.logger.error(
+                "Ошибка обработки обновления из очереди",
+                {common.ERROR_KEY: str(err), common.TRACEBACK_KEY: traceback.format_exc()}
+            )
+
+    def _mark_taken(self, queued: model.QueuedUpdate) -> None:
+        queued.taken = True
+        while self._waiting and self._waiting[0].taken:
+            self._waiting.popleft()
+        self._oldest_enqueued_at = self._waiting[0].enqueued_at if self._waiting else None
+
+    def _observe_max_chat_lag(self, options: CallbackOptions) -> Iterable[Observation]:
+        # Вызывается в потоке экспорта метрик: словарь чатов и очереди не читаются
+        oldest_enqueued_at = self._oldest_enqueued_at
+        max_lag = time.monotonic() - oldest_enqueued_at if oldest_enqueued_at is not None else 0
+        yield Observation(max_lag)
+
+    @staticmethod
+    def _chat_id(update: Update) -> int:
+        if update.message:
+            return update.message.chat.id
+
+        if update.callback_query:
+            if update.callback_query.message:
+                return update.callback_query.message.chat.id
+            return update.callback_query.from_user.id
+
+        return 0
@@ -0,0 +1,76 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable
+
+from internal import interface, common
+
+
+class Warmup(interface.IWarmup):
+    """
+    Прогрев процесса после старта. Сборка диалогов и первые соединения с PG, Redis, сервисами Loom,
+    Anthropic и Bot API идут параллельно в фоновой задаче, и первый запрос пользователя не платит
+    за создание пулов и TLS-рукопожатия. До конца прогрева ready() - False, /health отвечает 503.
+    Упавший шаг не держит готовность: соединение откроется при первом запросе, как без прогрева.
+    """
+
+    def __init__(
+            self,
+            tel: interface.ITelemetry,
+            # Шаги прогрева по имени: корутинная функция без аргументов
+            steps: dict[str, Callable[[], Awaitable[Any]]],
+            timeout: float,
+    ):
+        self.logger = tel.logger()
+
+        self.steps = steps
+        self.timeout = timeout
+
+        self._task: asyncio.Task | None = None
+        self._ready = False
+        self._results: dict[str, dict] = {}
+        self._duration: float | None = None
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task and not self._task.done():
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+    def ready(self) -> bool:
+        return self._ready
+
+    def report(self) -> dict:
+        return {
+            "ready": self._ready,
+            "duration_ms": self._duration,
+            "steps": dict(self._results),
+        }
+
+    async def _run(self) -> None:
+        started_at = time.perf_counter()
+        await asyncio.gather(*(self._step(name, step) for name, step in self.steps.items()))
+        self._duration = round((time.perf_counter() - started_at) * 1000, 1)
+        self._ready = True
+
+        failed = [name for name, result in self._results.items() if result["error"]]
+        self.logger.info("Прогрев завершен", {
+            "duration_ms": self._duration,
+            "failed_steps": ",".join(failed),
+            **{f"{name}_ms": result["duration_ms"] for name, result in self._results.items()},
+        })
+
+    async def _step(self, name: str, step: Callable[[], Awaitable[Any]]) -> None:
+        started_at = time.perf_counter()
+        error = None
+        try:
+            await asyncio.wait_for(step(), timeout=self.timeout)
+        except Exception as err:
+            error = str(err) or err.__class__.__name__
+            self.logger.warning(f"Шаг прогрева {name} не выполнен", {common.ERROR_KEY: error})
+
+        self._results[name] = {
+            "duration_ms": round((time.perf_counter() - started_at) * 1000, 1),
+            "error": error,
+        }
@@ -1,13 +1,17 @@
+import os
 from contextvars import ContextVar
+from functools import partial
 
 import uvicorn
 from aiogram import Bot, Dispatcher
+from aiogram.client.telegram import TelegramAPIServer
 import redis.asyncio as redis
 from aiogram.fsm.storage.base import DefaultKeyBuilder
-from aiogram.fsm.storage.redis import RedisStorage
 from sulguk import AiogramSulgukMiddleware
 
 from infrastructure.pg.pg import PG
+from infrastructure.redis_client.redis_client import RedisClient
+from infrastructure.fsm_storage.fsm_storage import BatchedRedisStorage
 from infrastructure.telemetry.telemetry import Telemetry, AlertManager
 
 from pkg.client.internal.loom_account.client import LoomAccountClient
@@ -17,6 +21,7 @@ from pkg.client.internal.loom_organization.client import LoomOrganizationClient
 from pkg.client.internal.loom_content.client import LoomContentClient
 from pkg.client.external.claude.client import AnthropicClient
 from pkg.client.external.telegram.client import LTelegramClient
+from pkg.log_wrapper import configure_auto_log
 
 from internal.controller.http.middlerware.middleware import HttpMiddleware
 from internal.controller.tg.middleware.middleware import TgMiddleware
@@ -45,6 +50,20 @@ from internal.dialog.brief.update_category.dialog import UpdateCategoryDialog
 from internal.dialog.brief.update_organization.dialog import UpdateOrganizationDialog
 
 from internal.service.state.service import StateService
+from internal.service.text_variant_pool.service import TextVariantPool
+from internal.service.transcript_cache.service import TranscriptCache
+from internal.service.update_queue.service import UpdateQueue
+from internal.service.update_deduplicator.service import UpdateDeduplicator
+from internal.service.callback_lock.service import CallbackLock
+from internal.service.send_scheduler.service import SendScheduler
+from internal.service.chat_lock.service import ChatLock
+from internal.service.telethon_gateway.service import TelethonGateway
+from internal.service.chat_router.service import ChatRouter
+from internal.service.loop_monitor.service import LoopMonitor
+from internal.service.update_profiler.service import UpdateProfiler
+from internal.service.sampling_profiler.service import SamplingProfiler
+from internal.service.dialog_registry.service import LazyDialogRegistry
+from internal.service.warmup.service import Warmup
 from internal.dialog.intro.service import IntroService
 from internal.dialog.main_menu.service import MainMenuService
 from internal.dialog.organization.organization_menu.service import OrganizationMenuService
@@ -98,6 +117,7 @@ from internal.app.tg.app import NewTg
 from internal.app.server.app import NewServer
 
 from internal.config.config import Config
+from internal import common
 
 cfg = Config()
 
@@ -111,11 +131,16 @@ alert_manager = AlertManager(
     cfg.monitoring_redis_host,
     cfg.monitoring_redis_port,
     cfg.monitoring_redis_db,
-    cfg.monitoring_redis_password
+    cfg.monitoring_redis_password,
+    queue_size=cfg.alert_queue_size,
+    digest_window=cfg.alert_digest_window,
+    dedup_ttl=cfg.alert_dedup_ttl,
 )
 
 log_context: ContextVar[dict] = ContextVar('log_context', default={})
 
+configure_auto_log(cfg.auto_log_mode, cfg.auto_log_sample_ratio, cfg.auto_log_slow_threshold)
+
 tel = Telemetry(
     cfg.log_level,
     cfg.root_path,
@@ -125,7 +150,9 @@ tel = Telemetry(
     cfg.otlp_host,
     cfg.otlp_port,
     log_context,
-    alert_manager
+    alert_manager,
+    cfg.trace_sample_ratio,
+    cfg.trace_max_attribute_length,
 )
 
 redis_client = redis.Redis(
@@ -135,28 +162,83 @@ redis_client = redis.Redis(
     db=2
 )
 key_builder = DefaultKeyBuilder(with_destiny=True)
-storage = RedisStorage(
+storage = BatchedRedisStorage(
+    tel,
     redis=redis_client,
     key_builder=key_builder
 )
+send_priority: ContextVar[common.SendPriority] = ContextVar('send_priority', default=common.SendPriority.INTERACTIVE)
+send_scheduler = SendScheduler(
+    tel,
+    send_priority,
+    # Общий лимит бота делится между воркерами, у каждого свой планировщик
+    cfg.send_global_rate / cfg.http_workers,
+    cfg.send_chat_rate,
+    cfg.send_chat_burst,
+)
+
 dp = Dispatcher(storage=storage)
 bot = Bot(token=cfg.tg_bot_token)
 bot.session.middleware(AiogramSulgukMiddleware())
+bot.session.middleware(send_scheduler)
+alert_manager.bot.session.middleware(send_scheduler)
 
 # Инициализация клиентов
 db = PG(tel, cfg.db_user, cfg.db_pass, cfg.db_host, cfg.db_port, cfg.db_name)
-loom_account_client = LoomAccountClient(tel, cfg.loom_account_host, cfg.loom_account_port, log_context)
-loom_authorization_client = LoomAuthorizationClient(tel, cfg.loom_authorization_host,
-                                                    cfg.loom_authorization_port, log_context)
-loom_employee_client = LoomEmployeeClient(tel, cfg.loom_employee_host, cfg.loom_employee_port, log_context)
+shared_state_redis = RedisClient(
+    cfg.monitoring_redis_host,
+    cfg.monitoring_redis_port,
+    cfg.shared_state_redis_db,
+    cfg.monitoring_redis_password,
+) if cfg.multi_instance else None
+
+loom_account_client = LoomAccountClient(
+    tel,
+    cfg.loom_account_host,
+    cfg.loom_account_port,
+    log_context,
+    cfg.loom_circuit_breaker_enabled,
+    shared_state_redis,
+)
+loom_authorization_client = LoomAuthorizationClient(
+    tel,
+    cfg.loom_authorization_host,
+    cfg.loom_authorization_port,
+    log_context,
+    cfg.loom_circuit_breaker_enabled,
+    shared_state_redis,
+)
+loom_employee_client = LoomEmployeeClient(
+    tel,
+    cfg.loom_employee_host,
+    cfg.loom_employee_port,
+    log_context,
+    cfg.loom_circuit_breaker_enabled,
+    shared_state_redis,
+)
 loom_organization_client = LoomOrganizationClient(
     tel,
     cfg.loom_organization_host,
     cfg.loom_organization_port,
     cfg.interserver_secret_key,
-    log_context
+    log_context,
+    cfg.loom_circuit_breaker_enabled,
+    shared_state_redis,
+)
+loom_content_client = LoomContentClient(
+    tel,
+    cfg.loom_content_host,
+    cfg.loom_content_port,
+    log_context,
+    cfg.loom_circuit_breaker_enabled,
+    shared_state_redis,
+)
+transcript_cache_redis = RedisClient(
+    cfg.monitoring_redis_host,
+    cfg.monitoring_redis_port,
+    cfg.transcript_cache_redis_db,
+    cfg.monitoring_redis_password,
 )
-loom_content_client = LoomContentClient(tel, cfg.loom_content_host, cfg.loom_content_port, log_context)
 anthropic_client = AnthropicClient(
     tel,
     cfg.anthropic_api_key,
@@ -168,10 +250,44 @@ telegram_client = LTelegramClient(
     cfg.tg_api_id,
     cfg.tg_api_hash
 )
+telegram_client.bot.session.middleware(send_scheduler)
+
+if cfg.tg_bot_api_url:
+    # Все боты процесса, включая бота алертов, ходят в один сервер Bot API
+    tg_api_server = TelegramAPIServer.from_base(cfg.tg_bot_api_url)
+    for tg_bot in (bot, alert_manager.bot, telegram_client.bot):
+        tg_bot.session.api = tg_api_server
+
+telethon_gateway = None
+chat_lock = None
+if cfg.multi_instance:
+    telethon_gateway = TelethonGateway(
+        tel,
+        telegram_client,
+        shared_state_redis,
+        cfg.telethon_owner_ttl,
+        cfg.telethon_request_timeout,
+    )
+    telegram_client = telethon_gateway
+
+    chat_lock = ChatLock(
+        tel,
+        shared_state_redis,
+        cfg.chat_lock_ttl,
+        cfg.chat_lock_wait_timeout,
+    )
 
 state_repo = StateRepo(tel, db)
 llm_chat_repo = LLMChatRepo(tel, db)
 
+text_variant_pool = TextVariantPool(
+    tel,
+    cfg.text_variant_pool_size,
+    cfg.text_variant_pool_ttl,
+    cfg.text_variant_pool_organization_budget_rub,
+    cfg.text_variant_pool_variant_rub_cost,
+)
+
 # Инициализация геттеров
 intro_getter = IntroGetter(
     tel,
@@ -213,6 +329,7 @@ moderation_publication_getter = ModerationPublicationGetter(
     loom_employee_client,
     loom_content_client,
     cfg.domain,
+    text_variant_pool,
 )
 
 video_cut_moderation_getter = VideoCutModerationGetter(
@@ -258,6 +375,7 @@ draft_publication_getter = DraftPublicationGetter(
     loom_employee_client,
     loom_content_client,
     cfg.domain,
+    text_variant_pool,
 )
 
 add_employee_getter = AddEmployeeGetter(
@@ -327,6 +445,12 @@ update_organization_getter = UpdateOrganizationGetter(
 
 # Инициализация сервисов
 state_service = StateService(tel, state_repo)
+transcript_cache = TranscriptCache(
+    tel,
+    transcript_cache_redis,
+    cfg.transcript_cache_ttl,
+    cfg.transcript_rub_cost_per_minute,
+)
 intro_service = IntroService(
     tel,
     state_repo,
@@ -339,6 +463,7 @@ main_menu_service = MainMenuService(
     bot,
     state_repo,
     loom_content_client,
+    transcript_cache,
 )
 organization_menu_service = OrganizationMenuService(
     tel,
@@ -376,7 +501,10 @@ generate_publication_service = GeneratePublicationService(
     llm_chat_repo,
     loom_content_client,
     loom_employee_client,
-    loom_organization_client
+    loom_organization_client,
+    cfg.publication_pipeline_mode,
+    text_variant_pool,
+    transcript_cache,
 )
 
 generate_video_cut_service = GenerateVideoCutService(
@@ -391,7 +519,9 @@ moderation_publication_service = ModerationPublicationService(
     state_repo,
     loom_content_client,
     loom_organization_client,
-    cfg.domain
+    cfg.domain,
+    text_variant_pool,
+    transcript_cache,
 )
 
 video_cuts_draft_service = VideoCutsDraftService(
@@ -406,7 +536,9 @@ draft_publication_service = DraftPublicationService(
     state_repo,
     loom_content_client,
     loom_organization_client,
-    cfg.domain
+    cfg.domain,
+    text_variant_pool,
+    transcript_cache,
 )
 
 video_cut_moderation_service = VideoCutModerationService(
@@ -437,7 +569,8 @@ create_category_service = CreateCategoryService(
     llm_chat_repo,
     state_repo,
     loom_organization_client,
-    loom_content_client
+    loom_content_client,
+    transcript_cache,
 )
 
 create_organization_service = CreateOrganizationService(
@@ -449,7 +582,8 @@ create_organization_service = CreateOrganizationService(
     loom_employee_client,
     loom_content_client,
     llm_chat_repo,
-    state_repo
+    state_repo,
+    transcript_cache,
 )
 
 update_category_service = UpdateCategoryService(
@@ -461,7 +595,8 @@ update_category_service = UpdateCategoryService(
     loom_content_client,
     telegram_client,
     llm_chat_repo,
-    state_repo
+    state_repo,
+    transcript_cache,
 )
 
 update_organization_service = UpdateOrganizationService(
@@ -472,7 +607,8 @@ update_organization_service = UpdateOrganizationService(
     loom_organization_client,
     loom_content_client,
     llm_chat_repo,
-    state_repo
+    state_repo,
+    transcript_cache,
 )
 
 # Инициализация диалогов
@@ -588,17 +724,36 @@ update_organization_dialog = UpdateOrganizationDialog(
 
 command_controller = CommandController(tel, state_service)
 
+# Блокировка кнопок общая для воркеров и реплик, поэтому всегда в Redis
+callback_lock = CallbackLock(
+    tel,
+    shared_state_redis or RedisClient(
+        cfg.monitoring_redis_host,
+        cfg.monitoring_redis_port,
+        cfg.shared_state_redis_db,
+        cfg.monitoring_redis_password,
+    ),
+    cfg.callback_lock_scopes,
+    cfg.callback_lock_ttl,
+)
+
+update_profiler = UpdateProfiler(
+    cfg.update_profiler_updates_per_chat,
+    cfg.update_profiler_max_chats,
+) if cfg.update_profiler_enabled else None
+
 tg_middleware = TgMiddleware(
     tel,
     state_service,
     bot,
-    log_context
+    log_context,
+    callback_lock,
+    chat_lock,
+    update_profiler,
 )
 
-dialog_bg_factory = NewTg(
-    dp,
-    command_controller,
-    tg_middleware,
+# Dialog с окнами и виджетами собираются прогревом или перед первым обновлением, а не при импорте
+dialog_registry = LazyDialogRegistry(tel, [
     auth_dialog,
     main_menu_dialog,
     personal_profile_dialog,
@@ -607,8 +762,8 @@ dialog_bg_factory = NewTg(
     add_employee_dialog,
     content_menu_dialog,
     generate_publication_dialog,
-    generate_video_cut_dialog,
     moderation_publication_dialog,
+    generate_video_cut_dialog,
     video_cut_moderation_dialog,
     video_cuts_draft_dialog,
     draft_publication_dialog,
@@ -618,6 +773,13 @@ dialog_bg_factory = NewTg(
     create_organization_dialog,
     update_category_dialog,
     update_organization_dialog,
+])
+
+dialog_bg_factory = NewTg(
+    dp,
+    command_controller,
+    tg_middleware,
+    dialog_registry,
 )
 tg_middleware.dialog_bg_factory = dialog_bg_factory
 
@@ -627,6 +789,56 @@ http_middleware = HttpMiddleware(
     cfg.prefix,
     log_context
 )
+update_queue = None
+if cfg.webhook_mode == "queue":
+    update_queue = UpdateQueue(
+        tel,
+        lambda update: dp.feed_update(bot=bot, update=update),
+        cfg.update_queue_workers,
+        cfg.update_queue_max_size,
+        cfg.update_queue_put_timeout,
+        cfg.update_queue_drain_timeout,
+    )
+
+update_deduplicator = UpdateDeduplicator(
+    tel,
+    RedisClient(
+        cfg.monitoring_redis_host,
+        cfg.monitoring_redis_port,
+        cfg.update_dedupe_redis_db,
+        cfg.monitoring_redis_password,
+    ) if cfg.update_dedupe_backend == "redis" or cfg.multi_instance else None,
+    cfg.update_dedupe_ttl,
+    cfg.update_dedupe_ring_size,
+)
+
+chat_router = None
+if cfg.chat_sharding:
+    chat_router = ChatRouter(
+        tel,
+        shared_state_redis,
+        cfg.replica_url,
+        cfg.chat_sharding_replicas,
+        cfg.prefix,
+        cfg.chat_sharding_virtual_nodes,
+        cfg.chat_sharding_heartbeat_ttl,
+        cfg.chat_sharding_forward_timeout,
+        cfg.chat_sharding_down_cooldown,
+    )
+
+loop_monitor = LoopMonitor(
+    tel,
+    log_context,
+    cfg.loop_monitor_interval,
+    cfg.loop_monitor_slow_threshold,
+) if cfg.loop_monitor_enabled else None
+
+sampling_profiler = SamplingProfiler(
+    os.path.dirname(os.path.abspath(__file__)),
+    cfg.sampling_profiler_max_seconds,
+    cfg.sampling_profiler_max_hz,
+)
+
 tg_webhook_controller = TelegramWebhookController(
     tel,
     dp,
@@ -635,28 +847,58 @@ tg_webhook_controller = TelegramWebhookController(
     dialog_bg_factory,
     cfg.domain,
     cfg.prefix,
-    cfg.interserver_secret_key
-)
+    cfg.interserver_secret_key,
+    update_queue,
+    update_deduplicator,
+    send_priority,
+    cfg.notify_fanout_concurrency,
+    chat_router,
+    callback_lock,
+)
+
+warmup = None
+if cfg.warmup_enabled:
+    # Сетевые шаги первыми: пока они ждут соединений, цикл занят импортом диалекта PG и сборкой диалогов
+    warmup_steps = {
+        "redis_fsm": redis_client.ping,
+        "redis_transcript_cache": transcript_cache_redis.ping,
+        "telegram_bot_api": bot.get_me,
+        "anthropic": anthropic_client.warmup,
+        "loom_account": partial(loom_account_client.client.warmup, cfg.warmup_http_connections),
+        "loom_authorization": partial(loom_authorization_client.client.warmup, cfg.warmup_http_connections),
+        "loom_employee": partial(loom_employee_client.client.warmup, cfg.warmup_http_connections),
+        "loom_organization": partial(loom_organization_client.client.warmup, cfg.warmup_http_connections),
+        "loom_content": partial(loom_content_client.client.warmup, cfg.warmup_http_connections),
+        "postgres": partial(db.warmup, cfg.warmup_pg_connections),
+        "dialogs": dialog_registry.build_in_background,
+    }
+    if shared_state_redis:
+        warmup_steps["redis_shared_state"] = shared_state_redis.ping
+    warmup = Warmup(tel, warmup_steps, cfg.warmup_timeout)
 
 app = NewServer(
     db,
     http_middleware,
     tg_webhook_controller,
     cfg.prefix,
-    cfg.environment
+    cfg.environment,
+    update_queue,
+    telethon_gateway,
+    chat_router,
+    loop_monitor,
+    update_profiler,
+    sampling_profiler,
+    cfg.interserver_secret_key,
+    warmup,
+    cfg.update_queue_drain_timeout,
 )
 
 if __name__ == "__main__":
-    if cfg.environment == "prod":
-        workers = 1
-    else:
-        workers = 1
-
     uvicorn.run(
         "main:app",
         host="0.0.0.0",
         port=int(cfg.http_port),
-        workers=workers,
+        workers=cfg.http_workers,
         loop="uvloop",
         access_log=False,
     )
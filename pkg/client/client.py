@@ -1,3 +1,7 @@
+import asyncio
+import functools
+import ssl
+import time
 from contextvars import ContextVar
 from datetime import datetime, timedelta
 from typing import Optional, Callable
@@ -12,28 +16,41 @@ from tenacity import (
 from opentelemetry import propagate
 
 from internal import interface
+from pkg.client.multipart import StreamingMultipart, has_stream_files
 
 
 class CircuitBreaker:
+    # Как часто воркер сверяется с общим состоянием в Redis
+    SHARED_SYNC_INTERVAL = 1.0
+
     def __init__(
         self,
         failure_threshold: int = 5,
         recovery_timeout: int = 60,
         logger: Optional[interface.IOtelLogger] = None,
+        redis: Optional[interface.IRedis] = None,
+        name: str = "",
     ):
         self.failure_threshold = failure_threshold
         self.recovery_timeout = recovery_timeout
         self.logger = logger
+        self.redis = redis
+        self.name = name
 
         self._failure_count = 0
         self._last_failure_time: Optional[datetime] = None
         self._state = "closed"  # closed, open, half-open
+        self._synced_at = 0.0
+        # Последнее известное значение общего счетчика ошибок
+        self._shared_failure_count = 0
 
     @property
     def state(self) -> str:
         return self._state
 
     async def call(self, func: Callable, *args, **kwargs):
+        await self._sync_shared_state()
+
         if self._state == "open":
             time_since_failure = (
                 datetime.now() - self._last_failure_time
@@ -61,29 +78,99 @@ class CircuitBreaker:
             # Успех - сбрасываем счетчики
             if self._state == "half-open":
                 self._state = "closed"
+                await self._reset_shared_state()
                 if self.logger:
                     self.logger.info("Circuit breaker: half-open -> closed")
 
-            self._failure_count = 0
+            await self._record_success()
             return result
 
         except Exception as err:
-            self._record_failure()
+            await self._record_failure()
             raise
 
-    def _record_failure(self):
+    async def _record_success(self):
+        self._failure_count = 0
+
+        # Как и локальный, общий счетчик считает ошибки подряд: успешный запрос любого воркера его обнуляет
+        if self.redis and self._shared_failure_count:
+            self._shared_failure_count = 0
+            try:
+                await self.redis.delete(self._failures_key())
+            except Exception:
+                pass
+
+    async def _record_failure(self):
         self._failure_count += 1
         self._last_failure_time = datetime.now()
 
+        if self.redis:
+            try:
+                # Ошибки всех воркеров складываются в общий счетчик
+                self._shared_failure_count = await self.redis.incr(self._failures_key(), ttl=self.recovery_timeout)
+                self._failure_count = max(self._failure_count, self._shared_failure_count)
+            except Exception:
+                pass
+
         if self._failure_count >= self.failure_threshold and self._state != "open":
             old_state = self._state
             self._state = "open"
+            await self._publish_open_state()
             if self.logger:
                 self.logger.warning(
                     f"Circuit breaker: {old_state} -> open "
                     f"(failures: {self._failure_count}/{self.failure_threshold})"
                 )
 
+    async def _sync_shared_state(self):
+        if not self.redis or self._state == "open":
+            return
+
+        now = time.monotonic()
+        if now - self._synced_at < self.SHARED_SYNC_INTERVAL:
+            return
+        self._synced_at = now
+
+        try:
+            opened_at = await self.redis.get(self._open_key())
+            # Ошибки других воркеров: без них успех этого воркера не сбросил бы общий счетчик
+            self._shared_failure_count = int(await self.redis.get(self._failures_key()) or 0)
+        except Exception:
+            return
+
+        # Другой воркер уже разомкнул цепь - не тратим свои запросы на упавший сервис
+        if opened_at and self._state == "closed":
+            self._state = "open"
+            self._last_failure_time = datetime.fromisoformat(opened_at)
+            if self.logger:
+                self.logger.warning("Circuit breaker: closed -> open (shared state)")
+
+    async def _publish_open_state(self):
+        if not self.redis:
+            return
+
+        try:
+            await self.redis.set(self._open_key(), self._last_failure_time.isoformat(), ttl=self.recovery_timeout)
+        except Exception:
+            pass
+
+    async def _reset_shared_state(self):
+        if not self.redis:
+            return
+
+        self._shared_failure_count = 0
+        try:
+            await self.redis.delete(self._open_key())
+            await self.redis.delete(self._failures_key())
+        except Exception:
+            pass
+
+    def _open_key(self) -> str:
+        return f"circuit_breaker:{self.name}:open"
+
+    def _failures_key(self) -> str:
+        return f"circuit_breaker:{self.name}:failures"
+
     def reset(self):
         self._failure_count = 0
         self._last_failure_time = None
@@ -119,6 +206,12 @@ def should_retry(retry_state: RetryCallState) -> bool:
     return False
 
 
+@functools.cache
+def _shared_ssl_context() -> ssl.SSLContext:
+    # Загрузка корневых сертификатов стоит ~20 мс на клиент; все клиенты процесса делят один контекст
+    return httpx.create_ssl_context()
+
+
 class AsyncHTTPClient:
     def __init__(
         self,
@@ -139,6 +232,7 @@ class AsyncHTTPClient:
         circuit_breaker_enabled: bool = False,
         circuit_breaker_threshold: int = 5,
         circuit_breaker_timeout: int = 60,
+        circuit_breaker_redis: Optional[interface.IRedis] = None,
         logger: Optional[interface.IOtelLogger] = None,
         log_context: Optional[ContextVar[dict]] = None,
     ):
@@ -163,6 +257,8 @@ class AsyncHTTPClient:
                 failure_threshold=circuit_breaker_threshold,
                 recovery_timeout=circuit_breaker_timeout,
                 logger=logger,
+                redis=circuit_breaker_redis,
+                name=self.base_url,
             )
 
         self.session = httpx.AsyncClient(
@@ -170,6 +266,7 @@ class AsyncHTTPClient:
             headers=self.default_headers,
             cookies=self.default_cookies,
             timeout=timeout,
+            verify=_shared_ssl_context(),
             http2=use_http2,
             limits=httpx.Limits(
                 max_connections=max_connections,
@@ -178,6 +275,13 @@ class AsyncHTTPClient:
             follow_redirects=True,
         )
 
+    async def warmup(self, connections: int) -> None:
+        """
+        Заранее открывает keep-alive соединения (с TLS-рукопожатием) к сервису, минуя ретраи и circuit breaker.
+        Код ответа не важен: соединение остается в пуле и при 404.
+        """
+        await asyncio.gather(*(self.session.get("/") for _ in range(connections)))
+
     async def close(self):
         if self.session and not self.session.is_closed:
             await self.session.aclose()
@@ -264,6 +368,25 @@ class AsyncHTTPClient:
                     raise
         return None
 
+    async def send_multipart(
+        self,
+        method: str,
+        url: str,
+        data: Optional[dict] = None,
+        files: Optional[dict | list] = None,
+        **kwargs,
+    ) -> httpx.Response:
+        if not has_stream_files(files):
+            return await self._request_with_retry(method, url, data=data, files=files, **kwargs)
+
+        # Тело из генераторов можно прочитать только один раз, поэтому без retry
+        multipart = StreamingMultipart(data, files)
+        headers = {**kwargs.pop("headers", {}), "Content-Type": multipart.content_type}
+
+        return await self._execute_request(
+            method, url, headers=headers, content=multipart.stream(), **kwargs
+        )
+
     async def get(self, url: str, **kwargs) -> httpx.Response:
         return await self._request_with_retry("GET", url, **kwargs)
 
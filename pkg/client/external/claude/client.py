@@ -27,24 +27,27 @@ class AnthropicClient(interface.IAnthropicClient):
 
         if proxy:
             transport = httpx.AsyncHTTPTransport(proxy=proxy)
-            self.client = AsyncAnthropic(
-                api_key=api_key,
-                http_client=httpx.AsyncClient(
-                    transport=transport,
-                    timeout=900
-                ),
-                max_retries=3
+            self.http_client = httpx.AsyncClient(
+                transport=transport,
+                timeout=900
             )
         else:
-            self.client = AsyncAnthropic(
-                api_key=api_key,
-                http_client=httpx.AsyncClient(
-                    timeout=900
-                ),
-                max_retries=3
+            self.http_client = httpx.AsyncClient(
+                timeout=900
             )
 
-    @traced_method(SpanKind.CLIENT)
+        self.client = AsyncAnthropic(
+            api_key=api_key,
+            http_client=self.http_client,
+            max_retries=3
+        )
+
+    async def warmup(self) -> None:
+        # TLS-рукопожатие с API (и прокси) до первой генерации; ответ на GET корня не важен
+        await self.http_client.get(str(self.client.base_url))
+
+    # История и промпты - десятки килобайт на вызов, в атрибуты их не пишем
+    @traced_method(SpanKind.CLIENT, capture_args=False)
     async def generate_str(
             self,
             history: list,
@@ -110,7 +113,7 @@ class AnthropicClient(interface.IAnthropicClient):
 
         return llm_response, generate_cost
 
-    @traced_method()
+    @traced_method(capture_args=False)
     async def generate_json(
             self,
             history: list,
@@ -1,25 +1,19 @@
 import base64
 import asyncio
+from typing import TYPE_CHECKING
 
 from aiogram import Bot
 from aiogram.types import BufferedInputFile
 from sulguk import SULGUK_PARSE_MODE, AiogramSulgukMiddleware
 
 import segno
-from telethon import TelegramClient as TelethonClient
-from telethon.sessions import StringSession
-from telethon.tl.functions.auth import ExportLoginTokenRequest
-from telethon.tl.functions.messages import GetStickerSetRequest
-from telethon.tl.types import InputStickerSetShortName
-from telethon.tl.types.auth import LoginTokenSuccess
-from telethon.errors import (
-    AuthTokenExpiredError,
-    AuthTokenAlreadyAcceptedError,
-    AuthTokenInvalidError,
-)
 
 from internal import interface
 
+# Telethon импортируется в методах: ~120 мс при старте процесса, а нужен он только для каналов и авторизации
+if TYPE_CHECKING:
+    from telethon import TelegramClient as TelethonClient
+
 
 class LTelegramClient(interface.ITelegramClient):
     def __init__(
@@ -35,7 +29,7 @@ class LTelegramClient(interface.ITelegramClient):
         self.api_id = api_id
         self.api_hash = api_hash
         self.session_string = session_string
-        self.telegram_client: TelethonClient | None = None
+        self.telegram_client: "TelethonClient | None" = None
 
     async def send_text_message(
             self,
@@ -109,6 +103,16 @@ class LTelegramClient(interface.ITelegramClient):
 
     async def authorize_telegram(self) -> str:
         """Авторизация через QR код и получение string_session"""
+        from telethon import TelegramClient as TelethonClient
+        from telethon.sessions import StringSession
+        from telethon.tl.functions.auth import ExportLoginTokenRequest
+        from telethon.tl.types.auth import LoginTokenSuccess
+        from telethon.errors import (
+            AuthTokenExpiredError,
+            AuthTokenAlreadyAcceptedError,
+            AuthTokenInvalidError,
+        )
+
         try:
             # Закрываем
 
@@ -194,6 +198,9 @@ class LTelegramClient(interface.ITelegramClient):
             channel_id: str,
             limit: int = None
     ) -> list[dict]:
+        from telethon import TelegramClient as TelethonClient
+        from telethon.sessions import StringSession
+
         try:
             if not self.telegram_client:
                 client = TelethonClient(
@@ -254,6 +261,11 @@ class LTelegramClient(interface.ITelegramClient):
             raise
 
     async def download_emoji_pack(self):
+        from telethon import TelegramClient as TelethonClient
+        from telethon.sessions import StringSession
+        from telethon.tl.functions.messages import GetStickerSetRequest
+        from telethon.tl.types import InputStickerSetShortName
+
         if not self.telegram_client:
             client = TelethonClient(
                 StringSession(self.session_string),
@@ -14,6 +14,8 @@ class LoomAccountClient(interface.ILoomAccountClient):
             host: str,
             port: int,
             log_context: ContextVar[dict],
+            circuit_breaker_enabled: bool = False,
+            circuit_breaker_redis: interface.IRedis = None,
     ):
         logger = tel.logger()
         self.client = AsyncHTTPClient(
@@ -21,7 +23,9 @@ class LoomAccountClient(interface.ILoomAccountClient):
             port,
             prefix="/api/account",
             use_tracing=True,
-            log_context=log_context
+            log_context=log_context,
+            circuit_breaker_enabled=circuit_breaker_enabled,
+            circuit_breaker_redis=circuit_breaker_redis,
         )
         self.tracer = tel.tracer()
 
@@ -1,5 +1,6 @@
 from contextvars import ContextVar
 from datetime import datetime
+from typing import AsyncIterable
 import json
 
 import httpx
@@ -18,6 +19,8 @@ class LoomContentClient(interface.ILoomContentClient):
             host: str,
             port: int,
             log_context: ContextVar[dict],
+            circuit_breaker_enabled: bool = False,
+            circuit_breaker_redis: interface.IRedis = None,
     ):
         self.client = AsyncHTTPClient(
             host,
@@ -25,7 +28,9 @@ class LoomContentClient(interface.ILoomContentClient):
             prefix="/api/content",
             use_tracing=True,
             log_context=log_context,
-            timeout=900
+            timeout=900,
+            circuit_breaker_enabled=circuit_breaker_enabled,
+            circuit_breaker_redis=circuit_breaker_redis,
         )
         self.tracer = tel.tracer()
 
@@ -190,7 +195,7 @@ class LoomContentClient(interface.ILoomContentClient):
             text: str,
             moderation_status: str,
             image_url: str = None,
-            image_content: bytes = None,
+            image_content: bytes | AsyncIterable[bytes] = None,
             image_filename: str = None,
     ) -> dict:
         data = {
@@ -216,7 +221,7 @@ class LoomContentClient(interface.ILoomContentClient):
             )
 
         if files:
-            response = await self.client.post("/publication/create", data=data, files=files)
+            response = await self.client.send_multipart("POST", "/publication/create", data=data, files=files)
         else:
             response = await self.client.post("/publication/create", data=data)
 
@@ -232,7 +237,7 @@ class LoomContentClient(interface.ILoomContentClient):
             text: str = None,
             time_for_publication: datetime = None,
             image_url: str = None,
-            image_content: bytes = None,
+            image_content: bytes | AsyncIterable[bytes] = None,
             image_filename: str = None,
     ) -> None:
         data = {}
@@ -260,7 +265,7 @@ class LoomContentClient(interface.ILoomContentClient):
                 "image/png"
             )
         if files:
-            response = await self.client.put(f"/publication/{publication_id}", data=data, files=files)
+            response = await self.client.send_multipart("PUT", f"/publication/{publication_id}", data=data, files=files)
         elif data:  # Отправляем только если есть данные
             response = await self.client.put(f"/publication/{publication_id}", data=data)
         else:
@@ -609,7 +614,7 @@ class LoomContentClient(interface.ILoomContentClient):
     async def transcribe_audio(
             self,
             organization_id: int,
-            audio_content: bytes = None,
+            audio_content: bytes | AsyncIterable[bytes] = None,
             audio_filename: str = None,
     ) -> str:
         data = {"organization_id": organization_id}
@@ -621,7 +626,7 @@ class LoomContentClient(interface.ILoomContentClient):
             )
         }
         try:
-            response = await self.client.get("/publication/audio/transcribe", data=data, files=files)
+            response = await self.client.send_multipart("GET", "/publication/audio/transcribe", data=data, files=files)
         except httpx.HTTPStatusError as err:
             if err.response.status_code == 400:
                 try:
@@ -641,7 +646,7 @@ class LoomContentClient(interface.ILoomContentClient):
     async def edit_image(
             self,
             organization_id: int,
-            image_content: bytes,
+            image_content: bytes | AsyncIterable[bytes],
             image_filename: str,
             prompt: str,
     ) -> tuple[list[str] | None, bool]:
@@ -653,7 +658,7 @@ class LoomContentClient(interface.ILoomContentClient):
             "image/png"
         )}
         try:
-            response = await self.client.post("/image/edit", data=data, files=files)
+            response = await self.client.send_multipart("POST", "/image/edit", data=data, files=files)
         except httpx.HTTPStatusError as err:
             if err.response.status_code == 400:
                 try:
@@ -680,7 +685,7 @@ class LoomContentClient(interface.ILoomContentClient):
             self,
             organization_id: int,
             category_id: int,
-            images_content: list[bytes],
+            images_content: list[bytes | AsyncIterable[bytes]],
             images_filenames: list[str],
             prompt: str,
     ) -> tuple[list[str] | None, bool]:
@@ -696,7 +701,7 @@ class LoomContentClient(interface.ILoomContentClient):
                 (filename, content, "image/png")
             ))
         try:
-            response = await self.client.post("/image/combine", data=data, files=files)
+            response = await self.client.send_multipart("POST", "/image/combine", data=data, files=files)
         except httpx.HTTPStatusError as err:
             if err.response.status_code == 400:
                 try:
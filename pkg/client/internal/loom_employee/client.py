@@ -15,6 +15,8 @@ class LoomEmployeeClient(interface.ILoomEmployeeClient):
             host: str,
             port: int,
             log_context: ContextVar[dict],
+            circuit_breaker_enabled: bool = False,
+            circuit_breaker_redis: interface.IRedis = None,
     ):
         logger = tel.logger()
         self.client = AsyncHTTPClient(
@@ -22,7 +24,9 @@ class LoomEmployeeClient(interface.ILoomEmployeeClient):
             port,
             prefix="/api/employee",
             use_tracing=True,
-            log_context=log_context
+            log_context=log_context,
+            circuit_breaker_enabled=circuit_breaker_enabled,
+            circuit_breaker_redis=circuit_breaker_redis,
         )
         self.tracer = tel.tracer()
 
@@ -18,6 +18,8 @@ class LoomOrganizationClient(interface.ILoomOrganizationClient):
             port: int,
             interserver_secret_key: str,
             log_context: ContextVar[dict],
+            circuit_breaker_enabled: bool = False,
+            circuit_breaker_redis: interface.IRedis = None,
     ):
         logger = tel.logger()
         self.client = AsyncHTTPClient(
@@ -25,7 +27,9 @@ class LoomOrganizationClient(interface.ILoomOrganizationClient):
             port,
             prefix="/api/organization",
             use_tracing=True,
-            log_context=log_context
+            log_context=log_context,
+            circuit_breaker_enabled=circuit_breaker_enabled,
+            circuit_breaker_redis=circuit_breaker_redis,
         )
         self.tracer = tel.tracer()
         self.interserver_secret_key = interserver_secret_key
@@ -0,0 +1,82 @@
+import os
+from typing import Any, AsyncIterable, AsyncIterator
+
+FileContent = bytes | AsyncIterable[bytes]
+
+
+def has_stream_files(files: dict | list | None) -> bool:
+    for _, (_, content, *_) in _iter_files(files):
+        if hasattr(content, "__aiter__"):
+            return True
+    return False
+
+
+class StreamingMultipart:
+    """
+    multipart/form-data тело, которое отдается по частям.
+    Содержимое файлов может быть async-генератором, тогда оно не буферизуется целиком в памяти.
+    """
+
+    def __init__(self, data: dict | None, files: dict | list | None):
+        self.boundary = os.urandom(16).hex()
+        self.data = data or {}
+        self.files = list(_iter_files(files))
+
+    @property
+    def content_type(self) -> str:
+        return f"multipart/form-data; boundary={self.boundary}"
+
+    async def stream(self) -> AsyncIterator[bytes]:
+        delimiter = f"--{self.boundary}\r\n".encode()
+
+        for name, value in self.data.items():
+            values = value if isinstance(value, (list, tuple)) else [value]
+            for item in values:
+                yield delimiter
+                yield f'Content-Disposition: form-data; name="{_quote(name)}"\r\n\r\n'.encode()
+                yield _primitive_to_bytes(item)
+                yield b"\r\n"
+
+        for name, (filename, content, content_type) in self.files:
+            yield delimiter
+            yield (
+                f'Content-Disposition: form-data; name="{_quote(name)}"; filename="{_quote(filename)}"\r\n'
+                f"Content-Type: {content_type}\r\n\r\n"
+            ).encode()
+
+            if hasattr(content, "__aiter__"):
+                async for chunk in content:
+                    yield chunk
+            elif hasattr(content, "read"):
+                yield content.read()
+            else:
+                yield content
+
+            yield b"\r\n"
+
+        yield f"--{self.boundary}--\r\n".encode()
+
+
+def _iter_files(files: dict | list | None):
+    if not files:
+        return []
+    if isinstance(files, dict):
+        return list(files.items())
+    return list(files)
+
+
+def _quote(value: str) -> str:
+    return str(value).replace('"', "%22").replace("\r", "%0D").replace("\n", "%0A")
+
+
+def _primitive_to_bytes(value: Any) -> bytes:
+    # Повторяет правила httpx для полей data
+    if value is True:
+        return b"true"
+    if value is False:
+        return b"false"
+    if value is None:
+        return b""
+    if isinstance(value, bytes):
+        return value
+    return str(value).encode()
@@ -1,56 +1,91 @@
 import functools
+import random
+import time
 import traceback
 from typing import Callable, Any
 import inspect
 
-def auto_log():
-    def decorator(func: Callable) -> Callable:
-        @functools.wraps(func)
-        async def async_wrapper(self, *args, **kwargs) -> Any:
-            class_name = self.__class__.__name__
-            method_name = func.__name__
+# Все вызовы: запись о начале и о завершении
+AUTO_LOG_ALL = "all"
+# Доля вызовов логируется целиком (начало и завершение), ошибки - всегда
+AUTO_LOG_SAMPLED = "sampled"
+# Только медленные вызовы (одна запись с длительностью) и ошибки
+AUTO_LOG_SLOW_OR_ERROR = "slow_or_error"
 
-            logger = getattr(self, 'logger', None)
+_settings = {
+    "mode": AUTO_LOG_ALL,
+    "sample_ratio": 1.0,
+    "slow_threshold": 1.0,
+}
 
-            if logger:
-                logger.info(f"Начало {class_name}.{method_name}")
 
-            try:
-                result = await func(self, *args, **kwargs)
+def configure_auto_log(mode: str, sample_ratio: float = 1.0, slow_threshold: float = 1.0) -> None:
+    if mode not in (AUTO_LOG_ALL, AUTO_LOG_SAMPLED, AUTO_LOG_SLOW_OR_ERROR):
+        raise ValueError(f"unknown auto_log mode: {mode}")
+
+    _settings["mode"] = mode
+    _settings["sample_ratio"] = sample_ratio
+    _settings["slow_threshold"] = slow_threshold
+
+
+class _Call:
+    __slots__ = ("logger", "name", "mode", "logged", "started_at")
+
+    def __init__(self, instance, method_name: str, mode: str | None):
+        self.logger = getattr(instance, 'logger', None)
+        self.name = f"{instance.__class__.__name__}.{method_name}" if self.logger else ""
+        self.mode = mode or _settings["mode"]
+        self.logged = self.logger is not None and (
+                self.mode == AUTO_LOG_ALL
+                or self.mode == AUTO_LOG_SAMPLED and random.random() < _settings["sample_ratio"]
+        )
+        self.started_at = time.perf_counter()
+
+        if self.logged:
+            self.logger.info(f"Начало {self.name}")
+
+    def finished(self) -> None:
+        if self.logged:
+            self.logger.info(f"Завершение {self.name}")
+        elif self.logger and self.mode == AUTO_LOG_SLOW_OR_ERROR:
+            duration = time.perf_counter() - self.started_at
+            if duration >= _settings["slow_threshold"]:
+                self.logger.warning(f"Медленное выполнение {self.name}", {
+                    "duration_ms": round(duration * 1000),
+                })
+
+    def failed(self, e: Exception) -> None:
+        if self.logger:
+            # Трейсбек форматируется только если запись пройдет по уровню
+            self.logger.error(f"Ошибка в {self.name}: {str(e)}", lambda: {
+                "traceback": traceback.format_exc(),
+            })
 
-                if logger:
-                    logger.info(f"Завершение {class_name}.{method_name}")
 
+def auto_log(mode: str = None):
+    def decorator(func: Callable) -> Callable:
+        method_name = func.__name__
+
+        @functools.wraps(func)
+        async def async_wrapper(self, *args, **kwargs) -> Any:
+            call = _Call(self, method_name, mode)
+            try:
+                result = await func(self, *args, **kwargs)
+                call.finished()
                 return result
             except Exception as e:
-                if logger:
-                    logger.error(f"Ошибка в {class_name}.{method_name}: {str(e)}", {
-                        "traceback": traceback.format_exc(),
-                    })
+                call.failed(e)
                 raise
 
         @functools.wraps(func)
         def sync_wrapper(self, *args, **kwargs) -> Any:
-            class_name = self.__class__.__name__
-            method_name = func.__name__
-
-            logger = getattr(self, 'logger', None)
-
-            if logger:
-                logger.info(f"Начало {class_name}.{method_name}")
-
+            call = _Call(self, method_name, mode)
             try:
                 result = func(self, *args, **kwargs)
-
-                if logger:
-                    logger.info(f"Завершение {class_name}.{method_name}")
-
+                call.finished()
                 return result
             except Exception as e:
-                if logger:
-                    logger.error(f"Ошибка в {class_name}.{method_name}: {str(e)}", {
-                        "traceback": traceback.format_exc(),
-                    })
+                call.failed(e)
                 raise
 
         if inspect.iscoroutinefunction(func):
@@ -58,4 +93,4 @@ def auto_log():
         else:
             return sync_wrapper
 
-    return decorator
\ No newline at end of file
+    return decorator
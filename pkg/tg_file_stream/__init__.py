@@ -0,0 +1 @@
+from pkg.tg_file_stream.tg_file_stream import tg_file_stream
\ No newline at end of file
@@ -0,0 +1,21 @@
+from typing import AsyncIterator
+
+from aiogram import Bot
+
+
+async def tg_file_stream(
+        bot: Bot,
+        file_id: str,
+        chunk_size: int = 65536,
+        timeout: int = 30,
+) -> AsyncIterator[bytes]:
+    file = await bot.get_file(file_id)
+    url = bot.session.api.file_url(bot.token, file.file_path)
+
+    async for chunk in bot.session.stream_content(
+            url=url,
+            timeout=timeout,
+            chunk_size=chunk_size,
+            raise_for_status=True,
+    ):
+        yield chunk
@@ -1 +1 @@
-from pkg.trace_wrapper.trace_wrapper import traced_method
\ No newline at end of file
+from pkg.trace_wrapper.trace_wrapper import traced_method, record_step
\ No newline at end of file
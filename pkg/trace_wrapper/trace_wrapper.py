@@ -1,13 +1,33 @@
+from contextvars import ContextVar
 from functools import wraps
 from typing import Any, Callable
+from opentelemetry import metrics
 from opentelemetry.trace import SpanKind, StatusCode
+import hashlib
 import inspect
+import time
+
+from internal import common
+
+# Длинные строки (промпты, тексты публикаций) не уходят в атрибуты целиком
+MAX_ATTRIBUTE_LENGTH = 256
+
+# Предел наборов меток RED-метрик; сверх него состояние диалога схлопывается в "other"
+MAX_METRIC_LABEL_SETS = 2000
+
+# Окно диалога, из которого идет вызов: им помечаются и вызовы сервисов, клиентов и PG ниже по стеку
+dialog_state: ContextVar[str] = ContextVar("dialog_state", default="none")
+
+# Шаги обрабатываемого обновления для профиля задержек; None - обновление не профилируется
+MAX_UPDATE_STEPS = 300
+update_steps: ContextVar[list | None] = ContextVar("update_steps", default=None)
 
 
 def traced_method(
         span_kind: SpanKind = SpanKind.INTERNAL,
         exclude_params: set[str] = None,
-        sensitive_params: set[str] = None
+        sensitive_params: set[str] = None,
+        capture_args: bool = True,
 ):
     if exclude_params is None:
         exclude_params = {'self', 'cls'}
@@ -15,21 +35,15 @@ def traced_method(
         sensitive_params = {'password', 'token', 'secret', 'api_key'}
 
     def decorator(func: Callable) -> Callable:
-        @wraps(func)
-        async def async_wrapper(self, *args, **kwargs):
-            # Получаем имя класса и метода
-            class_name = self.__class__.__name__
-            method_name = func.__name__
-            span_name = f"{class_name}.{method_name}"
-
-            # Собираем все параметры
-            sig = inspect.signature(func)
-            bound_args = sig.bind(self, *args, **kwargs)
-            bound_args.apply_defaults()
+        # Сигнатура разбирается один раз при декорировании, а не на каждом вызове
+        collect_arguments = _arguments_collector(func) if capture_args else None
+        get_dialog_manager = _dialog_manager_getter(func)
+        method_name = func.__name__
+        step_kind = span_kind.name.lower()
 
-            # Формируем атрибуты для span'а
+        def _attributes(self, args: tuple, kwargs: dict) -> dict:
             attributes = {}
-            for param_name, param_value in bound_args.arguments.items():
+            for param_name, param_value in collect_arguments(self, args, kwargs).items():
                 if param_name in exclude_params:
                     continue
 
@@ -39,54 +53,66 @@ def traced_method(
                 else:
                     # Конвертируем значение в строку для атрибутов
                     attributes[param_name] = _serialize_value(param_value)
-
-            # Создаем span
-            with self.tracer.start_as_current_span(
-                    span_name,
-                    kind=span_kind,
-                    attributes=attributes
-            ) as span:
-                try:
-                    result = await func(self, *args, **kwargs)
-                    span.set_status(StatusCode.OK)
-                    return result
-                except Exception as e:
-                    span.set_status(StatusCode.ERROR, str(e))
-                    raise
+            return attributes
 
         @wraps(func)
-        def sync_wrapper(self, *args, **kwargs):
+        async def async_wrapper(self, *args, **kwargs):
             class_name = self.__class__.__name__
-            method_name = func.__name__
             span_name = f"{class_name}.{method_name}"
+            # Локальная переменная с именем состояния читается и сэмплирующим профилировщиком
+            dialog_state_name = _dialog_state_name(get_dialog_manager, args, kwargs)
+            state_token = dialog_state.set(dialog_state_name) if dialog_state_name else None
+            started_at = time.perf_counter()
 
-            sig = inspect.signature(func)
-            bound_args = sig.bind(self, *args, **kwargs)
-            bound_args.apply_defaults()
+            try:
+                with self.tracer.start_as_current_span(span_name, kind=span_kind) as span:
+                    # Неотобранный семплером спан не экспортируется - аргументы не сериализуем
+                    if collect_arguments and span.is_recording():
+                        span.set_attributes(_attributes(self, args, kwargs))
 
-            attributes = {}
-            for param_name, param_value in bound_args.arguments.items():
-                if param_name in exclude_params:
-                    continue
+                    try:
+                        result = await func(self, *args, **kwargs)
+                        span.set_status(StatusCode.OK)
+                        _method_metrics.record(class_name, method_name, started_at, None)
+                        record_step(span_name, started_at, step_kind)
+                        return result
+                    except Exception as e:
+                        span.set_status(StatusCode.ERROR, str(e))
+                        _method_metrics.record(class_name, method_name, started_at, e)
+                        record_step(span_name, started_at, step_kind, error=True)
+                        raise
+            finally:
+                if state_token is not None:
+                    dialog_state.reset(state_token)
 
-                if param_name in sensitive_params:
-                    attributes[param_name] = "***REDACTED***"
-                else:
-                    attributes[param_name] = _serialize_value(param_value)
+        @wraps(func)
+        def sync_wrapper(self, *args, **kwargs):
+            class_name = self.__class__.__name__
+            span_name = f"{class_name}.{method_name}"
+            dialog_state_name = _dialog_state_name(get_dialog_manager, args, kwargs)
+            state_token = dialog_state.set(dialog_state_name) if dialog_state_name else None
+            started_at = time.perf_counter()
 
-            with self.tracer.start_as_current_span(
-                    span_name,
-                    kind=span_kind,
-                    attributes=attributes
-            ) as span:
-                try:
-                    result = func(self, *args, **kwargs)
-                    span.set_status(StatusCode.OK)
-                    return result
-                except Exception as e:
-                    span.set_status(StatusCode.ERROR, str(e))
-                    span.record_exception(e)
-                    raise
+            try:
+                with self.tracer.start_as_current_span(span_name, kind=span_kind) as span:
+                    if collect_arguments and span.is_recording():
+                        span.set_attributes(_attributes(self, args, kwargs))
+
+                    try:
+                        result = func(self, *args, **kwargs)
+                        span.set_status(StatusCode.OK)
+                        _method_metrics.record(class_name, method_name, started_at, None)
+                        record_step(span_name, started_at, step_kind)
+                        return result
+                    except Exception as e:
+                        span.set_status(StatusCode.ERROR, str(e))
+                        span.record_exception(e)
+                        _method_metrics.record(class_name, method_name, started_at, e)
+                        record_step(span_name, started_at, step_kind, error=True)
+                        raise
+            finally:
+                if state_token is not None:
+                    dialog_state.reset(state_token)
 
         # Возвращаем нужную обертку в зависимости от типа функции
         if inspect.iscoroutinefunction(func):
@@ -97,15 +123,175 @@ def traced_method(
     return decorator
 
 
+def _arguments_collector(func: Callable) -> Callable[[Any, tuple, dict], dict]:
+    """Возвращает функцию, которая раскладывает аргументы вызова по именам параметров, как sig.bind + apply_defaults."""
+    parameters = list(inspect.signature(func).parameters.values())
+
+    positional = []
+    named = set()
+    defaults = {}
+    var_positional = None
+    var_keyword = None
+
+    for parameter in parameters:
+        if parameter.kind == inspect.Parameter.VAR_POSITIONAL:
+            var_positional = parameter.name
+            defaults[parameter.name] = ()
+            continue
+        if parameter.kind == inspect.Parameter.VAR_KEYWORD:
+            var_keyword = parameter.name
+            continue
+
+        named.add(parameter.name)
+        if parameter.kind != inspect.Parameter.KEYWORD_ONLY:
+            positional.append(parameter.name)
+        if parameter.default is not inspect.Parameter.empty:
+            defaults[parameter.name] = parameter.default
+
+    def collect(self, args: tuple, kwargs: dict) -> dict:
+        arguments = dict(defaults)
+        arguments.update(zip(positional, (self, *args)))
+
+        if var_positional and len(args) + 1 > len(positional):
+            arguments[var_positional] = args[len(positional) - 1:]
+
+        if var_keyword:
+            extra = {}
+            for name, value in kwargs.items():
+                if name in named:
+                    arguments[name] = value
+                else:
+                    extra[name] = value
+            arguments[var_keyword] = extra
+        else:
+            arguments.update(kwargs)
+
+        return arguments
+
+    return collect
+
+
+def is_wrapper_frame(frame) -> bool:
+    """Рамка обертки traced_method: ее локальные span и dialog_state_name доступны при разборе стека."""
+    code = frame.f_code
+    return code.co_filename == __file__ and code.co_name in ("async_wrapper", "sync_wrapper")
+
+
+def record_step(name: str, started_at: float, kind: str = "internal", error: bool = False) -> None:
+    """Добавляет шаг в профиль текущего обновления; started_at - time.perf_counter() начала шага."""
+    steps = update_steps.get()
+    if steps is not None and len(steps) < MAX_UPDATE_STEPS:
+        steps.append((name, kind, started_at, time.perf_counter(), error))
+
+
+class _MethodMetrics:
+    """RED-метрики границ traced_method: длительность по исходу вызова и счетчик ошибок по типу."""
+
+    def __init__(self):
+        self._duration = None
+        self._errors = None
+        self._attributes: dict[tuple, dict] = {}
+
+    def record(self, class_name: str, method_name: str, started_at: float, error: Exception | None) -> None:
+        duration = time.perf_counter() - started_at
+
+        if self._duration is None:
+            # Инструменты создаются при первом вызове, когда Telemetry уже установил MeterProvider
+            meter = metrics.get_meter("pkg.trace_wrapper")
+            self._duration = meter.create_histogram(
+                name=common.METHOD_DURATION_KEY,
+                unit="s",
+                description="Длительность вызовов методов под traced_method",
+            )
+            self._errors = meter.create_counter(
+                name=common.METHOD_ERRORS_KEY,
+                description="Ошибки методов под traced_method",
+            )
+
+        attributes = self._label_set(class_name, method_name, dialog_state.get(), "ok" if error is None else "error")
+        self._duration.record(duration, attributes)
+        if error is not None:
+            self._errors.add(1, {**attributes, common.ERROR_TYPE_KEY: error.__class__.__name__})
+
+    def _label_set(self, class_name: str, method_name: str, state: str, outcome: str) -> dict:
+        key = (class_name, method_name, state, outcome)
+        attributes = self._attributes.get(key)
+        if attributes is not None:
+            return attributes
+
+        if len(self._attributes) >= MAX_METRIC_LABEL_SETS:
+            state = "other"
+            key = (class_name, method_name, state, outcome)
+            attributes = self._attributes.get(key)
+            if attributes is not None:
+                return attributes
+
+        # Один и тот же словарь на набор меток: SDK не пересобирает атрибуты на каждом вызове
+        attributes = {
+            common.CODE_NAMESPACE_KEY: class_name,
+            common.CODE_FUNCTION_KEY: method_name,
+            common.DIALOG_STATE_KEY: state,
+            common.OUTCOME_KEY: outcome,
+        }
+        self._attributes[key] = attributes
+        return attributes
+
+
+_method_metrics = _MethodMetrics()
+
+
+def _dialog_manager_getter(func: Callable) -> Callable[[tuple, dict], Any] | None:
+    """Возвращает функцию, достающую аргумент dialog_manager из вызова, если он есть в сигнатуре."""
+    names = list(inspect.signature(func).parameters)
+    if "dialog_manager" not in names:
+        return None
+
+    # Позиция среди аргументов без self
+    index = names.index("dialog_manager") - 1
+
+    def get(args: tuple, kwargs: dict) -> Any:
+        if "dialog_manager" in kwargs:
+            return kwargs["dialog_manager"]
+        if 0 <= index < len(args):
+            return args[index]
+        return None
+
+    return get
+
+
+def _dialog_state_name(get_dialog_manager: Callable | None, args: tuple, kwargs: dict) -> str | None:
+    if get_dialog_manager is None:
+        return None
+
+    dialog_manager = get_dialog_manager(args, kwargs)
+    if dialog_manager is None:
+        return None
+
+    try:
+        return dialog_manager.current_context().state.state
+    except Exception:
+        # Вне контекста диалога (старт, фоновый менеджер без стека)
+        return None
+
+
 def _serialize_value(value: Any) -> str:
     """Сериализует значение для атрибутов OpenTelemetry."""
     if value is None:
         return "None"
-    if isinstance(value, (str, int, float, bool)):
+    if isinstance(value, str):
+        return _truncate(value)
+    if isinstance(value, (int, float, bool)):
         return str(value)
     if isinstance(value, (list, tuple, dict)):
         return f"[{len(value)} items]"
-    if isinstance(value, dict):
-        return f"{{dict with {len(value)} keys}}"
 
-    return f"<{value.__class__.__name__}>"
\ No newline at end of file
+    return f"<{value.__class__.__name__}>"
+
+
+def _truncate(value: str) -> str:
+    if len(value) <= MAX_ATTRIBUTE_LENGTH:
+        return value
+
+    # Хеш позволяет сопоставить одинаковые длинные значения между спанами
+    digest = hashlib.blake2b(value.encode(), digest_size=8).hexdigest()
+    return f"{value[:MAX_ATTRIBUTE_LENGTH]}...[{len(value)} chars, {digest}]"